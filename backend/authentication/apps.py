@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from . import instrumentation, signals  # noqa: F401
+
+        post_migrate.connect(_ensure_search_index, sender=self)
+
+
+def _ensure_search_index(sender, using, **kwargs):
+    # Migrations that rebuild the skills or messages tables on SQLite drop
+    # their FTS triggers.
+    from .message_search import ensure_message_search_index
+    from .search import ensure_search_index
+    ensure_search_index(using)
+    ensure_message_search_index(using)
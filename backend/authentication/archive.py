@@ -0,0 +1,90 @@
+"""Moving old contact messages out of the live tables.
+
+``archive_messages`` copies messages that are archived, or older than
+MESSAGE_ARCHIVE_AFTER_DAYS, into ArchivedMessage with their reply folded
+in, then deletes them from the live tables. Each batch is its own short
+transaction, so the inbox is only ever locked for one batch, and a failed
+batch leaves both tables as they were.
+
+The deletes are plain SQL and send no model signals, so, as in
+BulkStatusMixin, the new_messages counter and the admin feed are updated
+here from the rows that were moved. The inbox search index follows through
+its triggers.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .counters import adjust_counters
+from .message_events import record_message_events
+from .models import ArchivedMessage, Message, MessageReply
+
+_COLUMNS = {
+    'id': 'id',
+    'name': 'name',
+    'email': 'email',
+    'message': 'message',
+    'status': 'status',
+    'created_at': 'created_at',
+    'reply__id': 'reply_id',
+    'reply__admin_id': 'reply_admin_id',
+    'reply__content': 'reply_content',
+    'reply__created_at': 'reply_created_at',
+}
+
+
+def archive_candidates(cutoff=None):
+    """Querysets of messages to archive, each walking one index oldest first."""
+    candidates = [Message.objects.filter(status='archived').order_by('created_at', 'id')]
+    if cutoff is not None:
+        candidates.append(Message.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id'))
+    return candidates
+
+
+def archive_batch(candidates, batch_size):
+    """Move up to ``batch_size`` of ``candidates``; returns how many moved."""
+    with transaction.atomic():
+        ids = list(candidates.select_for_update().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0
+        rows = list(Message.objects.filter(pk__in=ids).values(*_COLUMNS))
+        ArchivedMessage.objects.bulk_create([
+            ArchivedMessage(**{field: row[column] for column, field in _COLUMNS.items()}) for row in rows
+        ])
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {MessageReply._meta.db_table} WHERE message_id IN ({placeholders})', ids)
+            cursor.execute(f'DELETE FROM {Message._meta.db_table} WHERE id IN ({placeholders})', ids)
+
+        adjust_counters(new_messages=-sum(1 for row in rows if row['status'] == 'new'))
+        record_message_events('deleted', dict.fromkeys(ids))
+    return len(ids)
+
+
+def archive_messages(older_than_days=None, batch_size=None, pause=0, now=None):
+    """Archive every eligible message; returns how many were moved.
+
+    ``older_than_days`` defaults to MESSAGE_ARCHIVE_AFTER_DAYS; None there
+    archives only messages whose status is archived. ``pause`` sleeps
+    between batches to leave the database to live traffic.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'MESSAGE_ARCHIVE_AFTER_DAYS', None)
+    batch_size = batch_size or getattr(settings, 'MESSAGE_ARCHIVE_BATCH_SIZE', 500)
+    cutoff = None
+    if older_than_days is not None:
+        cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+
+    moved = 0
+    for candidates in archive_candidates(cutoff):
+        while True:
+            count = archive_batch(candidates, batch_size)
+            moved += count
+            if count < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return moved
@@ -0,0 +1,282 @@
+import asyncio
+import functools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from .firebase_config import auth
+from .firebase_cache import get_user_record, identity_from_claims, identity_from_record, token_cache, verify_id_token
+from .message_events import stream_message_events
+from .middleware import registration_closed
+from .settings_cache import aget_system_settings
+from .user_resolution import activate_user, aget_or_create_firebase_user, aresolve_uid
+
+# Async versions of the auth endpoints for the ASGI entry point. The Firebase
+# SDK is blocking, so its calls run on a bounded pool while the event loop
+# keeps accepting requests; everything else stays on the loop.
+
+_firebase_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _firebase_executor
+    if _firebase_executor is None:
+        with _executor_lock:
+            if _firebase_executor is None:
+                _firebase_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'FIREBASE_THREAD_POOL_SIZE', 64),
+                    thread_name_prefix='firebase',
+                )
+    return _firebase_executor
+
+
+async def run_firebase(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def averify_id_token(id_token):
+    # A cached token needs no thread hop at all.
+    claims = token_cache.get(id_token)
+    if claims is not None:
+        return claims
+    return await run_firebase(verify_id_token, id_token)
+
+
+async def aidentity_from_claims(claims):
+    if claims.get('email'):
+        return identity_from_claims(claims)
+    return await run_firebase(identity_from_claims, claims)
+
+
+def _read_id_token(request):
+    try:
+        return json.loads(request.body or b'{}').get('idToken')
+    except (ValueError, AttributeError):
+        return None
+
+
+def _error(message, status, code=None, data=None):
+    body = {
+        'status': 'error',
+        'message': message,
+    }
+    if code:
+        body['code'] = code
+    if data is not None:
+        body['data'] = data
+    return JsonResponse(body, status=status)
+
+
+@csrf_exempt
+@require_POST
+async def register(request):
+    id_token = _read_id_token(request)
+    if not id_token:
+        return _error('No ID token provided', 400)
+
+    try:
+        decoded_token = await averify_id_token(id_token)
+        firebase_user = await aidentity_from_claims(decoded_token)
+
+        _, created = await aget_or_create_firebase_user(firebase_user)
+        if not created:
+            return _error('An account already exists with this email address', 409)
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'User registered successfully',
+            'data': {
+                'uid': firebase_user.uid,
+                'email': firebase_user.email,
+                'emailVerified': firebase_user.email_verified
+            }
+        })
+    except auth.InvalidIdTokenError:
+        return _error('Invalid ID token', 401, 'auth/invalid-token')
+    except auth.UserNotFoundError:
+        return _error('User not found', 404, 'auth/user-not-found')
+    except Exception as e:
+        return _error(str(e), 500, 'auth/server-error')
+
+
+@require_GET
+async def status(request):
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return _error('No token provided', 401)
+
+    try:
+        decoded_token = await averify_id_token(auth_header.split(' ')[1])
+        firebase_user = await aidentity_from_claims(decoded_token)
+
+        django_user = await aresolve_uid(firebase_user.uid, firebase_user.email, firebase_user.email_verified)
+        if django_user is None:
+            return _error('User not found in Django database', 404, 'auth/user-not-found')
+
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'uid': firebase_user.uid,
+                'email': firebase_user.email,
+                'emailVerified': firebase_user.email_verified,
+                'django_id': django_user.user_id
+            }
+        })
+    except auth.InvalidIdTokenError:
+        return _error('Invalid or expired token', 401, 'auth/invalid-token')
+    except Exception as e:
+        return _error(str(e), 500, 'auth/server-error')
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    id_token = _read_id_token(request)
+    if not id_token:
+        return _error('No ID token provided', 400)
+
+    try:
+        decoded_token = await averify_id_token(id_token)
+        user = await aidentity_from_claims(decoded_token)
+
+        if not user.email_verified:
+            return _error('Please verify your email before logging in', 403, 'auth/email-not-verified')
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Login successful',
+            'data': {
+                'uid': user.uid,
+                'email': user.email,
+                'emailVerified': user.email_verified
+            }
+        })
+    except auth.InvalidIdTokenError:
+        return _error('Invalid ID token', 401, 'auth/invalid-token')
+    except Exception as e:
+        return _error(str(e), 500, 'auth/server-error')
+
+
+@csrf_exempt
+@require_POST
+async def verify_email(request):
+    id_token = _read_id_token(request)
+    if not id_token:
+        return _error('No ID token provided', 400)
+
+    try:
+        decoded_token = await averify_id_token(id_token)
+        firebase_user = await aidentity_from_claims(decoded_token)
+        if not firebase_user.email_verified:
+            record = await run_firebase(get_user_record, firebase_user.uid, refresh=True)
+            firebase_user = identity_from_record(record)
+
+        django_user = await aresolve_uid(firebase_user.uid, firebase_user.email, firebase_user.email_verified)
+        if django_user is None:
+            return _error(
+                'User not found in our database. Please register first.', 404, 'auth/user-not-found')
+
+        if not firebase_user.email_verified:
+            return _error(
+                'Email not verified. Please check your email and click the verification link.',
+                403,
+                'auth/email-not-verified',
+                data={'email': firebase_user.email, 'emailVerified': False},
+            )
+
+        if not django_user.is_active:
+            await sync_to_async(activate_user)(django_user.user_id)
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Email verified successfully',
+            'data': {
+                'uid': firebase_user.uid,
+                'email': firebase_user.email,
+                'emailVerified': True,
+                'django_id': django_user.user_id
+            }
+        })
+    except auth.InvalidIdTokenError:
+        return _error('Invalid or expired token. Please log in again.', 401, 'auth/invalid-token')
+    except auth.UserNotFoundError:
+        return _error('User not found in Firebase.', 404, 'auth/user-not-found')
+    except Exception as e:
+        return _error(str(e), 500, 'auth/server-error')
+
+
+@csrf_exempt
+@require_POST
+async def google_auth(request):
+    id_token = _read_id_token(request)
+    if not id_token:
+        return _error('No ID token provided', 400)
+
+    try:
+        decoded_token = await averify_id_token(id_token)
+        firebase_user = await aidentity_from_claims(decoded_token)
+
+        if (not (await aget_system_settings()).allow_new_registrations
+                and await aresolve_uid(firebase_user.uid, firebase_user.email, firebase_user.email_verified) is None):
+            return registration_closed()
+        resolved, _ = await aget_or_create_firebase_user(firebase_user)
+        if resolved is None:
+            return _error('An account already exists with this email address', 409)
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Google authentication successful',
+            'data': {
+                'uid': firebase_user.uid,
+                'email': firebase_user.email,
+                'emailVerified': firebase_user.email_verified,
+                'displayName': firebase_user.display_name,
+                'photoURL': firebase_user.photo_url
+            }
+        })
+    except auth.InvalidIdTokenError:
+        return _error('Invalid ID token', 401)
+    except Exception as e:
+        return _error(str(e), 500)
+
+
+@require_GET
+async def message_stream(request):
+    # Admin inbox feed as Server-Sent Events. The stream never ends, so it is
+    # only served on the ASGI entry point, where an idle stream is just a
+    # suspended coroutine; under WSGI (runserver included) it would hold a
+    # worker forever. Wake-ups travel on the chat broker: with LocalBackend
+    # they reach only streams in the worker that made the change, and the
+    # others pick it up on their next heartbeat.
+    if not isinstance(request, ASGIRequest):
+        return _error('The message stream is only served by skillswap_backend.asgi.', 501, 'server/asgi-required')
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return _error('No token provided', 401)
+    try:
+        decoded_token = await averify_id_token(auth_header.split(' ')[1])
+    except Exception:
+        return _error('Invalid or expired token', 401, 'auth/invalid-token')
+    resolved = await aresolve_uid(
+        decoded_token['uid'], decoded_token.get('email'), decoded_token.get('email_verified', False))
+    if resolved is None or not resolved.is_active or not resolved.is_admin:
+        return _error('Admin access required', 403, 'auth/forbidden')
+
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return _error('Invalid event id', 400)
+
+    response = StreamingHttpResponse(stream_message_events(since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,9 +1,9 @@
 from django.contrib.auth.models import User
-from firebase_admin import auth
 from django.utils.functional import SimpleLazyObject
-from django.contrib.auth.middleware import get_user
 from rest_framework import authentication
 from rest_framework import exceptions
+from .firebase_cache import verify_id_token
+from .user_resolution import resolve_uid
 
 class FirebaseAuthentication(authentication.BaseAuthentication):
     def authenticate(self, request):
@@ -13,17 +13,22 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
 
         id_token = auth_header.split(' ').pop()
         try:
-            decoded_token = auth.verify_id_token(id_token)
+            decoded_token = verify_id_token(id_token)
             uid = decoded_token['uid']
-            
-            try:
-                user = User.objects.get(username=uid)
-                return (user, None)
-            except User.DoesNotExist:
-                raise exceptions.AuthenticationFailed('User not found')
-                
         except Exception as e:
             raise exceptions.AuthenticationFailed(str(e))
 
+        resolved = resolve_uid(uid, decoded_token.get('email'), decoded_token.get('email_verified', False))
+        if resolved is None:
+            raise exceptions.AuthenticationFailed('User not found')
+        if not resolved.is_active:
+            raise exceptions.AuthenticationFailed('User account is suspended')
+
+        # Permission checks read this instead of querying the profile; the
+        # User row itself is only loaded if a view actually touches it.
+        request.resolved_user = resolved
+        user = SimpleLazyObject(lambda: User.objects.get(pk=resolved.user_id))
+        return (user, decoded_token)
+
     def authenticate_header(self, request):
         return 'Bearer'
@@ -0,0 +1,118 @@
+"""Pub/sub fan-out for the chat sockets.
+
+The ``Broker`` keeps this worker's subscriptions (channel -> connections)
+and hands every published payload to each local subscriber. Moving the
+payload between workers is the backend's job, chosen with
+CHAT_BROKER_BACKEND. A backend implements:
+
+    bind(deliver)            deliver(channel, text) hands a payload to the broker
+    async subscribe(channel) this worker now has listeners on ``channel``
+    async unsubscribe(channel)
+    async publish(channel, text)
+    async close()
+
+``LocalBackend`` delivers in-process. It is all a single worker, and the
+tests, need; deployments running several workers plug in a backend over a
+shared bus (Redis pub/sub, Postgres LISTEN/NOTIFY, ...).
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class LocalBackend:
+    def __init__(self):
+        self._deliver = None
+
+    def bind(self, deliver):
+        self._deliver = deliver
+
+    async def subscribe(self, channel):
+        pass
+
+    async def unsubscribe(self, channel):
+        pass
+
+    async def publish(self, channel, text):
+        self._deliver(channel, text)
+
+    async def close(self):
+        pass
+
+
+class Broker:
+    def __init__(self, backend):
+        self.backend = backend
+        self.published = 0
+        self.delivered = 0
+        self._subscribers = defaultdict(set)
+        self._loop = None
+        backend.bind(self._deliver)
+
+    async def subscribe(self, channel, connection):
+        self._loop = asyncio.get_running_loop()
+        subscribers = self._subscribers[channel]
+        subscribers.add(connection)
+        if len(subscribers) == 1:
+            await self.backend.subscribe(channel)
+
+    async def unsubscribe(self, channel, connection):
+        subscribers = self._subscribers.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(connection)
+        if not subscribers:
+            del self._subscribers[channel]
+            await self.backend.unsubscribe(channel)
+
+    async def publish(self, channel, text):
+        """Send an already-serialized payload, so N subscribers cost one dumps()."""
+        self.published += 1
+        await self.backend.publish(channel, text)
+
+    def _deliver(self, channel, text):
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and not _running_in(loop):
+            # Backends may read their bus on a thread of their own.
+            loop.call_soon_threadsafe(self._deliver_local, channel, text)
+        else:
+            self._deliver_local(channel, text)
+
+    def _deliver_local(self, channel, text):
+        for connection in tuple(self._subscribers.get(channel, ())):
+            # offer() never blocks: a full queue closes that connection
+            # instead of stalling everyone else on the channel.
+            connection.offer(text)
+            self.delivered += 1
+
+    def stats(self):
+        return {
+            'channels': len(self._subscribers),
+            'subscriptions': sum(len(subscribers) for subscribers in self._subscribers.values()),
+            'published': self.published,
+            'delivered': self.delivered,
+        }
+
+
+def _running_in(loop):
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'CHAT_BROKER_BACKEND', 'authentication.broker.LocalBackend')
+                _broker = Broker(import_string(backend)())
+    return _broker
@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status as http_status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .counters import adjust_counters
+from .filters import clean_field_value
+
+# Keeps each ... WHERE id IN (...) under SQLite's bound-parameter limit.
+UPDATE_CHUNK_SIZE = 500
+
+
+class BulkStatusMixin:
+    """``POST <list>/bulk/`` moving many rows to one status in a single transaction.
+
+    The body names the rows either by id or by filter:
+
+        {"ids": [1, 2, 3], "status": "active"}
+        {"filter": {"status": "pending", "category": "Music"}, "status": "active"}
+
+    Rows already in the target status are left alone. The response reports
+    ``updated``, ``unchanged`` or ``not_found`` for every id. Writes go
+    through ``update()``, which doesn't send model signals, so the dashboard
+    counters are adjusted here from the previous values.
+
+    Subclasses describe their status column:
+
+    - ``status_field``: the model column holding the status
+    - ``status_values``: API status -> column value, for every status
+    - ``bulk_statuses``: the statuses rows may be moved to
+    - ``status_counter``: ``(counter, column value)`` the counter tracks
+    - ``filter_fields``: extra columns accepted in ``filter``
+    """
+
+    status_field = 'status'
+    status_values = {}
+    bulk_statuses = ()
+    status_counter = None
+    filter_fields = ()
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        target = request.data.get('status')
+        if target not in self.bulk_statuses:
+            raise ValidationError({'status': f'Expected one of: {", ".join(self.bulk_statuses)}'})
+
+        ids = request.data.get('ids')
+        filters = request.data.get('filter')
+        if (ids is None) == (filters is None):
+            raise ValidationError('Provide either "ids" or "filter".')
+
+        limit = getattr(settings, 'BULK_MAX_ROWS', 10000)
+        if ids is not None:
+            ids = self.clean_ids(ids, limit)
+            results = self.apply_status(target, ids=ids)
+        else:
+            results = self.apply_status(target, filters=self.clean_filters(filters), limit=limit)
+
+        summary = {'updated': 0, 'unchanged': 0, 'not_found': 0}
+        for result in results.values():
+            summary[result] += 1
+        return Response({
+            **summary,
+            'notFound': summary.pop('not_found'),
+            'results': [{'id': pk, 'result': result} for pk, result in results.items()],
+        })
+
+    def partial_update(self, request, pk=None):
+        try:
+            pk = int(pk)
+        except ValueError:
+            return Response(status=http_status.HTTP_404_NOT_FOUND)
+        target = request.data.get('status')
+        results = self.apply_status(target if target in self.bulk_statuses else None, ids=[pk])
+        if results[pk] == 'not_found':
+            return Response(status=http_status.HTTP_404_NOT_FOUND)
+        return Response(status=http_status.HTTP_200_OK)
+
+    def clean_ids(self, ids, limit):
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': 'Expected a non-empty list of ids.'})
+        if len(ids) > limit:
+            raise ValidationError({'ids': f'At most {limit} ids per request.'})
+        try:
+            return list(dict.fromkeys(int(pk) for pk in ids))
+        except (TypeError, ValueError):
+            raise ValidationError({'ids': 'Ids must be integers.'})
+
+    def clean_filters(self, filters):
+        if not isinstance(filters, dict) or not filters:
+            raise ValidationError({'filter': 'Expected a non-empty object.'})
+        lookups = {}
+        for key, value in filters.items():
+            if key == 'status':
+                if value not in self.status_values:
+                    raise ValidationError({'filter': f'Unknown status: {value}'})
+                lookups[self.status_field] = self.status_values[value]
+            elif key in self.filter_fields:
+                lookups[key] = clean_field_value(self.get_queryset().model, key, value, 'filter')
+            else:
+                raise ValidationError({'filter': f'Unsupported filter: {key}'})
+        return lookups
+
+    def apply_status(self, target, ids=None, filters=None, limit=None):
+        """Move the selected rows to ``target`` and return ``{id: result}``.
+
+        A ``target`` of None only reports which of ``ids`` exist.
+        """
+        model = self.get_queryset().model
+        new_value = self.status_values.get(target)
+
+        with transaction.atomic():
+            rows = model.objects.select_for_update()
+            if ids is not None:
+                previous = {}
+                for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+                    chunk = rows.filter(pk__in=ids[start:start + UPDATE_CHUNK_SIZE])
+                    previous.update(chunk.values_list('pk', self.status_field))
+            else:
+                rows = rows.filter(**filters).order_by('pk')[:limit]
+                previous = dict(rows.values_list('pk', self.status_field))
+
+            if ids is None:
+                ids = list(previous)
+            changed = [pk for pk, value in previous.items() if target is not None and value != new_value]
+
+            updates = {self.status_field: new_value}
+            updates.update({
+                field.attname: timezone.now()
+                for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)
+            })
+            for start in range(0, len(changed), UPDATE_CHUNK_SIZE):
+                model.objects.filter(pk__in=changed[start:start + UPDATE_CHUNK_SIZE]).update(**updates)
+            if changed:
+                self.status_changed(changed, previous, new_value)
+
+            if self.status_counter and changed:
+                counter, counted = self.status_counter
+                was_counted = sum(1 for pk in changed if previous[pk] == counted)
+                adjust_counters(**{counter: len(changed) * (new_value == counted) - was_counted})
+            if changed:
+                transaction.on_commit(lambda: self.bulk_updated(changed))
+
+        changed = set(changed)
+        return {
+            pk: 'not_found' if pk not in previous else 'updated' if pk in changed else 'unchanged'
+            for pk in ids
+        }
+
+    def status_changed(self, ids, previous, new_value):
+        """Hook run inside the transaction with the ids whose status changed
+        and their previous values, for aggregates update() would bypass."""
+
+    def bulk_updated(self, ids):
+        """Hook run after commit with the ids whose status changed."""
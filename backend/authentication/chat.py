@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .fast_lists import format_datetime, full_name
+from .models import ChatMessage, Conversation
+
+
+class ChatError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def user_channel(user_id):
+    """Broker channel every connection of ``user_id`` listens on."""
+    return f'user:{user_id}'
+
+
+def max_message_length():
+    return getattr(settings, 'CHAT_MAX_MESSAGE_LENGTH', 4000)
+
+
+def history_page_size(requested=None):
+    default = getattr(settings, 'CHAT_HISTORY_PAGE_SIZE', 50)
+    try:
+        size = int(requested) if requested is not None else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, getattr(settings, 'MAX_PAGE_SIZE', 500)))
+
+
+def get_or_create_conversation(user_id, other_id):
+    if user_id == other_id:
+        raise ChatError('chat/invalid-recipient', 'You cannot start a conversation with yourself.')
+    if not User.objects.filter(pk=other_id, is_active=True).exists():
+        raise ChatError('chat/invalid-recipient', 'No such user.')
+    user_a, user_b = sorted((user_id, other_id))
+    conversation = Conversation.objects.filter(user_a_id=user_a, user_b_id=user_b).first()
+    if conversation is not None:
+        return conversation, False
+    try:
+        with transaction.atomic():
+            return Conversation.objects.create(user_a_id=user_a, user_b_id=user_b), True
+    except IntegrityError:
+        # Both users opened the conversation at once.
+        return Conversation.objects.get(user_a_id=user_a, user_b_id=user_b), False
+
+
+def conversation_peer(conversation_id, user_id):
+    """The other participant, or ChatError if ``user_id`` isn't in it."""
+    pair = Conversation.objects.filter(pk=conversation_id).values_list('user_a_id', 'user_b_id').first()
+    if pair is None or user_id not in pair:
+        raise ChatError('chat/not-found', 'No such conversation.')
+    return pair[1] if pair[0] == user_id else pair[0]
+
+
+def post_message(conversation_id, sender_id, body):
+    body = body.strip() if isinstance(body, str) else ''
+    if not body:
+        raise ChatError('chat/empty-message', 'Message is empty.')
+    if len(body) > max_message_length():
+        raise ChatError('chat/message-too-long', f'Messages are limited to {max_message_length()} characters.')
+    with transaction.atomic():
+        message = ChatMessage.objects.create(conversation_id=conversation_id, sender_id=sender_id, body=body)
+        Conversation.objects.filter(pk=conversation_id).update(last_message_at=message.created_at)
+    return message_payload(message.pk, conversation_id, sender_id, body, message.created_at)
+
+
+def message_payload(pk, conversation_id, sender_id, body, created_at):
+    return {
+        'id': pk,
+        'conversation': conversation_id,
+        'sender': sender_id,
+        'body': body,
+        'createdAt': format_datetime(created_at),
+    }
+
+
+def history(conversation_id, before=None, limit=None):
+    """One page of a conversation, newest first, keyed on message id.
+
+    ``before`` is the ``nextCursor`` of the previous page; each page is a
+    range scan of chat_message_history_idx however far back it reaches.
+    """
+    limit = history_page_size(limit)
+    messages = ChatMessage.objects.filter(conversation_id=conversation_id)
+    if before is not None:
+        try:
+            messages = messages.filter(pk__lt=int(before))
+        except (TypeError, ValueError):
+            raise ChatError('chat/invalid-cursor', 'Invalid cursor.')
+    rows = list(messages.order_by('-pk').values_list('pk', 'sender_id', 'body', 'created_at')[:limit + 1])
+    page = [message_payload(pk, conversation_id, sender, body, created) for pk, sender, body, created in rows[:limit]]
+    return {
+        'messages': page,
+        'nextCursor': page[-1]['id'] if len(rows) > limit else None,
+    }
+
+
+def conversations_for(user_id, before=None, limit=None):
+    """The user's conversations, most recently active first."""
+    limit = history_page_size(limit)
+    conversations = Conversation.objects.filter(Q(user_a_id=user_id) | Q(user_b_id=user_id))
+    if before:
+        try:
+            position, pk = before.rsplit('_', 1)
+            position, pk = parse_datetime(position), int(pk)
+        except (AttributeError, TypeError, ValueError):
+            raise ChatError('chat/invalid-cursor', 'Invalid cursor.')
+        if position is None:
+            raise ChatError('chat/invalid-cursor', 'Invalid cursor.')
+        conversations = conversations.filter(
+            Q(last_message_at__lt=position) | Q(last_message_at=position, pk__lt=pk))
+    rows = list(
+        conversations.order_by('-last_message_at', '-pk').values(
+            'pk', 'last_message_at', 'user_a_id', 'user_a__first_name', 'user_a__last_name',
+            'user_b_id', 'user_b__first_name', 'user_b__last_name')[:limit + 1]
+    )
+    results = []
+    for row in rows[:limit]:
+        side = 'user_b' if row['user_a_id'] == user_id else 'user_a'
+        results.append({
+            'id': row['pk'],
+            'peer': {
+                'id': row[f'{side}_id'],
+                'name': full_name(row[f'{side}__first_name'], row[f'{side}__last_name']),
+            },
+            'lastMessageAt': format_datetime(row['last_message_at']),
+        })
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = f'{last["last_message_at"].isoformat()}_{last["pk"]}'
+    return {'results': results, 'nextCursor': next_cursor}
@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Message, Skill, StatsCounters, UserProfile
+
+COUNTERS_PK = 1
+
+
+def adjust_counters(**deltas):
+    """Apply signed deltas to the counters row with atomic F() updates."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = StatsCounters.objects.filter(pk=COUNTERS_PK).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # No row yet: build it from scratch, which already includes this change.
+        recount_counters()
+
+
+def get_counters():
+    counters = StatsCounters.objects.filter(pk=COUNTERS_PK).first()
+    return counters or recount_counters()
+
+
+def count_from_scratch():
+    return {
+        'total_users': User.objects.count(),
+        'active_users': User.objects.filter(is_active=True).count(),
+        'total_skills': Skill.objects.count(),
+        'pending_skills': Skill.objects.filter(status='pending').count(),
+        'new_messages': Message.objects.filter(status='new').count(),
+    }
+
+
+def recount_counters():
+    counters, _ = StatsCounters.objects.update_or_create(
+        pk=COUNTERS_PK,
+        defaults={**count_from_scratch(), 'last_reconciled': timezone.now()},
+    )
+    return counters
+
+
+# Per-user skill totals (UserProfile.skills_count). Skill saves and deletes
+# keep them current from signals.py; creating through create_skill also
+# enforces SystemSettings.max_skills_per_user against the counter.
+
+class SkillLimitReached(Exception):
+    pass
+
+
+def adjust_skills_count(user_id, delta):
+    UserProfile.objects.filter(user_id=user_id).update(skills_count=F('skills_count') + delta)
+
+
+def reserve_skill_slot(user_id, limit):
+    """Count one more skill for the user unless they already have ``limit``.
+
+    A single conditional UPDATE: the row lock it takes serializes concurrent
+    creators, so two requests can't both take the last slot.
+    """
+    def reserve():
+        return UserProfile.objects.filter(user_id=user_id, skills_count__lt=limit).update(
+            skills_count=F('skills_count') + 1)
+
+    if reserve():
+        return
+    if not UserProfile.objects.filter(user_id=user_id).exists():
+        # Users created outside the Firebase sign-in paths have no profile yet.
+        try:
+            with transaction.atomic():
+                UserProfile.objects.create(user_id=user_id,
+                                           skills_count=Skill.objects.filter(author_id=user_id).count())
+        except IntegrityError:
+            pass
+        if reserve():
+            return
+    raise SkillLimitReached(limit)
+
+
+def create_skill(author_id, limit, **fields):
+    with transaction.atomic():
+        reserve_skill_slot(author_id, limit)
+        skill = Skill(author_id=author_id, **fields)
+        # The slot already counts this skill; don't let the signal add it again.
+        skill._skills_count_reserved = True
+        skill.save()
+    return skill
+
+
+def recount_skills_counts():
+    """Rewrite every drifted skills_count; returns how many were repaired."""
+    authored = (Skill.objects.filter(author_id=OuterRef('user_id')).order_by()
+                .values('author_id').annotate(total=Count('pk')).values('total'))
+    actual = Coalesce(Subquery(authored), 0)
+    drifted = UserProfile.objects.annotate(actual=actual).exclude(skills_count=F('actual'))
+    return drifted.update(skills_count=actual)
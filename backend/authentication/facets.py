@@ -0,0 +1,101 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Skill, SkillFacetCount
+
+# Ratings are bucketed by half star, the step the search page's slider uses.
+RATING_BUCKETS = 11
+
+
+def rating_bucket(rating):
+    return max(0, min(RATING_BUCKETS - 1, int((rating or 0) * 2)))
+
+
+def facet_key(category, level, rating):
+    return category, level, rating_bucket(rating)
+
+
+def adjust_facets(deltas):
+    """Apply ``{(category, level, bucket): delta}`` to the facet table."""
+    for (category, level, bucket), delta in deltas.items():
+        if not delta:
+            continue
+        cell = SkillFacetCount.objects.filter(category=category, level=level, rating_bucket=bucket)
+        if cell.update(count=F('count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                SkillFacetCount.objects.create(category=category, level=level, rating_bucket=bucket, count=delta)
+        except IntegrityError:
+            # Another writer created the cell first.
+            cell.update(count=F('count') + delta)
+
+
+def facet_deltas_for(ids, sign):
+    """Deltas that add (sign=1) or remove (sign=-1) the skills ``ids``."""
+    deltas = Counter()
+    for start in range(0, len(ids), 500):
+        rows = Skill.objects.filter(pk__in=ids[start:start + 500]).values_list('category', 'level', 'rating')
+        for category, level, rating in rows:
+            deltas[facet_key(category, level, rating)] += sign
+    return deltas
+
+
+def facet_counts(category=None, level=None, min_rating=None):
+    """Counts of active skills per category, level and minimum rating.
+
+    Each facet is counted with every other active filter applied but not
+    its own, so the UI can show what selecting another value would give.
+    The work is proportional to the number of facet cells, not skills.
+    """
+    min_bucket = rating_bucket(min_rating) if min_rating else 0
+    categories = Counter()
+    levels = Counter()
+    buckets = Counter()
+    total = 0
+    for cell_category, cell_level, bucket, count in SkillFacetCount.objects.filter(count__gt=0).values_list(
+            'category', 'level', 'rating_bucket', 'count'):
+        in_category = category is None or cell_category == category
+        in_level = level is None or cell_level == level
+        in_rating = bucket >= min_bucket
+        if in_level and in_rating:
+            categories[cell_category] += count
+        if in_category and in_rating:
+            levels[cell_level] += count
+        if in_category and in_level:
+            buckets[bucket] += count
+            if in_rating:
+                total += count
+
+    # "At least" counts for every half-star threshold.
+    rating = {}
+    running = 0
+    for bucket in range(RATING_BUCKETS - 1, -1, -1):
+        running += buckets[bucket]
+        rating[str(bucket / 2)] = running
+    return {
+        'total': total,
+        'category': dict(sorted(categories.items())),
+        'level': dict(sorted(levels.items())),
+        'rating': dict(reversed(rating.items())),
+    }
+
+
+def count_facets_from_scratch():
+    counts = Counter()
+    for category, level, rating in Skill.objects.filter(status='active').values_list('category', 'level', 'rating'):
+        counts[facet_key(category, level, rating)] += 1
+    return counts
+
+
+def recount_facets():
+    counts = count_facets_from_scratch()
+    with transaction.atomic():
+        SkillFacetCount.objects.all().delete()
+        SkillFacetCount.objects.bulk_create(
+            SkillFacetCount(category=category, level=level, rating_bucket=bucket, count=count)
+            for (category, level, bucket), count in counts.items()
+        )
+    return counts
@@ -0,0 +1,156 @@
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+# Formats datetimes exactly as the serializers' DateTimeFields do.
+_datetime = serializers.DateTimeField()
+
+
+def format_datetime(value):
+    return _datetime.to_representation(value) if value is not None else None
+
+
+def full_name(first_name, last_name):
+    # Same result as User.get_full_name()
+    return f'{first_name} {last_name}'.strip()
+
+
+class FastListMixin:
+    """Read-only list action that skips ModelSerializer entirely.
+
+    Rows come straight from ``queryset.values()`` and are shaped into the same
+    JSON the view's serializer produces. ``list_fields`` maps each output
+    field to ``(columns, getter)``, so ``?fields=id,name`` selects only the
+    columns those fields need. Retrieve and the write actions still use the
+    serializer.
+    """
+
+    list_fields = {}
+    fields_query_param = 'fields'
+
+    def get_list_fields(self, request):
+        requested = request.query_params.get(self.fields_query_param)
+        if not requested:
+            return list(self.list_fields)
+        fields = [field.strip() for field in requested.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in self.list_fields]
+        if unknown:
+            raise ValidationError({self.fields_query_param: f'Unknown field(s): {", ".join(unknown)}'})
+        return fields
+
+    def get_list_values(self, fields):
+        """The filtered queryset as values() with every column ``fields`` reads."""
+        columns = {'id', self.keyset_field}
+        for field in fields:
+            columns.update(self.list_fields[field][0])
+        return self.filter_queryset(self.get_queryset()).values(*columns)
+
+    def get_row_builder(self, fields):
+        getters = [(field, self.list_fields[field][1]) for field in fields]
+        return lambda row: {field: getter(row) for field, getter in getters}
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_list_fields(request)
+        queryset = self.get_list_values(fields)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+
+        build_row = self.get_row_builder(fields)
+        data = [build_row(row) for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+def list_rows(queryset, list_fields):
+    """``{id: row}`` for ``queryset``, shaped by a ``*_LIST_FIELDS`` mapping."""
+    columns = {'id'}.union(*(columns for columns, _ in list_fields.values()))
+    return {
+        row['id']: {field: getter(row) for field, (_, getter) in list_fields.items()}
+        for row in queryset.values(*columns)
+    }
+
+
+def _last_active(row):
+    if row['userprofile__id'] is None:
+        return row['last_login']
+    return row['userprofile__last_active']
+
+
+def _reply(row):
+    if row['reply__id'] is None:
+        return None
+    if row['reply__admin_id'] is None:
+        admin_name = None
+    else:
+        admin_name = full_name(row['reply__admin__first_name'], row['reply__admin__last_name'])
+    return {
+        'id': row['reply__id'],
+        'messageId': row['id'],
+        'adminName': admin_name,
+        'content': row['reply__content'],
+        'createdAt': format_datetime(row['reply__created_at']),
+    }
+
+
+def _archived_reply(row):
+    if row['reply_id'] is None:
+        return None
+    if row['reply_admin_id'] is None:
+        admin_name = None
+    else:
+        admin_name = full_name(row['reply_admin__first_name'], row['reply_admin__last_name'])
+    return {
+        'id': row['reply_id'],
+        'messageId': row['id'],
+        'adminName': admin_name,
+        'content': row['reply_content'],
+        'createdAt': format_datetime(row['reply_created_at']),
+    }
+
+
+# Mirrors UserManagementSerializer. lastActive stays a datetime because the
+# serializer's method field returns one and leaves formatting to the renderer.
+USER_LIST_FIELDS = {
+    'id': (('id',), itemgetter('id')),
+    'name': (('first_name', 'last_name'), lambda row: full_name(row['first_name'], row['last_name'])),
+    'email': (('email',), itemgetter('email')),
+    'status': (('is_active',), lambda row: 'active' if row['is_active'] else 'suspended'),
+    'joinedDate': (('date_joined',), lambda row: format_datetime(row['date_joined'])),
+    'lastActive': (('userprofile__id', 'userprofile__last_active', 'last_login'), _last_active),
+    'skillsCount': (('userprofile__skills_count',), lambda row: row['userprofile__skills_count'] or 0),
+}
+
+# Mirrors SkillModerationSerializer.
+SKILL_LIST_FIELDS = {
+    'id': (('id',), itemgetter('id')),
+    'title': (('title',), itemgetter('title')),
+    'author': (('author__first_name', 'author__last_name'),
+               lambda row: full_name(row['author__first_name'], row['author__last_name'])),
+    'category': (('category',), itemgetter('category')),
+    'status': (('status',), itemgetter('status')),
+    'created_at': (('created_at',), lambda row: format_datetime(row['created_at'])),
+    'last_modified': (('last_modified',), lambda row: format_datetime(row['last_modified'])),
+}
+
+# Mirrors MessageSerializer.
+MESSAGE_LIST_FIELDS = {
+    'id': (('id',), itemgetter('id')),
+    'name': (('name',), itemgetter('name')),
+    'email': (('email',), itemgetter('email')),
+    'message': (('message',), itemgetter('message')),
+    'status': (('status',), itemgetter('status')),
+    'createdAt': (('created_at',), lambda row: format_datetime(row['created_at'])),
+    'reply': (('reply__id', 'reply__content', 'reply__created_at', 'reply__admin_id',
+               'reply__admin__first_name', 'reply__admin__last_name'), _reply),
+}
+
+# Mirrors ArchivedMessageSerializer: the live shape plus archivedAt.
+ARCHIVED_MESSAGE_LIST_FIELDS = {
+    **{field: MESSAGE_LIST_FIELDS[field] for field in ('id', 'name', 'email', 'message', 'status', 'createdAt')},
+    'reply': (('reply_id', 'reply_content', 'reply_created_at', 'reply_admin_id',
+               'reply_admin__first_name', 'reply_admin__last_name'), _archived_reply),
+    'archivedAt': (('archived_at',), lambda row: format_datetime(row['archived_at'])),
+}
@@ -0,0 +1,377 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from .firebase_config import auth
+from .instrumentation import firebase_call
+from .singleflight import SingleFlight
+
+_MAX_AGE_RE = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+# auth.get_users() accepts at most this many identifiers per call.
+GET_USERS_BATCH_LIMIT = 100
+
+# The subset of a Firebase UserRecord the auth views need. Attribute names
+# match UserRecord so either can be passed around.
+FirebaseIdentity = namedtuple(
+    'FirebaseIdentity', ['uid', 'email', 'email_verified', 'display_name', 'photo_url'])
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified ID token claims, keyed by a SHA-256 of the token.
+
+    Entries expire at the token's own ``exp`` claim, so a cached token is never
+    accepted for longer than Firebase itself would accept it.
+    """
+
+    def __init__(self, maxsize=None):
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        # Read lazily: this module is imported while settings are still loading.
+        if self._maxsize is None:
+            self._maxsize = getattr(settings, 'FIREBASE_TOKEN_CACHE_SIZE', 10000)
+        return self._maxsize
+
+    @staticmethod
+    def key(id_token):
+        if isinstance(id_token, str):
+            id_token = id_token.encode('utf-8')
+        return hashlib.sha256(id_token).hexdigest()
+
+    def get(self, id_token, key=None):
+        key = key or self.key(id_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(claims)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, id_token, claims, key=None):
+        expires_at = claims.get('exp')
+        if not expires_at or expires_at <= time.time():
+            return
+        key = key or self.key(id_token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class SigningKeyCache:
+    """google-auth transport that keeps Google's public signing keys in memory.
+
+    Responses to GET requests are held for the ``max-age`` advertised in the
+    ``Cache-Control`` header, so key rotation is picked up as soon as Google
+    says the old response is stale.
+    """
+
+    def __init__(self, timeout_seconds=None):
+        self.timeout_seconds = timeout_seconds
+        self.hits = 0
+        self.misses = 0
+        self._delegate = None
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        if self._delegate is None:
+            import google.auth.transport.requests
+            self._delegate = google.auth.transport.requests.Request()
+        timeout = timeout or self.timeout_seconds
+        if method != 'GET':
+            return self._delegate(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        with self._lock:
+            entry = self._responses.get(url)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        response = self._delegate(url, method=method, headers=headers, timeout=timeout, **kwargs)
+        max_age = _max_age(response.headers.get('cache-control', ''))
+        if response.status == 200 and max_age:
+            with self._lock:
+                self._responses[url] = (time.monotonic() + max_age, response)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._responses), 'hits': self.hits, 'misses': self.misses}
+
+
+class _PendingLookup:
+    def __init__(self):
+        self.done = False
+        self.record = None
+        self.error = None
+
+
+class UserRecordCache:
+    """TTL/LRU cache of Firebase user records.
+
+    A miss is fetched straight away unless an ``auth.get_users`` call is
+    already in flight; misses that arrive meanwhile queue up and go out
+    together in the next call, made by one of the callers waiting on them.
+    Batches form under load, a lone miss never waits for company, and no
+    caller makes more than one call for others.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._queue = []
+        self._flushing = False
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+
+    @property
+    def maxsize(self):
+        if self._maxsize is None:
+            self._maxsize = getattr(settings, 'FIREBASE_USER_CACHE_SIZE', 10000)
+        return self._maxsize
+
+    @property
+    def ttl(self):
+        if self._ttl is None:
+            self._ttl = getattr(settings, 'FIREBASE_USER_CACHE_TTL', 300)
+        return self._ttl
+
+    def get(self, uid, refresh=False):
+        """Return the UserRecord for ``uid``, raising auth.UserNotFoundError if missing."""
+        if not refresh:
+            with self._lock:
+                record = self._lookup(uid)
+            if record is not None:
+                return record
+        return self._fetch([uid])[uid]
+
+    def get_many(self, uids):
+        """Return a dict of uid -> UserRecord; unknown uids are left out."""
+        found = {}
+        missing = []
+        with self._lock:
+            for uid in dict.fromkeys(uids):
+                record = self._lookup(uid)
+                if record is None:
+                    missing.append(uid)
+                else:
+                    found[uid] = record
+        if missing:
+            found.update(self._fetch(missing, strict=False))
+        return found
+
+    def invalidate(self, uid):
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.upstream_calls = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'upstreamCalls': self.upstream_calls,
+            }
+
+    def _lookup(self, uid):
+        entry = self._entries.get(uid)
+        if entry is not None:
+            expires_at, record = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(uid)
+                self.hits += 1
+                return record
+            del self._entries[uid]
+        self.misses += 1
+        return None
+
+    def _store(self, record):
+        self._entries[record.uid] = (time.monotonic() + self.ttl, record)
+        self._entries.move_to_end(record.uid)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _fetch(self, uids, strict=True):
+        lookups = {}
+        with self._lock:
+            for uid in uids:
+                pending = self._pending.get(uid)
+                if pending is None:
+                    pending = self._pending[uid] = _PendingLookup()
+                    self._queue.append(uid)
+                lookups[uid] = pending
+
+            # Whoever finds no call in flight sends everything queued so far,
+            # its own misses included, then hands over to the next waiter.
+            while not all(pending.done for pending in lookups.values()):
+                if self._flushing or not self._queue:
+                    self._flushed.wait()
+                    continue
+                queue, self._queue = self._queue, []
+                self._flushing = True
+                self._lock.release()
+                try:
+                    self._get_users(queue)
+                finally:
+                    self._lock.acquire()
+                    self._flushing = False
+                    self._flushed.notify_all()
+
+        records = {}
+        for uid, pending in lookups.items():
+            if pending.error is not None:
+                if strict or not isinstance(pending.error, auth.UserNotFoundError):
+                    raise pending.error
+                continue
+            records[uid] = pending.record
+        return records
+
+    def _get_users(self, queue):
+        for start in range(0, len(queue), GET_USERS_BATCH_LIMIT):
+            chunk = queue[start:start + GET_USERS_BATCH_LIMIT]
+            try:
+                with self._lock:
+                    self.upstream_calls += 1
+                with firebase_call('get_users'):
+                    result = auth.get_users([auth.UidIdentifier(uid) for uid in chunk])
+                records = {record.uid: record for record in result.users}
+                error = None
+            except Exception as e:
+                records = {}
+                error = e
+
+            with self._lock:
+                for uid in chunk:
+                    pending = self._pending.pop(uid)
+                    record = records.get(uid)
+                    if record is not None:
+                        self._store(record)
+                        pending.record = record
+                    elif error is not None:
+                        pending.error = error
+                    else:
+                        pending.error = auth.UserNotFoundError(f'No user record found for uid: {uid}')
+                    pending.done = True
+
+
+def _max_age(cache_control):
+    if 'no-store' in cache_control.lower() or 'no-cache' in cache_control.lower():
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+token_cache = VerifiedTokenCache()
+signing_key_cache = SigningKeyCache()
+user_cache = UserRecordCache()
+verify_flight = SingleFlight()
+
+
+def install_signing_key_cache(app):
+    # firebase_admin builds its own cache-control session per app; swap in ours
+    # so the keys are shared process-wide and hits/misses are observable.
+    from firebase_admin import auth as firebase_auth
+    client = firebase_auth._get_client(app)
+    client._token_verifier.request = signing_key_cache
+
+
+def verify_id_token(id_token):
+    key = token_cache.key(id_token)
+    claims = token_cache.get(id_token, key=key)
+    if claims is not None:
+        return claims
+
+    # Requests fired together by the SPA carry the same fresh token; only one
+    # of them pays for the signature check, the rest wait for its result.
+    claims = verify_flight.do(key, _verify_and_cache, id_token, key)
+    return dict(claims)
+
+
+def _verify_and_cache(id_token, key):
+    with firebase_call('verify_id_token'):
+        claims = auth.verify_id_token(id_token)
+    token_cache.set(id_token, claims, key=key)
+    return claims
+
+
+def get_user_record(uid, refresh=False):
+    return user_cache.get(uid, refresh=refresh)
+
+
+def identity_from_claims(claims):
+    # ID tokens already carry email, email_verified, name and picture, so the
+    # Firebase user record is only fetched when the token has no email claim
+    # (e.g. phone sign-in).
+    if claims.get('email'):
+        return FirebaseIdentity(
+            uid=claims['uid'],
+            email=claims['email'],
+            email_verified=bool(claims.get('email_verified')),
+            display_name=claims.get('name'),
+            photo_url=claims.get('picture'),
+        )
+    return identity_from_record(get_user_record(claims['uid']))
+
+
+def identity_from_record(record):
+    return FirebaseIdentity(
+        uid=record.uid,
+        email=record.email,
+        email_verified=record.email_verified,
+        display_name=record.display_name,
+        photo_url=record.photo_url,
+    )
+
+
+def cache_stats():
+    return {
+        'tokens': token_cache.stats(),
+        'signingKeys': signing_key_cache.stats(),
+        'users': user_cache.stats(),
+        'verifyFlight': verify_flight.stats(),
+    }
@@ -1,12 +1,61 @@
-import os
-import firebase_admin
-from firebase_admin import credentials, auth
+import functools
+import threading
 from django.conf import settings
 
+_app = None
+_lock = threading.Lock()
+
+
 def initialize_firebase():
-    cred = credentials.Certificate(os.path.join(settings.BASE_DIR, 'credentials', 'skillswap-d3d5a-firebase-adminsdk-fbsvc-2812b52959.json'))
-    try:
-        firebase_admin.initialize_app(cred)
-    except ValueError:
-        # App already initialized
-        pass
+    """Initialize the default Firebase app once per process.
+
+    Safe to call from any thread and cheap after the first call. Nothing in
+    the firebase_admin stack is imported until this runs.
+    """
+    global _app
+    if _app is not None:
+        return _app
+
+    with _lock:
+        if _app is None:
+            import firebase_admin
+            from firebase_admin import credentials
+            from .firebase_cache import install_signing_key_cache
+
+            try:
+                app = firebase_admin.get_app()
+            except ValueError:
+                cred = credentials.Certificate(str(settings.FIREBASE_CREDENTIALS))
+                app = firebase_admin.initialize_app(cred)
+                install_signing_key_cache(app)
+            _app = app
+    return _app
+
+
+class _LazyFirebaseAuth:
+    """Stand-in for the ``firebase_admin.auth`` module.
+
+    The module is imported on first attribute access, and SDK functions
+    initialize the default app when they are first called. Exception classes
+    are handed out as-is, so ``except auth.InvalidIdTokenError`` never touches
+    credentials.
+    """
+
+    def __getattr__(self, name):
+        from firebase_admin import auth as module
+
+        value = getattr(module, name)
+        if callable(value) and not isinstance(value, type):
+            return _with_app(value)
+        return value
+
+
+def _with_app(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        initialize_firebase()
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+auth = _LazyFirebaseAuth()
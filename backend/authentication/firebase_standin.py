@@ -0,0 +1,214 @@
+"""Offline stand-in for the Firebase Auth backend.
+
+Mints RS256 ID tokens with a local keypair and serves the matching
+certificates over HTTP, so ``verify_id_token`` runs the real signature and
+claim checks (and the real signing-key cache) without reaching Google. The
+user-management calls are served from memory. Every upstream call can be
+given an artificial latency to model the network round-trip.
+
+    standin = FirebaseStandIn(latency=0.05)
+    standin.add_user('uid-1', 'one@example.com')
+    with standin.installed():
+        claims = firebase_cache.verify_id_token(standin.mint_token('uid-1'))
+"""
+import datetime
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from firebase_admin import _token_gen, _user_mgt
+from firebase_admin import auth as firebase_auth
+from google.auth import crypt, jwt
+
+from .firebase_cache import signing_key_cache
+from .firebase_config import auth
+
+PROJECT_ID = 'skillswap-standin'
+TOKEN_LIFETIME = 3600
+CERT_MAX_AGE = 3600
+
+
+class FirebaseStandIn:
+    def __init__(self, latency=0, project_id=PROJECT_ID):
+        self.latency = latency
+        self.project_id = project_id
+        self.calls = Counter()
+        self._users = {}
+        self._lock = threading.Lock()
+        self._key_id = uuid.uuid4().hex
+        self._private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._signer = crypt.RSASigner.from_string(
+            self._private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ),
+            key_id=self._key_id,
+        )
+        self._certificate = self._self_signed_certificate()
+        self._server = None
+        self._verifier = None
+
+    # Users
+
+    def add_user(self, uid, email, email_verified=True, display_name=None, photo_url=None):
+        with self._lock:
+            self._users[uid] = {
+                'localId': uid,
+                'email': email,
+                'emailVerified': email_verified,
+                'displayName': display_name,
+                'photoUrl': photo_url,
+            }
+
+    def mint_token(self, uid, lifetime=TOKEN_LIFETIME, **claims):
+        """Return a signed ID token for a user added with add_user."""
+        with self._lock:
+            user = self._users[uid]
+        now = int(time.time())
+        payload = {
+            'iss': _token_gen.ID_TOKEN_ISSUER_PREFIX + self.project_id,
+            'aud': self.project_id,
+            'auth_time': now,
+            'iat': now,
+            'exp': now + lifetime,
+            'sub': uid,
+            'user_id': uid,
+            'email': user['email'],
+            'email_verified': user['emailVerified'],
+        }
+        if user['displayName']:
+            payload['name'] = user['displayName']
+        if user['photoUrl']:
+            payload['picture'] = user['photoUrl']
+        payload.update(claims)
+        return jwt.encode(self._signer, payload).decode('ascii')
+
+    # firebase_admin.auth replacements
+
+    def verify_id_token(self, id_token, check_revoked=False, clock_skew_seconds=0):
+        self._record('verify_id_token')
+        return self._verifier.verify(id_token, signing_key_cache, clock_skew_seconds)
+
+    def get_user(self, uid):
+        self._record('get_user')
+        with self._lock:
+            data = self._users.get(uid)
+        if data is None:
+            raise firebase_auth.UserNotFoundError(f'No user record found for the provided user ID: {uid}.')
+        return _user_mgt.UserRecord(data)
+
+    def get_users(self, identifiers):
+        self._record('get_users')
+        if len(identifiers) > 100:
+            raise ValueError('`identifiers` parameter must have <= 100 entries.')
+        with self._lock:
+            by_email = {user['email']: user for user in self._users.values()}
+            users = []
+            not_found = []
+            for identifier in identifiers:
+                if isinstance(identifier, firebase_auth.UidIdentifier):
+                    data = self._users.get(identifier.uid)
+                elif isinstance(identifier, firebase_auth.EmailIdentifier):
+                    data = by_email.get(identifier.email)
+                else:
+                    data = None
+                if data is None:
+                    not_found.append(identifier)
+                else:
+                    users.append(_user_mgt.UserRecord(data))
+        return firebase_auth.GetUsersResult(users=users, not_found=not_found)
+
+    def list_users(self, page_token=None, max_results=1000):
+        return _user_mgt.ListUsersPage(self._download, page_token, max_results)
+
+    def _download(self, page_token, max_results):
+        self._record('list_users')
+        with self._lock:
+            uids = sorted(self._users)
+            start = uids.index(page_token) + 1 if page_token in self._users else 0
+            page = [self._users[uid] for uid in uids[start:start + max_results]]
+        next_page_token = page[-1]['localId'] if start + max_results < len(uids) else ''
+        return {'users': page, 'nextPageToken': next_page_token}
+
+    def _record(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    # Key server
+
+    @property
+    def certs_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/certs'
+
+    def start(self):
+        certificate = self._certificate.public_bytes(serialization.Encoding.PEM).decode('ascii')
+        body = json.dumps({self._key_id: certificate}).encode('utf-8')
+
+        class CertsHandler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'application/json')
+                handler.send_header('Cache-Control', f'public, max-age={CERT_MAX_AGE}')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), CertsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._verifier = _token_gen._JWTVerifier(
+            project_id=self.project_id, short_name='ID token',
+            operation='verify_id_token()',
+            doc_url='https://firebase.google.com/docs/auth/admin/verify-id-tokens',
+            cert_url=self.certs_url,
+            issuer=_token_gen.ID_TOKEN_ISSUER_PREFIX,
+            invalid_token_error=firebase_auth.InvalidIdTokenError,
+            expired_token_error=firebase_auth.ExpiredIdTokenError)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @contextmanager
+    def installed(self):
+        """Route the app's Firebase calls to this stand-in for the duration."""
+        self.start()
+        replaced = ['verify_id_token', 'get_user', 'get_users', 'list_users']
+        for name in replaced:
+            setattr(auth, name, getattr(self, name))
+        try:
+            yield self
+        finally:
+            for name in replaced:
+                delattr(auth, name)
+            self.stop()
+
+    def _self_signed_certificate(self):
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'firebase-standin')])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(self._private_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(self._private_key, hashes.SHA256())
+        )
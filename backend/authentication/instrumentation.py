@@ -0,0 +1,302 @@
+import contextvars
+import threading
+import time
+from array import array
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+class RingBuffer:
+    """Fixed-size window over the most recent samples; memory never grows."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._values = array('d', bytes(8 * capacity))
+        self._errors = bytearray(capacity)
+        self._next = 0
+        self._size = 0
+
+    def append(self, value, error=False):
+        self._values[self._next] = value
+        self._errors[self._next] = error
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def snapshot(self):
+        return sorted(self._values[:self._size]), sum(self._errors[:self._size])
+
+
+class Series:
+    """Rolling latency window plus lifetime totals for one endpoint or call."""
+
+    def __init__(self, capacity):
+        self.window = RingBuffer(capacity)
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, error=False):
+        with self._lock:
+            self.window.append(seconds, error)
+            self.count += 1
+            self.errors += bool(error)
+            self.total_seconds += seconds
+
+    def summary(self):
+        with self._lock:
+            values, window_errors = self.window.snapshot()
+            count, errors, total = self.count, self.errors, self.total_seconds
+        return {
+            'count': count,
+            'errors': errors,
+            'totalSeconds': total,
+            'windowSize': len(values),
+            'windowErrors': window_errors,
+            'p50': _quantile(values, 0.50),
+            'p95': _quantile(values, 0.95),
+            'p99': _quantile(values, 0.99),
+        }
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Registry:
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return getattr(settings, 'METRICS_WINDOW_SIZE', 1024)
+
+    def series(self, kind, name):
+        key = (kind, name)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, Series(self.capacity))
+        return series
+
+    def record(self, kind, name, seconds, error=False):
+        self.series(kind, name).record(seconds, error)
+
+    def merged_window(self, kind):
+        """Sorted samples from every series of one kind, for overall quantiles."""
+        with self._lock:
+            series_list = [series for (series_kind, _), series in self._series.items() if series_kind == kind]
+        values = []
+        for series in series_list:
+            with series._lock:
+                values.extend(series.window.snapshot()[0])
+        values.sort()
+        return values
+
+    def summaries(self, kind):
+        with self._lock:
+            items = [(name, series) for (series_kind, name), series in self._series.items() if series_kind == kind]
+        return {name: series.summary() for name, series in sorted(items)}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+registry = Registry()
+
+# Query count and time for the request being served; contextvars follow the
+# request into sync_to_async threads.
+_request_queries = contextvars.ContextVar('request_queries', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    error = False
+    try:
+        return execute(sql, params, many, context)
+    except Exception:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.record('db', context['connection'].alias, elapsed, error)
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+            counter[1] += elapsed
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class Timer:
+    """Context manager recording the duration and failure of an upstream call."""
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        registry.record(self.kind, self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def firebase_call(name):
+    return Timer('firebase', name)
+
+
+class InstrumentationMiddleware:
+    """Records per-endpoint latency, server errors and DB usage for every request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, start = self._start()
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            self._finish(request, response, token, start)
+
+    async def __acall__(self, request):
+        token, start = self._start()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            self._finish(request, response, token, start)
+
+    def _start(self):
+        return _request_queries.set([0, 0.0]), time.perf_counter()
+
+    def _finish(self, request, response, token, start):
+        elapsed = time.perf_counter() - start
+        queries, query_seconds = _request_queries.get()
+        _request_queries.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            # Unrouted paths share one series so arbitrary URLs can't grow the registry.
+            endpoint = 'unmatched'
+        else:
+            endpoint = match.view_name or match.route
+        error = response is None or response.status_code >= 500
+        registry.record('endpoint', endpoint, elapsed, error)
+        registry.record('request_queries', endpoint, queries)
+        registry.record('request_query_time', endpoint, query_seconds)
+
+
+def system_health():
+    """Live health summary for admin_stats, derived from the rolling windows."""
+    endpoints = registry.summaries('endpoint')
+    firebase = registry.summaries('firebase')
+    error_rate_threshold = getattr(settings, 'HEALTH_ERROR_RATE_THRESHOLD', 0.05)
+    p95_threshold = getattr(settings, 'HEALTH_P95_THRESHOLD_SECONDS', 1.0)
+
+    issues = []
+    for kind, summaries in (('endpoint', endpoints), ('firebase', firebase)):
+        for name, summary in summaries.items():
+            if summary['windowSize'] and summary['windowErrors'] / summary['windowSize'] > error_rate_threshold:
+                issues.append(f'{kind} {name}: error rate above {error_rate_threshold:.0%}')
+            if summary['p95'] > p95_threshold:
+                issues.append(f'{kind} {name}: p95 above {p95_threshold * 1000:.0f} ms')
+
+    all_latencies = registry.merged_window('endpoint')
+
+    if not issues:
+        health = 'healthy'
+    elif any('error rate' in issue for issue in issues):
+        health = 'critical'
+    else:
+        health = 'warning'
+
+    return {
+        'status': health,
+        'lastChecked': timezone.now().isoformat(),
+        'issues': len(issues),
+        'details': issues,
+        'latency': {
+            'p50': _quantile(all_latencies, 0.50),
+            'p95': _quantile(all_latencies, 0.95),
+            'p99': _quantile(all_latencies, 0.99),
+        },
+        'errors': sum(summary['errors'] for summary in endpoints.values()),
+        'firebase': {
+            name: {'p95': summary['p95'], 'count': summary['count'], 'errors': summary['errors']}
+            for name, summary in firebase.items()
+        },
+    }
+
+
+def render_prometheus():
+    lines = []
+
+    def summary_metric(metric, help_text, label, summaries):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} summary')
+        for name, summary in summaries.items():
+            labels = f'{label}="{_escape(name)}"'
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                lines.append(f'{metric}{{{labels},quantile="{quantile}"}} {summary[key]:.6f}')
+            lines.append(f'{metric}_sum{{{labels}}} {summary["totalSeconds"]:.6f}')
+            lines.append(f'{metric}_count{{{labels}}} {summary["count"]}')
+
+    def counter_metric(metric, help_text, label, summaries):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for name, summary in summaries.items():
+            lines.append(f'{metric}{{{label}="{_escape(name)}"}} {summary["errors"]}')
+
+    endpoints = registry.summaries('endpoint')
+    firebase = registry.summaries('firebase')
+    summary_metric('skillswap_request_duration_seconds', 'Request latency by route.', 'endpoint', endpoints)
+    counter_metric('skillswap_request_errors_total', 'Requests that failed with a 5xx.', 'endpoint', endpoints)
+    summary_metric('skillswap_db_query_duration_seconds', 'Database query latency.', 'database',
+                   registry.summaries('db'))
+    summary_metric('skillswap_request_db_queries', 'Database queries per request.', 'endpoint',
+                   registry.summaries('request_queries'))
+    summary_metric('skillswap_request_db_seconds', 'Database time per request.', 'endpoint',
+                   registry.summaries('request_query_time'))
+    summary_metric('skillswap_firebase_call_duration_seconds', 'Firebase call latency.', 'call', firebase)
+    counter_metric('skillswap_firebase_errors_total', 'Firebase calls that raised.', 'call', firebase)
+
+    from .firebase_cache import cache_stats
+    lines.append('# HELP skillswap_cache_hits_total In-process cache hits.')
+    lines.append('# TYPE skillswap_cache_hits_total counter')
+    stats = cache_stats()
+    for cache in ('tokens', 'signingKeys', 'users'):
+        lines.append(f'skillswap_cache_hits_total{{cache="{cache}"}} {stats[cache]["hits"]}')
+    lines.append('# HELP skillswap_cache_misses_total In-process cache misses.')
+    lines.append('# TYPE skillswap_cache_misses_total counter')
+    for cache in ('tokens', 'signingKeys', 'users'):
+        lines.append(f'skillswap_cache_misses_total{{cache="{cache}"}} {stats[cache]["misses"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.archive import archive_messages
+
+
+class Command(BaseCommand):
+    help = ('Move archived contact messages, and those older than MESSAGE_ARCHIVE_AFTER_DAYS, '
+            'with their replies into the archive table, one small transaction per batch.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive messages older than this (default: MESSAGE_ARCHIVE_AFTER_DAYS).')
+        parser.add_argument('--batch-size', type=int, help='Messages per transaction (default: MESSAGE_ARCHIVE_BATCH_SIZE).')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        moved = archive_messages(options['days'], options['batch_size'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} messages in {time.perf_counter() - start:.2f} s.'))
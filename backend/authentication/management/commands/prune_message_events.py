@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from authentication.message_events import prune_message_events
+
+
+class Command(BaseCommand):
+    help = 'Drop old admin inbox feed events, keeping the newest MESSAGE_EVENTS_RETAIN.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, help='Events to keep (default: MESSAGE_EVENTS_RETAIN).')
+
+    def handle(self, *args, **options):
+        deleted = prune_message_events(options['keep'])
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} message events.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from authentication.counters import count_from_scratch, get_counters, recount_counters, recount_skills_counts
+from authentication.facets import recount_facets
+from authentication.reviews import recount_ratings
+
+
+class Command(BaseCommand):
+    help = ('Recompute the dashboard counters, skill ratings, skill facet counts and per-user skill '
+            'counts from scratch to repair any drift.')
+
+    def handle(self, *args, **options):
+        before = get_counters()
+        after = recount_counters()
+        for field in count_from_scratch():
+            old, new = getattr(before, field), getattr(after, field)
+            drift = f' (drift {new - old:+d})' if old != new else ''
+            self.stdout.write(f'{field}: {new}{drift}')
+        # Ratings first: the facet cells are bucketed by them.
+        self.stdout.write(f'skill ratings: {recount_ratings()} skills repaired')
+        cells = recount_facets()
+        self.stdout.write(f'skill facets: {len(cells)} cells, {sum(cells.values())} active skills')
+        self.stdout.write(f'skills_count: {recount_skills_counts()} profiles repaired')
+        self.stdout.write(self.style.SUCCESS('Counters reconciled.'))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.reviews import update_trending
+
+
+class Command(BaseCommand):
+    help = 'Recompute the time-decayed trending score of every skill from its recent reviews.'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        trending = update_trending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated trending scores: {trending} skills with recent reviews '
+            f'in {time.perf_counter() - start:.2f} s.'))
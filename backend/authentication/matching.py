@@ -0,0 +1,444 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from .fast_lists import full_name
+from .models import Skill, UserSkillLink
+from .singleflight import SingleFlight
+
+# numpy and scipy are optional and slow to import, so they load with the
+# first index rather than with the app (signals.py imports this module).
+np = sparse = None
+_numeric_missing = False
+
+OFFERED = 'offered'
+WANTED = 'wanted'
+OTHER_SIDE = {OFFERED: WANTED, WANTED: OFFERED}
+
+# ``offers``: skills the candidate teaches that the user wants; ``wants``:
+# skills the candidate wants that the user teaches.
+Match = namedtuple('Match', ['user_id', 'score', 'offers', 'wants'])
+
+# Shown for candidates without a name; their email is never exposed.
+UNNAMED_MEMBER = 'SkillSwap member'
+
+
+def _import_numeric():
+    global np, sparse, _numeric_missing
+    if sparse is None and not _numeric_missing:
+        try:
+            import numpy
+            from scipy import sparse as scipy_sparse
+        except ImportError:  # pragma: no cover - optional dependency
+            _numeric_missing = True
+        else:
+            np, sparse = numpy, scipy_sparse
+    return sparse is not None
+
+
+def matching_available():
+    return _import_numeric()
+
+
+class MatchIndex:
+    """Sparse user x skill matrices of offered and wanted skills.
+
+    For a user ``a`` with wanted row ``W[a]`` and offered row ``O[a]``, the
+    swap candidates are the users ``b`` where both ``(O @ W[a])[b]`` (what
+    ``b`` teaches that ``a`` wants) and ``(W @ O[a])[b]`` (what ``b`` wants
+    that ``a`` teaches) are non-zero. Both vectors are column sums over the
+    handful of skills in ``a``'s rows, read straight from CSC storage, so a
+    lookup costs the size of those columns rather than the whole matrix.
+
+    Changes land in a small overlay of (user, skill) -> +1/-1 entries that
+    the lookups fold in; once it grows past ``compact_after`` entries it is
+    merged into fresh matrices.
+    """
+
+    def __init__(self, offers=(), wants=(), compact_after=1000):
+        _import_numeric()
+        self.compact_after = compact_after
+        self._user_rows = {}
+        self._user_ids = []
+        self._skill_cols = {}
+        self._skill_ids = []
+        pairs = {OFFERED: self._encode(offers), WANTED: self._encode(wants)}
+        self._pending = {kind: {} for kind in pairs}
+        self._pending_by_row = {kind: defaultdict(dict) for kind in pairs}
+        self._pending_by_col = {kind: defaultdict(dict) for kind in pairs}
+        self._build(pairs)
+
+    def _encode(self, pairs):
+        """Map (user_id, skill_id) pairs, or an (n, 2) array, to matrix positions."""
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        return (self._positions(pairs[:, 0], self._user_rows, self._user_ids),
+                self._positions(pairs[:, 1], self._skill_cols, self._skill_ids))
+
+    @classmethod
+    def _positions(cls, ids, positions, known):
+        unique, inverse = np.unique(ids, return_inverse=True)
+        mapped = np.fromiter((cls._position(value, positions, known) for value in unique.tolist()),
+                             np.int64, len(unique))
+        return mapped[inverse]
+
+    def _build(self, pairs):
+        shape = (len(self._user_ids), len(self._skill_ids))
+        self._csr = {}
+        self._csc = {}
+        for kind, (rows, cols) in pairs.items():
+            matrix = sparse.csr_matrix((np.ones(len(rows), np.int32), (rows, cols)), shape=shape)
+            matrix.sum_duplicates()
+            matrix.data[:] = 1
+            self._csr[kind] = matrix
+            self._csc[kind] = matrix.tocsc()
+        self._shape = shape
+
+    @property
+    def user_count(self):
+        return len(self._user_ids)
+
+    @property
+    def pending_count(self):
+        return sum(len(pending) for pending in self._pending.values())
+
+    def _base_cols(self, kind, row):
+        if row >= self._shape[0]:
+            return np.empty(0, np.int32)
+        matrix = self._csr[kind]
+        return matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+
+    def _base_rows(self, kind, col):
+        if col >= self._shape[1]:
+            return np.empty(0, np.int32)
+        matrix = self._csc[kind]
+        return matrix.indices[matrix.indptr[col]:matrix.indptr[col + 1]]
+
+    def _cols(self, kind, row):
+        cols = set(self._base_cols(kind, row).tolist())
+        for col, sign in self._pending_by_row[kind].get(row, {}).items():
+            if sign > 0:
+                cols.add(col)
+            else:
+                cols.discard(col)
+        return cols
+
+    def _rows(self, kind, col):
+        rows = set(self._base_rows(kind, col).tolist())
+        for row, sign in self._pending_by_col[kind].get(col, {}).items():
+            if sign > 0:
+                rows.add(row)
+            else:
+                rows.discard(row)
+        return rows
+
+    def users_with(self, kind, skill_id):
+        col = self._skill_cols.get(skill_id)
+        if col is None:
+            return set()
+        return {self._user_ids[row] for row in self._rows(kind, col)}
+
+    def skills_of(self, kind, user_id):
+        row = self._user_rows.get(user_id)
+        if row is None:
+            return set()
+        return {self._skill_ids[col] for col in self._cols(kind, row)}
+
+    def set_users(self, kind, skill_id, user_ids):
+        """Make ``user_ids`` exactly the users with ``skill_id`` on one side.
+
+        Returns the users whose matches may have changed: everyone added or
+        removed plus everyone on the other side of the skill.
+        """
+        user_ids = set(user_ids)
+        current = self.users_with(kind, skill_id)
+        changed = current ^ user_ids
+        if not changed:
+            return set()
+        affected = changed | self.users_with(OTHER_SIDE[kind], skill_id)
+        for user_id in changed:
+            self._set(kind, user_id, skill_id, 1 if user_id in user_ids else -1)
+        if self.pending_count > self.compact_after:
+            self.compact()
+        return affected
+
+    def _set(self, kind, user_id, skill_id, sign):
+        row = self._position(user_id, self._user_rows, self._user_ids)
+        col = self._position(skill_id, self._skill_cols, self._skill_ids)
+        key = (row, col)
+        pending = self._pending[kind]
+        if key in pending:
+            # Undoing an overlay entry puts the cell back to its base value.
+            del pending[key]
+            del self._pending_by_row[kind][row][col]
+            del self._pending_by_col[kind][col][row]
+        else:
+            pending[key] = sign
+            self._pending_by_row[kind][row][col] = sign
+            self._pending_by_col[kind][col][row] = sign
+
+    @staticmethod
+    def _position(value, positions, known):
+        position = positions.get(value)
+        if position is None:
+            position = positions[value] = len(known)
+            known.append(value)
+        return position
+
+    def compact(self):
+        shape = (len(self._user_ids), len(self._skill_ids))
+        for kind, pending in self._pending.items():
+            base = self._csr[kind].tocoo()
+            rows = np.concatenate([base.row, np.fromiter((r for r, _ in pending), np.int64, len(pending))])
+            cols = np.concatenate([base.col, np.fromiter((c for _, c in pending), np.int64, len(pending))])
+            data = np.concatenate([base.data, np.fromiter(pending.values(), np.int32, len(pending))])
+            matrix = sparse.csr_matrix((data, (rows, cols)), shape=shape)
+            matrix.eliminate_zeros()
+            self._csr[kind] = matrix
+            self._csc[kind] = matrix.tocsc()
+            pending.clear()
+            self._pending_by_row[kind].clear()
+            self._pending_by_col[kind].clear()
+        self._shape = shape
+
+    def _hits(self, kind, cols):
+        """Per-user count of ``cols`` held on one side (a CSC column sum)."""
+        counts = np.zeros(len(self._user_ids), np.int32)
+        matrix = self._csc[kind]
+        base_cols = [col for col in cols if col < self._shape[1]]
+        if base_cols:
+            rows = np.concatenate([matrix.indices[matrix.indptr[col]:matrix.indptr[col + 1]] for col in base_cols])
+            counts[:self._shape[0]] += np.bincount(rows, minlength=self._shape[0]).astype(np.int32)
+        by_col = self._pending_by_col[kind]
+        for col in cols:
+            for row, sign in by_col.get(col, {}).items():
+                counts[row] += sign
+        return counts
+
+    def matches(self, user_id, limit):
+        row = self._user_rows.get(user_id)
+        if row is None:
+            return []
+        wanted = self._cols(WANTED, row)
+        offered = self._cols(OFFERED, row)
+        if not wanted or not offered:
+            return []
+
+        they_offer = self._hits(OFFERED, sorted(wanted))
+        they_want = self._hits(WANTED, sorted(offered))
+        they_offer[row] = 0
+        candidates = np.flatnonzero((they_offer > 0) & (they_want > 0))
+        if not len(candidates):
+            return []
+
+        # Harmonic mean: a swap both sides get a lot out of beats a lopsided one.
+        give = they_offer[candidates].astype(np.float64)
+        take = they_want[candidates].astype(np.float64)
+        scores = 2 * give * take / (give + take)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        user_ids = np.asarray(self._user_ids, np.int64)[candidates]
+        order = np.lexsort((user_ids, -scores))
+
+        results = []
+        for i in order.tolist():
+            other = int(candidates[i])
+            results.append(Match(
+                user_id=int(user_ids[i]),
+                score=float(scores[i]),
+                offers=sorted(self._skill_ids[col] for col in wanted & self._cols(OFFERED, other)),
+                wants=sorted(self._skill_ids[col] for col in offered & self._cols(WANTED, other)),
+            ))
+        return results
+
+
+def load_links(skill_ids=None):
+    """(offers, wants) pairs of (user_id, skill_id) for active skills.
+
+    Authors offer their own active skills; everything else comes from
+    UserSkillLink. Suspended users take no part.
+    """
+    skills = Skill.objects.filter(status='active', author__is_active=True)
+    links = UserSkillLink.objects.filter(skill__status='active', user__is_active=True)
+    if skill_ids is not None:
+        skills = skills.filter(pk__in=skill_ids)
+        links = links.filter(skill_id__in=skill_ids)
+    offers = list(skills.values_list('author_id', 'pk'))
+    wants = []
+    for user_id, skill_id, kind in links.values_list('user_id', 'skill_id', 'kind').iterator(chunk_size=10000):
+        (offers if kind == OFFERED else wants).append((user_id, skill_id))
+    return offers, wants
+
+
+class MatchEngine:
+    """Per-process matching index plus an LRU of each user's top matches.
+
+    Link and skill changes made in this process are applied to the index as
+    they commit (``sync_skills``), dropping only the cached results of users
+    they can affect. Changes made by other processes are picked up by a full
+    rebuild once MATCHING_REBUILD_SECONDS have passed.
+
+    ``_lock`` guards the LRU, journal and counters and is only held briefly;
+    ``_index_lock`` serialises scoring and changes to the index, so cache
+    hits never wait for a lookup in progress.
+    """
+
+    def __init__(self, loader=load_links):
+        self._loader = loader
+        self._index = None
+        self._built_at = 0.0
+        self._results = OrderedDict()
+        self._journal = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._rebuilds = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_size(self):
+        return getattr(settings, 'MATCHING_CACHE_SIZE', 10000)
+
+    @property
+    def result_limit(self):
+        return getattr(settings, 'MATCHING_MAX_RESULTS', 50)
+
+    def _current_index(self):
+        index = self._index
+        rebuild_seconds = getattr(settings, 'MATCHING_REBUILD_SECONDS', 300)
+        if index is not None and time.monotonic() - self._built_at < rebuild_seconds:
+            return index
+        return self._rebuilds.do('index', self._rebuild)
+
+    def _rebuild(self):
+        # Load outside the lock; syncs that commit meanwhile are journaled
+        # and replayed onto the new index.
+        with self._lock:
+            if self._journal is None:
+                self._journal = []
+        offers, wants = self._loader()
+        built = MatchIndex(offers, wants, compact_after=getattr(settings, 'MATCHING_COMPACT_AFTER', 1000))
+        with self._lock:
+            for skill_id, users in self._journal or ():
+                for kind, user_ids in users.items():
+                    built.set_users(kind, skill_id, user_ids)
+            self._journal = None
+            self._index = built
+            self._built_at = time.monotonic()
+            self._results.clear()
+        return built
+
+    def matches(self, user_id):
+        index = self._current_index()
+        with self._lock:
+            cached = self._results.get(user_id)
+            if cached is not None:
+                self._results.move_to_end(user_id)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            version = self._version
+        with self._index_lock:
+            results = index.matches(user_id, self.result_limit)
+        with self._lock:
+            # A sync or rebuild that landed meanwhile may have made these stale.
+            if index is self._index and version == self._version:
+                self._results[user_id] = results
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return results
+
+    def sync_skills(self, skill_ids):
+        """Re-read the offered/wanted users of ``skill_ids`` into the index."""
+        skill_ids = set(skill_ids)
+        if not skill_ids or (self._index is None and self._journal is None):
+            return
+        offers, wants = self._loader(skill_ids)
+        users = {skill_id: {OFFERED: set(), WANTED: set()} for skill_id in skill_ids}
+        for kind, pairs in ((OFFERED, offers), (WANTED, wants)):
+            for user_id, skill_id in pairs:
+                users[skill_id][kind].add(user_id)
+
+        with self._index_lock, self._lock:
+            if self._journal is not None:
+                self._journal.extend(users.items())
+            if self._index is None:
+                return
+            affected = set()
+            for skill_id, by_kind in users.items():
+                for kind, user_ids in by_kind.items():
+                    affected |= self._index.set_users(kind, skill_id, user_ids)
+            for user_id in affected:
+                self._results.pop(user_id, None)
+            if affected:
+                self._version += 1
+
+    def sync_users(self, user_ids):
+        """Re-sync every skill the users author or link to, e.g. on suspension."""
+        if self._index is None and self._journal is None:
+            return
+        skill_ids = set(Skill.objects.filter(author_id__in=user_ids).values_list('pk', flat=True))
+        skill_ids.update(UserSkillLink.objects.filter(user_id__in=user_ids).values_list('skill_id', flat=True))
+        self.sync_skills(skill_ids)
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            index = self._index
+            return {
+                'users': index.user_count if index is not None else 0,
+                'pending': index.pending_count if index is not None else 0,
+                'cached': len(self._results),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+match_engine = MatchEngine()
+
+
+def user_skill_links(user_id):
+    """The user's offered (including authored) and wanted skill ids, as the
+    index sees them: authored skills count once they are active."""
+    authored = Skill.objects.filter(author_id=user_id, status='active').values_list('pk', flat=True)
+    links = {OFFERED: set(authored), WANTED: set()}
+    for skill_id, kind in UserSkillLink.objects.filter(user_id=user_id).values_list('skill_id', 'kind'):
+        links[kind].add(skill_id)
+    return {kind: sorted(ids) for kind, ids in links.items()}
+
+
+def match_results(user_id, limit):
+    """Top matches for ``user_id`` with the candidates' names and skill titles."""
+    matches = match_engine.matches(user_id)[:limit]
+    if not matches:
+        return []
+    users = {
+        row['pk']: row for row in User.objects.filter(
+            pk__in=[match.user_id for match in matches], is_active=True,
+        ).values('pk', 'first_name', 'last_name')
+    }
+    skill_ids = {skill_id for match in matches for skill_id in match.offers + match.wants}
+    titles = dict(Skill.objects.filter(pk__in=skill_ids).values_list('pk', 'title'))
+    results = []
+    for match in matches:
+        user = users.get(match.user_id)
+        if user is None:
+            continue
+        results.append({
+            'userId': match.user_id,
+            'name': full_name(user['first_name'], user['last_name']) or UNNAMED_MEMBER,
+            'score': round(match.score, 4),
+            'theyOffer': [{'id': pk, 'title': titles.get(pk, '')} for pk in match.offers],
+            'theyWant': [{'id': pk, 'title': titles.get(pk, '')} for pk in match.wants],
+        })
+    return results
@@ -0,0 +1,139 @@
+"""Change feed for the admin inbox.
+
+Every contact message write appends a MessageEvent in the same transaction
+(signals.py for saves and deletes, MessageViewSet.status_changed for bulk
+updates), so event ids order the changes and a client resumes from the
+last one it saw. After commit a wake-up goes out on the chat broker;
+open streams then read the log past their position. The wake-up carries
+no data, and every heartbeat re-reads the log anyway, so a lost one only
+delays delivery. With the default LocalBackend wake-ups stay inside one
+worker: streams held by other workers see a change at their next heartbeat
+(MESSAGE_STREAM_HEARTBEAT_SECONDS) unless CHAT_BROKER_BACKEND is shared.
+"""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from .broker import get_broker
+from .counters import get_counters
+from .fast_lists import MESSAGE_LIST_FIELDS, list_rows
+from .models import Message, MessageEvent
+
+MESSAGE_EVENTS_CHANNEL = 'admin:messages'
+
+
+def record_message_events(kind, statuses):
+    """Log ``kind`` for every ``{message_id: status}``."""
+    MessageEvent.objects.bulk_create([
+        MessageEvent(message_id=pk, kind=kind, status=status or '') for pk, status in statuses.items()
+    ])
+    transaction.on_commit(wake_message_streams)
+
+
+def wake_message_streams():
+    async_to_sync(get_broker().publish)(MESSAGE_EVENTS_CHANNEL, '')
+
+
+def prune_message_events(keep=None):
+    """Drop all but the newest ``keep`` events; returns how many went."""
+    keep = keep if keep is not None else getattr(settings, 'MESSAGE_EVENTS_RETAIN', 10000)
+    latest = MessageEvent.objects.order_by('-pk').values_list('pk', flat=True).first()
+    if latest is None:
+        return 0
+    deleted, _ = MessageEvent.objects.filter(pk__lte=latest - keep).delete()
+    return deleted
+
+
+def resume_position(since):
+    """``(position, reset)`` for a stream asking for events after ``since``.
+
+    With no ``since`` the stream starts at the present. ``reset`` means
+    events after ``since`` were pruned, so the client must reload the list.
+    """
+    ids = MessageEvent.objects.order_by('pk').values_list('pk', flat=True)
+    latest = ids.reverse().first() or 0
+    if since is None:
+        return latest, False
+    oldest = ids.first()
+    if oldest is not None and since < oldest - 1:
+        return latest, True
+    return min(since, latest), False
+
+
+def message_events_after(since, limit=None):
+    """The next events after ``since``, oldest first.
+
+    ``created`` events carry the message as the admin list renders it;
+    the others carry its id and, for status changes, the new status.
+    """
+    limit = limit or getattr(settings, 'MESSAGE_EVENTS_BATCH_SIZE', 500)
+    events = list(
+        MessageEvent.objects.filter(pk__gt=since).order_by('pk')
+        .values_list('pk', 'message_id', 'kind', 'status')[:limit]
+    )
+    created = {message_id for _, message_id, kind, _ in events if kind == 'created'}
+    rows = list_rows(Message.objects.filter(pk__in=created), MESSAGE_LIST_FIELDS) if created else {}
+    results = []
+    for pk, message_id, kind, status in events:
+        message = rows.get(message_id) if kind == 'created' else None
+        if message is None:
+            message = {'id': message_id, 'status': status} if status else {'id': message_id}
+        results.append({'id': pk, 'type': kind, 'message': message})
+    return results
+
+
+def badge():
+    return {'newMessages': get_counters().new_messages}
+
+
+class _Waker:
+    """Broker subscriber that only flags a stream to re-read the log."""
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def offer(self, text):
+        self._loop.call_soon_threadsafe(self.event.set)
+
+
+def _sse(event, data, event_id=None):
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+async def stream_message_events(since):
+    """Server-Sent Events: ``created``, ``status`` and ``deleted`` with the
+    event id as the SSE id, ``badge`` after each batch, ``reset`` when the
+    client fell out of the retained log."""
+    broker = get_broker()
+    waker = _Waker()
+    heartbeat = getattr(settings, 'MESSAGE_STREAM_HEARTBEAT_SECONDS', 15)
+    limit = getattr(settings, 'MESSAGE_EVENTS_BATCH_SIZE', 500)
+    # Subscribe first so nothing committed after the position is read goes unseen.
+    await broker.subscribe(MESSAGE_EVENTS_CHANNEL, waker)
+    try:
+        since, reset = await sync_to_async(resume_position)(since)
+        yield f'retry: {int(heartbeat * 1000)}\n\n'
+        if reset:
+            yield _sse('reset', {}, since)
+        yield _sse('badge', await sync_to_async(badge)())
+        while True:
+            waker.event.clear()
+            events = await sync_to_async(message_events_after)(since, limit)
+            if events:
+                for event in events:
+                    yield _sse(event['type'], event['message'], event['id'])
+                since = events[-1]['id']
+                yield _sse('badge', await sync_to_async(badge)())
+                if len(events) == limit:
+                    continue
+            try:
+                await asyncio.wait_for(waker.event.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+    finally:
+        await broker.unsubscribe(MESSAGE_EVENTS_CHANNEL, waker)
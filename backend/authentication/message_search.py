@@ -0,0 +1,181 @@
+"""Full-text search over the admin inbox.
+
+On SQLite, contact messages are indexed by an FTS5 table,
+``message_search``, with one row per message (rowid = message id) covering
+the sender's name and email, the message and the reply. The reply lives in
+another table, so unlike ``skill_search`` the index keeps its own copy of
+the text instead of reading an external-content table; that also lets
+triggers on both tables update it by rowid, with no need to replay old
+values. ``update()`` and bulk deletes are covered too.
+
+Queries are prefix-matched per term (see search.py). Relevance order ranks
+the newest MESSAGE_SEARCH_RANK_WINDOW matches with BM25, weighting the
+sender over the message over the reply, so a common term costs the same
+in an inbox of millions; ``sort=newest`` walks the index in rowid order and
+stops at the page limit. Highlights come from FTS5's snippet() and
+highlight(), escaped here and marked up with ``<mark>``. Other databases
+fall back to unranked substring matching without highlights.
+"""
+from html import escape
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+
+from .fast_lists import MESSAGE_LIST_FIELDS, list_rows
+from .models import Message, MessageReply
+from .search import fts_query, search_terms
+
+MESSAGE_SEARCH_TABLE = 'message_search'
+MESSAGE_SEARCH_COLUMNS = ('name', 'email', 'message', 'reply')
+# BM25 weights, in MESSAGE_SEARCH_COLUMNS order.
+MESSAGE_SEARCH_WEIGHTS = (8.0, 8.0, 2.0, 1.0)
+SNIPPET_TOKENS = 16
+
+# FTS5 wraps matches in these; they can't occur in escaped text.
+_OPEN, _CLOSE = '\x02', '\x03'
+
+
+def _search_triggers(messages, replies):
+    table = MESSAGE_SEARCH_TABLE
+    reply = f'(SELECT content FROM {replies} WHERE message_id = new.id)'
+    return {
+        f'{table}_ai': (
+            f'AFTER INSERT ON {messages} BEGIN '
+            f'INSERT INTO {table}(rowid, name, email, message, reply) '
+            f'VALUES (new.id, new.name, new.email, new.message, {reply}); END'),
+        f'{table}_au': (
+            f'AFTER UPDATE OF name, email, message ON {messages} BEGIN '
+            f'UPDATE {table} SET name = new.name, email = new.email, message = new.message '
+            f'WHERE rowid = new.id; END'),
+        f'{table}_ad': f'AFTER DELETE ON {messages} BEGIN DELETE FROM {table} WHERE rowid = old.id; END',
+        f'{table}_ri': (
+            f'AFTER INSERT ON {replies} BEGIN '
+            f'UPDATE {table} SET reply = new.content WHERE rowid = new.message_id; END'),
+        f'{table}_ru': (
+            f'AFTER UPDATE OF content, message_id ON {replies} BEGIN '
+            f'UPDATE {table} SET reply = NULL WHERE rowid = old.message_id; '
+            f'UPDATE {table} SET reply = new.content WHERE rowid = new.message_id; END'),
+        f'{table}_rd': (
+            f'AFTER DELETE ON {replies} BEGIN '
+            f'UPDATE {table} SET reply = NULL WHERE rowid = old.message_id; END'),
+    }
+
+
+def _rebuild_message_search_index(cursor, messages, replies):
+    cursor.execute(f'DELETE FROM {MESSAGE_SEARCH_TABLE}')
+    cursor.execute(
+        f'INSERT INTO {MESSAGE_SEARCH_TABLE}(rowid, name, email, message, reply) '
+        f'SELECT m.id, m.name, m.email, m.message, r.content '
+        f'FROM {messages} m LEFT JOIN {replies} r ON r.message_id = m.id')
+
+
+def ensure_message_search_index(using=None):
+    """Create the FTS5 table and its triggers if they're missing, rebuilding
+    the index when anything had to be recreated (see ensure_search_index)."""
+    conn = connections[using or 'default']
+    if conn.vendor != 'sqlite':
+        return
+    messages, replies = Message._meta.db_table, MessageReply._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        if messages not in existing or replies not in existing:
+            return
+
+        created = False
+        if MESSAGE_SEARCH_TABLE not in existing:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {MESSAGE_SEARCH_TABLE} USING fts5("
+                f"{', '.join(MESSAGE_SEARCH_COLUMNS)}, "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+            created = True
+        for name, body in _search_triggers(messages, replies).items():
+            if name not in existing:
+                cursor.execute(f'CREATE TRIGGER {name} {body}')
+                created = True
+        if created:
+            _rebuild_message_search_index(cursor, messages, replies)
+
+
+def drop_message_search_index(using=None):
+    conn = connections[using or 'default']
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for name in _search_triggers(Message._meta.db_table, MessageReply._meta.db_table):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {MESSAGE_SEARCH_TABLE}')
+
+
+def _marked(text):
+    """Escape FTS5 output and turn its match markers into <mark> tags."""
+    if text is None:
+        return None
+    return escape(text).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+def search_messages(query, status=None, offset=0, limit=20, sort=None):
+    """``[(message_id, highlight)]`` for messages matching ``query``.
+
+    Best match first, or newest first with ``sort='newest'``. ``highlight``
+    holds the marked-up name and email and a snippet of the best-matching
+    longer passage; it is None on databases without FTS5.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if connection.vendor != 'sqlite':
+        return _fallback_search(terms, status, offset, limit)
+
+    table = MESSAGE_SEARCH_TABLE
+    match = fts_query(terms)
+    where = [f'{table} MATCH %s']
+    params = [match]
+    source = table
+    if status:
+        source += f' JOIN {Message._meta.db_table} m ON m.id = {table}.rowid'
+        where.append('m.status = %s')
+        params.append(status)
+    if sort == 'newest':
+        order = f'{table}.rowid DESC'
+    else:
+        # Rank only the newest matches: the window's lower rowid bound is
+        # a range FTS5 applies while reading its index, so the cost of
+        # scoring stays flat however many old messages also match.
+        where.append(
+            f'{table}.rowid >= coalesce((SELECT rowid FROM {table} WHERE {table} MATCH %s '
+            f'ORDER BY rowid DESC LIMIT 1 OFFSET %s), 0)')
+        params += [match, getattr(settings, 'MESSAGE_SEARCH_RANK_WINDOW', 10000) - 1]
+        weights = ', '.join(str(weight) for weight in MESSAGE_SEARCH_WEIGHTS)
+        order = f'bm25({table}, {weights}), {table}.rowid DESC'
+    marks = f"'{_OPEN}', '{_CLOSE}'"
+    sql = (
+        f'SELECT {table}.rowid, highlight({table}, 0, {marks}), highlight({table}, 1, {marks}), '
+        f"snippet({table}, -1, {marks}, '…', {SNIPPET_TOKENS}) "
+        f'FROM {source} WHERE {" AND ".join(where)} ORDER BY {order} LIMIT %s OFFSET %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit, offset])
+        return [
+            (pk, {'name': _marked(name), 'email': _marked(email), 'snippet': _marked(snippet)})
+            for pk, name, email, snippet in cursor.fetchall()
+        ]
+
+
+def _fallback_search(terms, status, offset, limit):
+    messages = Message.objects.all()
+    if status:
+        messages = messages.filter(status=status)
+    for term in terms:
+        messages = messages.filter(
+            Q(name__icontains=term) | Q(email__icontains=term)
+            | Q(message__icontains=term) | Q(reply__content__icontains=term))
+    ids = messages.order_by('-id').values_list('id', flat=True)[offset:offset + limit]
+    return [(pk, None) for pk in ids]
+
+
+def message_results(matches):
+    """Admin list rows for ``matches``, in order, each with its highlight."""
+    rows = list_rows(Message.objects.filter(pk__in=[pk for pk, _ in matches]), MESSAGE_LIST_FIELDS)
+    return [{**rows[pk], 'highlight': highlight} for pk, highlight in matches if pk in rows]
@@ -0,0 +1,48 @@
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .settings_cache import get_system_settings
+
+# Still served during maintenance: the admin API and Django admin, so the
+# site can be brought back, plus the endpoints the app uses to check status.
+MAINTENANCE_EXEMPT_VIEWS = {'status', 'async-status', 'async-login', 'metrics'}
+MAINTENANCE_EXEMPT_PREFIXES = ('admin-', 'admin:')
+
+REGISTRATION_VIEWS = {'register', 'async-register'}
+
+
+class SystemSettingsMiddleware(MiddlewareMixin):
+    """Applies maintenance mode and the registration toggle before any view runs.
+
+    Reads the cached SystemSettings, so it adds no queries in the steady
+    state. google_auth can also create accounts and checks the toggle itself.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        view_name = match.view_name if match is not None else ''
+        system_settings = get_system_settings()
+
+        if system_settings.maintenance_mode and not self.is_exempt(view_name):
+            response = JsonResponse({
+                'status': 'error',
+                'message': 'SkillSwap is down for maintenance. Please try again later.',
+                'code': 'server/maintenance'
+            }, status=503)
+            response['Retry-After'] = '300'
+            return response
+
+        if view_name in REGISTRATION_VIEWS and not system_settings.allow_new_registrations:
+            return registration_closed()
+        return None
+
+    def is_exempt(self, view_name):
+        return view_name in MAINTENANCE_EXEMPT_VIEWS or view_name.startswith(MAINTENANCE_EXEMPT_PREFIXES)
+
+
+def registration_closed():
+    return JsonResponse({
+        'status': 'error',
+        'message': 'New registrations are currently closed',
+        'code': 'auth/registration-disabled'
+    }, status=403)
@@ -0,0 +1,59 @@
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+
+def backfill_firebase_uids(apps, schema_editor):
+    """Give every user a profile and copy uid-style usernames into firebase_uid.
+
+    Runs in small transactions keyed on user id so a large users table is never
+    locked for the whole backfill. Users whose username is their email are
+    linked to their uid on their next sign-in instead.
+    """
+    User = apps.get_model('auth', 'User')
+    UserProfile = apps.get_model('authentication', 'UserProfile')
+
+    last_id = 0
+    while True:
+        users = list(
+            User.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'username')[:BATCH_SIZE]
+        )
+        if not users:
+            break
+        last_id = users[-1][0]
+
+        with transaction.atomic(using=schema_editor.connection.alias):
+            profiles = {
+                profile.user_id: profile
+                for profile in UserProfile.objects.filter(user_id__in=[user_id for user_id, _ in users])
+            }
+            created = []
+            updated = []
+            for user_id, username in users:
+                uid = username if '@' not in username else None
+                profile = profiles.get(user_id)
+                if profile is None:
+                    created.append(UserProfile(user_id=user_id, firebase_uid=uid))
+                elif uid and not profile.firebase_uid:
+                    profile.firebase_uid = uid
+                    updated.append(profile)
+            UserProfile.objects.bulk_create(created)
+            UserProfile.objects.bulk_update(updated, ['firebase_uid'])
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='firebase_uid',
+            field=models.CharField(blank=True, max_length=128, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_firebase_uids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+def create_counters(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Skill = apps.get_model('authentication', 'Skill')
+    Message = apps.get_model('authentication', 'Message')
+    StatsCounters = apps.get_model('authentication', 'StatsCounters')
+
+    StatsCounters.objects.update_or_create(pk=1, defaults={
+        'total_users': User.objects.count(),
+        'active_users': User.objects.filter(is_active=True).count(),
+        'total_skills': Skill.objects.count(),
+        'pending_skills': Skill.objects.filter(status='pending').count(),
+        'new_messages': Message.objects.filter(status='new').count(),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_userprofile_firebase_uid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_users', models.BigIntegerField(default=0)),
+                ('active_users', models.BigIntegerField(default=0)),
+                ('total_skills', models.BigIntegerField(default=0)),
+                ('pending_skills', models.BigIntegerField(default=0)),
+                ('new_messages', models.BigIntegerField(default=0)),
+                ('last_reconciled', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_counters, migrations.RunPython.noop),
+    ]
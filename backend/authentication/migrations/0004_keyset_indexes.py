@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_statscounters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['created_at', 'id'], name='message_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['created_at', 'id'], name='skill_created_id_idx'),
+        ),
+        # auth.User belongs to django.contrib, so its keyset index is added here.
+        migrations.RunSQL(
+            'CREATE INDEX user_joined_id_idx ON auth_user (date_joined, id);',
+            'DROP INDEX user_joined_id_idx;',
+        ),
+    ]
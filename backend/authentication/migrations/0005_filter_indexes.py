@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='message_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='skill_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category', 'status', 'created_at', 'id'], name='skill_category_status_idx'),
+        ),
+        # Django writes boolean filters as bare `is_active` / `NOT is_active`,
+        # which can't seek into an index led by is_active. Suspended users are
+        # the rare case, so they get a partial index; the active list walks
+        # user_joined_id_idx and almost every row it visits matches.
+        migrations.RunSQL(
+            'CREATE INDEX user_suspended_joined_idx ON auth_user (date_joined, id) WHERE NOT is_active;',
+            'DROP INDEX user_suspended_joined_idx;',
+        ),
+    ]
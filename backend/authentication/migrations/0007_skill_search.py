@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    from authentication.search import ensure_search_index
+    ensure_search_index(schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    from authentication.search import drop_search_index
+    drop_search_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_systemsettings_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='description',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='level',
+            field=models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced')], default='beginner', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # FTS5 index over title, description and category (SQLite only).
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
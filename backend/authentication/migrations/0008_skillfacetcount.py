@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:23
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField
+from django.db.models.functions import Cast, Floor, Least
+
+
+def create_facet_counts(apps, schema_editor):
+    Skill = apps.get_model('authentication', 'Skill')
+    SkillFacetCount = apps.get_model('authentication', 'SkillFacetCount')
+
+    # One GROUP BY over the active skills; half-star buckets, capped at 10.
+    cells = (
+        Skill.objects.filter(status='active')
+        .annotate(bucket=Least(Cast(Floor(models.F('rating') * 2), IntegerField()), 10))
+        .values('category', 'level', 'bucket')
+        .annotate(count=Count('id'))
+    )
+    SkillFacetCount.objects.bulk_create(
+        SkillFacetCount(category=cell['category'], level=cell['level'],
+                        rating_bucket=max(cell['bucket'], 0), count=cell['count'])
+        for cell in cells
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_skill_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('level', models.CharField(max_length=20)),
+                ('rating_bucket', models.PositiveSmallIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'level', 'rating_bucket'), name='skill_facet_cell_unique')],
+            },
+        ),
+        migrations.RunPython(create_facet_counts, migrations.RunPython.noop),
+    ]
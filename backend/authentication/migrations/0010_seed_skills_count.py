@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def seed_skills_count(apps, schema_editor):
+    # skills_count was never maintained before; start it from the real totals.
+    Skill = apps.get_model('authentication', 'Skill')
+    UserProfile = apps.get_model('authentication', 'UserProfile')
+    authored = (Skill.objects.filter(author_id=OuterRef('user_id')).order_by()
+                .values('author_id').annotate(total=Count('pk')).values('total'))
+    UserProfile.objects.update(skills_count=Coalesce(Subquery(authored), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_userskilllink'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_skills_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Cast, Round
+
+
+def seed_rating_sum(apps, schema_editor):
+    # Keep sum / count equal to any rating already stored on a skill.
+    Skill = apps.get_model('authentication', 'Skill')
+    Skill.objects.filter(review_count__gt=0).update(
+        rating_sum=Cast(Round(models.F('rating') * models.F('review_count')), models.IntegerField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_seed_skills_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('comment', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['status', 'rating', 'id'], name='skill_status_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['status', 'trending_score', 'id'], name='skill_status_trending_idx'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='reviewer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='authentication.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['skill', 'created_at', 'id'], name='review_skill_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='review_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('skill', 'reviewer'), name='review_skill_reviewer_unique'),
+        ),
+        migrations.RunPython(seed_rating_sum, migrations.RunPython.noop),
+    ]
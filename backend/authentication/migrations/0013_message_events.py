@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0012_chat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('status', 'Status changed'), ('deleted', 'Deleted')], max_length=10)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
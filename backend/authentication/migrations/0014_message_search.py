@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_message_search_index(apps, schema_editor):
+    from authentication.message_search import ensure_message_search_index
+    ensure_message_search_index(schema_editor.connection.alias)
+
+
+def drop_message_search_index(apps, schema_editor):
+    from authentication.message_search import drop_message_search_index
+    drop_message_search_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0013_message_events'),
+    ]
+
+    operations = [
+        # FTS5 index over sender, message and reply (SQLite only).
+        migrations.RunPython(create_message_search_index, drop_message_search_index),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    firebase_uid = models.CharField(max_length=128, unique=True, null=True, blank=True)
     is_admin = models.BooleanField(default=False)
     skills_count = models.IntegerField(default=0)
     last_active = models.DateTimeField(auto_now=True)
@@ -13,14 +16,67 @@ class Skill(models.Model):
         ('pending', 'Pending'),
         ('rejected', 'Rejected'),
     ]
+    LEVEL_CHOICES = [
+        ('beginner', 'Beginner'),
+        ('intermediate', 'Intermediate'),
+        ('advanced', 'Advanced'),
+    ]
 
     title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, default='')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     category = models.CharField(max_length=100)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='beginner')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Running review totals, kept current by reviews.py on every review write.
+    rating = models.FloatField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    # Time-decayed review score, refreshed by the update_trending command.
+    trending_score = models.FloatField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='skill_created_id_idx'),
+            # Moderation queue (status=pending) and per-category views, newest first.
+            models.Index(fields=['status', 'created_at', 'id'], name='skill_status_created_idx'),
+            models.Index(fields=['category', 'status', 'created_at', 'id'], name='skill_category_status_idx'),
+            # Top-N and sort-by-rating over the active catalog.
+            models.Index(fields=['status', 'rating', 'id'], name='skill_status_rating_idx'),
+            models.Index(fields=['status', 'trending_score', 'id'], name='skill_status_trending_idx'),
+        ]
+
+    # Written only with F() updates (reviews.py, update_trending); saving a
+    # loaded skill must not write back a stale copy of them.
+    AGGREGATE_FIELDS = frozenset({'rating', 'rating_sum', 'review_count', 'trending_score'})
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+class Review(models.Model):
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='reviews')
+    reviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
+    rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    comment = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'reviewer'], name='review_skill_reviewer_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['skill', 'created_at', 'id'], name='review_skill_created_idx'),
+            # The trending job only reads the recent window.
+            models.Index(fields=['created_at'], name='review_created_idx'),
+        ]
+
 class Message(models.Model):
     STATUS_CHOICES = [
         ('new', 'New'),
@@ -34,15 +90,130 @@ class Message(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='message_created_id_idx'),
+            # Inbox (status=new) and the read/archived tabs, newest first.
+            models.Index(fields=['status', 'created_at', 'id'], name='message_status_created_idx'),
+        ]
+
 class MessageReply(models.Model):
     message = models.OneToOneField(Message, on_delete=models.CASCADE, related_name='reply')
     admin = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+class ArchivedMessage(models.Model):
+    """A Message moved out of the live tables by ``manage.py archive_messages``,
+    with its reply folded in. Ids are the original Message ids."""
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    message = models.TextField()
+    status = models.CharField(max_length=20, choices=Message.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    reply_id = models.BigIntegerField(null=True)
+    reply_admin = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+    reply_content = models.TextField(null=True)
+    reply_created_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='archived_message_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='archived_message_status_idx'),
+        ]
+
+class MessageEvent(models.Model):
+    """Append-only log of contact message changes, read by the admin feed."""
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('status', 'Status changed'),
+        ('deleted', 'Deleted'),
+    ]
+
+    # Not a foreign key: deletions are logged too, after the row is gone.
+    message_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
 class SystemSettings(models.Model):
     maintenance_mode = models.BooleanField(default=False)
     allow_new_registrations = models.BooleanField(default=True)
     skill_approval_required = models.BooleanField(default=True)
     max_skills_per_user = models.IntegerField(default=10)
     last_updated = models.DateTimeField(auto_now=True)
+    # Bumped on every save so cached copies can tell they're stale.
+    version = models.PositiveIntegerField(default=0)
+
+class StatsCounters(models.Model):
+    # Single row (pk=1) of running totals behind the admin dashboard, kept up
+    # to date by the signal handlers in signals.py.
+    total_users = models.BigIntegerField(default=0)
+    active_users = models.BigIntegerField(default=0)
+    total_skills = models.BigIntegerField(default=0)
+    pending_skills = models.BigIntegerField(default=0)
+    new_messages = models.BigIntegerField(default=0)
+    last_reconciled = models.DateTimeField(null=True, blank=True)
+
+class SkillFacetCount(models.Model):
+    # Active skills per (category, level, half-star rating bucket), kept up
+    # to date on write so facet counts never need a GROUP BY over skills.
+    category = models.CharField(max_length=100)
+    level = models.CharField(max_length=20)
+    rating_bucket = models.PositiveSmallIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'level', 'rating_bucket'], name='skill_facet_cell_unique'),
+        ]
+
+class UserSkillLink(models.Model):
+    # A skill a user can teach (beyond the ones they authored) or wants to
+    # learn; the matching engine pairs the two sides up. See matching.py.
+    KIND_CHOICES = [
+        ('offered', 'Offered'),
+        ('wanted', 'Wanted'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='user_links')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'skill', 'kind'], name='user_skill_link_unique'),
+        ]
+
+class Conversation(models.Model):
+    # One per pair of users, stored with the lower user id first.
+    user_a = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    user_b = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_message_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_a', 'user_b'], name='conversation_pair_unique'),
+            models.CheckConstraint(condition=models.Q(user_a__lt=models.F('user_b')), name='conversation_pair_ordered'),
+        ]
+        indexes = [
+            # Each user's inbox, most recently active first.
+            models.Index(fields=['user_a', 'last_message_at', 'id'], name='conversation_user_a_idx'),
+            models.Index(fields=['user_b', 'last_message_at', 'id'], name='conversation_user_b_idx'),
+        ]
+
+class ChatMessage(models.Model):
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # History pages are keyed on id, which follows insertion order.
+            models.Index(fields=['conversation', 'id'], name='chat_message_history_idx'),
+        ]
@@ -0,0 +1,114 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset pagination on ``(<view.keyset_field>, id)``, newest first.
+
+    The cursor is the position of the last row served, so each page is an
+    index range scan from that point: cost stays flat however deep the client
+    pages, unlike OFFSET which rescans every skipped row. ``?ordering=<field>``
+    walks the same index oldest first.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field = view.keyset_field
+        descending = self.get_descending(request, field)
+
+        if descending:
+            queryset = queryset.order_by(f'-{field}', '-id')
+            after = 'lt'
+        else:
+            queryset = queryset.order_by(field, 'id')
+            after = 'gt'
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            position, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'{field}__{after}': position}) | Q(**{field: position, f'id__{after}': pk}))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = rows[-1]
+            if isinstance(last, dict):
+                # values() querysets from the fast list path
+                self.next_cursor = self.encode_cursor(last[field], last['id'])
+            else:
+                self.next_cursor = self.encode_cursor(getattr(last, field), last.id)
+        return rows
+
+    def get_descending(self, request, field):
+        ordering = request.query_params.get(self.ordering_query_param, f'-{field}')
+        if ordering not in (field, f'-{field}'):
+            raise ValidationError({self.ordering_query_param: f'Expected {field} or -{field}.'})
+        return ordering.startswith('-')
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'PAGE_SIZE', 50)
+        maximum = getattr(settings, 'MAX_PAGE_SIZE', 500)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            size = default
+        return max(1, min(size, maximum))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = parse_datetime(position)
+            pk = int(pk)
+        except (TypeError, ValueError, binascii.Error, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if position is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position, pk
+
+    def encode_cursor(self, position, pk):
+        raw = json.dumps([position.isoformat(), pk]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'nextCursor': self.next_cursor,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'nextCursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
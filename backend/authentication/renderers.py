@@ -0,0 +1,32 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(BaseRenderer):
+    """Compact JSON renderer using orjson when it is installed.
+
+    Anything orjson doesn't handle natively (including datetimes, so their
+    format matches DRF's JSONRenderer) goes through DRF's own encoder.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is not None:
+            return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        return json.dumps(
+            data, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':'),
+        ).encode('utf-8')
@@ -0,0 +1,104 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Q, QuerySet, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.utils import timezone
+
+from .facets import adjust_facets, facet_key
+from .models import Review, Skill
+
+# Contributions older than this many half-lives are below 0.1% and skipped.
+TRENDING_WINDOW_HALF_LIVES = 10
+
+
+def apply_review(skill_id, rating_delta, count_delta):
+    """Fold a review write into the skill's running sum, count and mean.
+
+    One UPDATE computes all three from the stored values, so concurrent
+    reviews can't lose each other's changes. The row read beforehand is only
+    used to move the skill between facet cells when its rating bucket changes.
+    """
+    previous = (
+        Skill.objects.select_for_update().filter(pk=skill_id)
+        .values_list('status', 'category', 'level', 'rating_sum', 'review_count', 'rating').first()
+    )
+    if previous is None:
+        return
+    status, category, level, total, count, rating = previous
+    Skill.objects.filter(pk=skill_id).update(
+        rating_sum=F('rating_sum') + rating_delta,
+        review_count=F('review_count') + count_delta,
+        rating=Cast(F('rating_sum') + rating_delta, FloatField()) / Greatest(F('review_count') + count_delta, 1),
+    )
+    if status == 'active':
+        count += count_delta
+        new_rating = (total + rating_delta) / count if count else 0.0
+        old_cell, new_cell = facet_key(category, level, rating), facet_key(category, level, new_rating)
+        if old_cell != new_cell:
+            adjust_facets({old_cell: -1, new_cell: 1})
+
+
+def recount_ratings():
+    """Rewrite drifted rating aggregates from the reviews; returns how many."""
+    reviews = Review.objects.filter(skill_id=OuterRef('pk')).order_by().values('skill_id')
+    total = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0)
+    count = Coalesce(Subquery(reviews.annotate(count=Count('pk')).values('count')), 0)
+    drifted = Skill.objects.annotate(actual_sum=total, actual_count=count).filter(
+        ~Q(rating_sum=F('actual_sum')) | ~Q(review_count=F('actual_count')))
+    return drifted.update(
+        rating_sum=total,
+        review_count=count,
+        rating=Cast(total, FloatField()) / Greatest(count, 1),
+    )
+
+
+def skill_is_being_deleted(skill_id, origin):
+    """Whether a cascading delete started at ``origin`` also removes the skill.
+
+    Reviews are deleted before their skill, and folding them into a row that
+    is about to go would only knock the skill's facet cell out of step.
+    """
+    if isinstance(origin, QuerySet):
+        if origin.model is Skill:
+            return origin.filter(pk=skill_id).exists()
+        if origin.model is User:
+            return Skill.objects.filter(pk=skill_id, author__in=origin).exists()
+    elif isinstance(origin, Skill):
+        return origin.pk == skill_id
+    elif isinstance(origin, User):
+        return Skill.objects.filter(pk=skill_id, author_id=origin.pk).exists()
+    return False
+
+
+def trending_scores(now=None):
+    """``{skill_id: score}``: each recent review weighted by rating / 5 and
+    halved every TRENDING_HALF_LIFE_HOURS."""
+    now = now or timezone.now()
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 72) * 3600
+    cutoff = now - timedelta(seconds=half_life * TRENDING_WINDOW_HALF_LIVES)
+    decay = math.log(2) / half_life
+    scores = defaultdict(float)
+    reviews = Review.objects.filter(created_at__gte=cutoff).values_list('skill_id', 'rating', 'created_at')
+    for skill_id, rating, created_at in reviews.iterator(chunk_size=5000):
+        scores[skill_id] += rating / 5 * math.exp(-decay * (now - created_at).total_seconds())
+    return scores
+
+
+def update_trending(now=None, batch_size=500):
+    """Rewrite Skill.trending_score; returns the number of trending skills."""
+    scores = trending_scores(now)
+    with transaction.atomic():
+        # Start from zero so skills whose reviews all aged out drop off.
+        Skill.objects.filter(trending_score__gt=0).update(trending_score=0)
+        ids = sorted(scores)
+        for start in range(0, len(ids), batch_size):
+            Skill.objects.bulk_update(
+                [Skill(pk=pk, trending_score=round(scores[pk], 6)) for pk in ids[start:start + batch_size]],
+                ['trending_score'],
+            )
+    return len(scores)
@@ -0,0 +1,196 @@
+"""Full-text search over active skills.
+
+On SQLite active skills are indexed by an FTS5 table, ``skill_search``,
+an external-content index over the skills table that triggers keep in step
+with every insert, update and delete (bulk writes and ``update()``
+included). Queries are prefix-matched per term and ranked with BM25,
+weighting title over description over category. Other databases fall back
+to unranked substring matching.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .fast_lists import format_datetime, full_name
+from .models import Skill
+
+SEARCH_TABLE = 'skill_search'
+SEARCH_COLUMNS = ('title', 'description', 'category')
+# BM25 weights, in SEARCH_COLUMNS order.
+SEARCH_WEIGHTS = (10.0, 2.0, 1.0)
+MAX_TERMS = 8
+# Orderings other than relevance, each backed by a (status, column, id) index.
+SORT_COLUMNS = {'newest': 'created_at', 'rating': 'rating', 'trending': 'trending_score'}
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    return _TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def fts_query(terms):
+    # Every term is quoted, so user input can't inject FTS5 operators; the
+    # trailing * makes each one a prefix match and juxtaposition means AND.
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _search_triggers(table):
+    # Only active skills are indexed, so a search never has to look rows up
+    # in the skills table just to drop pending or rejected ones. 'delete'
+    # must only be issued for rows that are in the index.
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    delete = (f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {columns}) "
+              f"VALUES ('delete', old.id, {old_values});")
+    insert = f'INSERT INTO {SEARCH_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});'
+    changed = f'UPDATE OF {columns}, status ON {table}'
+    return {
+        f'{SEARCH_TABLE}_ai': f"AFTER INSERT ON {table} WHEN new.status = 'active' BEGIN {insert} END",
+        f'{SEARCH_TABLE}_ad': f"AFTER DELETE ON {table} WHEN old.status = 'active' BEGIN {delete} END",
+        f'{SEARCH_TABLE}_ud': f"BEFORE {changed} WHEN old.status = 'active' BEGIN {delete} END",
+        f'{SEARCH_TABLE}_ui': f"AFTER {changed} WHEN new.status = 'active' BEGIN {insert} END",
+    }
+
+
+def _rebuild_search_index(cursor, table):
+    columns = ', '.join(SEARCH_COLUMNS)
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('delete-all')")
+    cursor.execute(
+        f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) "
+        f"SELECT id, {columns} FROM {table} WHERE status = 'active'")
+
+
+def ensure_search_index(using=None):
+    """Create the FTS5 table and its triggers if they're missing.
+
+    SQLite migrations that rebuild the skills table drop its triggers, so
+    this also runs after every migrate; when anything had to be recreated
+    the index is rebuilt from the table.
+    """
+    from django.db import connections
+
+    conn = connections[using or 'default']
+    if conn.vendor != 'sqlite':
+        return
+    table = Skill._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        if table not in existing:
+            return
+
+        created = False
+        if SEARCH_TABLE not in existing:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5({', '.join(SEARCH_COLUMNS)}, "
+                f"content='{table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+            created = True
+        for name, body in _search_triggers(table).items():
+            if name not in existing:
+                cursor.execute(f'CREATE TRIGGER {name} {body}')
+                created = True
+        if created:
+            _rebuild_search_index(cursor, table)
+
+
+def drop_search_index(using=None):
+    from django.db import connections
+
+    conn = connections[using or 'default']
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for name in _search_triggers(Skill._meta.db_table):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def find_skill_ids(query='', category=None, level=None, min_rating=None, offset=0, limit=20, sort=None):
+    """Ids of active skills matching ``query``, best match first.
+
+    ``sort`` (a SORT_COLUMNS key) orders by that column instead, highest
+    first. Without search terms this browses the filtered catalog, newest
+    first unless sorted otherwise.
+    """
+    terms = search_terms(query)
+    if not terms:
+        column = SORT_COLUMNS[sort or 'newest']
+        skills = filter_skills(Skill.objects.all(), category, level, min_rating)
+        return list(skills.order_by(f'-{column}', '-id').values_list('id', flat=True)[offset:offset + limit])
+    if connection.vendor != 'sqlite':
+        return _fallback_search_ids(terms, category, level, min_rating, offset, limit, sort)
+
+    table = Skill._meta.db_table
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+    where = [f'{SEARCH_TABLE} MATCH %s']
+    params = [fts_query(terms)]
+    if category:
+        where.append('s.category = %s')
+        params.append(category)
+    if level:
+        where.append('s.level = %s')
+        params.append(level)
+    if min_rating is not None:
+        where.append('s.rating >= %s')
+        params.append(min_rating)
+    # The index holds active skills only; join the table just for filters
+    # and non-relevance sorts.
+    source = SEARCH_TABLE
+    if len(where) > 1 or sort:
+        source += f' JOIN {table} s ON s.id = {SEARCH_TABLE}.rowid'
+    if sort:
+        order = f's.{SORT_COLUMNS[sort]} DESC, s.id DESC'
+    else:
+        order = f'bm25({SEARCH_TABLE}, {weights}), {SEARCH_TABLE}.rowid'
+    sql = (
+        f'SELECT {SEARCH_TABLE}.rowid FROM {source} WHERE {" AND ".join(where)} '
+        f'ORDER BY {order} LIMIT %s OFFSET %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_search_ids(terms, category, level, min_rating, offset, limit, sort):
+    skills = filter_skills(Skill.objects.all(), category, level, min_rating)
+    for term in terms:
+        skills = skills.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    column = SORT_COLUMNS[sort or 'newest']
+    return list(skills.order_by(f'-{column}', '-id').values_list('id', flat=True)[offset:offset + limit])
+
+
+def filter_skills(skills, category=None, level=None, min_rating=None):
+    skills = skills.filter(status='active')
+    if category:
+        skills = skills.filter(category=category)
+    if level:
+        skills = skills.filter(level=level)
+    if min_rating is not None:
+        skills = skills.filter(rating__gte=min_rating)
+    return skills
+
+
+def skill_results(ids):
+    """Search result rows for ``ids``, in the order given."""
+    rows = Skill.objects.filter(pk__in=ids).values(
+        'id', 'title', 'description', 'category', 'level', 'rating', 'review_count', 'created_at',
+        'author__first_name', 'author__last_name')
+    by_id = {row['id']: row for row in rows}
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'category': row['category'],
+            'level': row['level'],
+            'author': full_name(row['author__first_name'], row['author__last_name']),
+            'rating': row['rating'],
+            'reviews': row['review_count'],
+            'createdAt': format_datetime(row['created_at']),
+        }
+        for row in map(by_id.get, ids) if row is not None
+    ]
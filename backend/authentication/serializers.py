@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import UserProfile, Skill, Message, MessageReply, SystemSettings
+from .models import UserProfile, Skill, Review, Message, MessageReply, SystemSettings, ArchivedMessage
+
+# The admin viewsets select_related everything these serializers read
+# (userprofile, author, reply and reply.admin), so listing N rows costs
+# one query rather than 1 + N or 1 + 2N.
 
 class UserManagementSerializer(serializers.ModelSerializer):
     name = serializers.CharField(source='get_full_name')
@@ -35,8 +39,25 @@ class SkillModerationSerializer(serializers.ModelSerializer):
         model = Skill
         fields = ['id', 'title', 'author', 'category', 'status', 'created_at', 'last_modified']
 
+class SkillSerializer(serializers.ModelSerializer):
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = Skill
+        fields = ['id', 'title', 'description', 'category', 'level', 'status', 'createdAt']
+        read_only_fields = ['status']
+
+class ReviewSerializer(serializers.ModelSerializer):
+    reviewer = serializers.CharField(source='reviewer.get_full_name', read_only=True)
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ['id', 'rating', 'comment', 'reviewer', 'createdAt']
+
 class MessageReplySerializer(serializers.ModelSerializer):
-    adminName = serializers.CharField(source='admin.get_full_name')
+    messageId = serializers.IntegerField(source='message_id', read_only=True)
+    adminName = serializers.CharField(source='admin.get_full_name', allow_null=True, read_only=True)
     createdAt = serializers.DateTimeField(source='created_at')
 
     class Meta:
@@ -51,6 +72,27 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = ['id', 'name', 'email', 'message', 'status', 'createdAt', 'reply']
 
+class ArchivedMessageSerializer(serializers.ModelSerializer):
+    createdAt = serializers.DateTimeField(source='created_at')
+    reply = serializers.SerializerMethodField()
+    archivedAt = serializers.DateTimeField(source='archived_at')
+
+    class Meta:
+        model = ArchivedMessage
+        fields = ['id', 'name', 'email', 'message', 'status', 'createdAt', 'reply', 'archivedAt']
+
+    def get_reply(self, message):
+        # Same shape as MessageReplySerializer; the reply is folded into the row.
+        if message.reply_id is None:
+            return None
+        return {
+            'id': message.reply_id,
+            'messageId': message.id,
+            'adminName': message.reply_admin.get_full_name() if message.reply_admin else None,
+            'content': message.reply_content,
+            'createdAt': serializers.DateTimeField().to_representation(message.reply_created_at),
+        }
+
 class SystemSettingsSerializer(serializers.ModelSerializer):
     maintenanceMode = serializers.BooleanField(source='maintenance_mode')
     allowNewRegistrations = serializers.BooleanField(source='allow_new_registrations')
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import SystemSettings
+
+
+def load_system_settings():
+    row = SystemSettings.objects.order_by('pk').first()
+    return row or SystemSettings.objects.create()
+
+
+class SystemSettingsCache:
+    """Process-wide copy of the SystemSettings row.
+
+    Reads are served from memory. Every save bumps the row's ``version``
+    (see signals.py); once SYSTEM_SETTINGS_RECHECK_SECONDS has passed, the
+    next read fetches just that column and reloads the row only if it moved,
+    so other processes pick up a change within the recheck interval. Saves
+    made in this process invalidate the copy straight away.
+
+    The cached instance is shared; don't modify it.
+    """
+
+    def __init__(self):
+        self._settings = None
+        self._checked_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def recheck_seconds(self):
+        return getattr(settings, 'SYSTEM_SETTINGS_RECHECK_SECONDS', 5)
+
+    def peek(self):
+        """The cached settings if they need no recheck, else None."""
+        current = self._settings
+        if current is not None and time.monotonic() - self._checked_at < self.recheck_seconds:
+            return current
+        return None
+
+    def get(self):
+        current = self.peek()
+        if current is not None:
+            return current
+
+        # Query outside the lock: saving the row invalidates through it.
+        with self._lock:
+            generation = self._generation
+            current = self._settings
+        if current is not None:
+            version = SystemSettings.objects.filter(pk=current.pk).values_list('version', flat=True).first()
+            if version != current.version:
+                current = None
+        if current is None:
+            current = load_system_settings()
+
+        with self._lock:
+            if generation == self._generation:
+                self._settings = current
+                self._checked_at = time.monotonic()
+        return current
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._settings = None
+
+
+system_settings_cache = SystemSettingsCache()
+
+
+def get_system_settings():
+    return system_settings_cache.get()
+
+
+async def aget_system_settings():
+    # The steady state needs no thread hop.
+    current = system_settings_cache.peek()
+    if current is not None:
+        return current
+    return await sync_to_async(system_settings_cache.get)()
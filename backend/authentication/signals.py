@@ -0,0 +1,197 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .counters import adjust_counters, adjust_skills_count
+from .facets import adjust_facets, facet_key
+from .matching import match_engine
+from .message_events import record_message_events
+from .models import Message, Review, Skill, SystemSettings, UserProfile, UserSkillLink
+from .reviews import apply_review, skill_is_being_deleted
+from .settings_cache import system_settings_cache
+from .user_resolution import resolution_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_resolved_user(sender, instance, **kwargs):
+    resolution_cache.invalidate_user(instance.id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_resolved_profile(sender, instance, **kwargs):
+    resolution_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=SystemSettings)
+def bump_system_settings_version(sender, instance, **kwargs):
+    SystemSettings.objects.filter(pk=instance.pk).update(version=F('version') + 1)
+    system_settings_cache.invalidate()
+    # A reader may reload the old row before this commits; drop it again after.
+    transaction.on_commit(system_settings_cache.invalidate)
+
+
+# Dashboard counters. pre_save remembers the stored value of the counted
+# field so post_save can tell a status change from a no-op save; the
+# adjustments run inside the same transaction as the write itself.
+
+def _remember_previous(sender, instance, field):
+    if instance._state.adding or instance.pk is None:
+        instance._counted_previous = None
+    else:
+        instance._counted_previous = (
+            sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+        )
+
+
+@receiver(pre_save, sender=User)
+def remember_user_state(sender, instance, **kwargs):
+    _remember_previous(sender, instance, 'is_active')
+
+
+@receiver(post_save, sender=User)
+def count_user_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_counters(total_users=1, active_users=int(instance.is_active))
+    elif instance._counted_previous is not None and instance._counted_previous != instance.is_active:
+        adjust_counters(active_users=1 if instance.is_active else -1)
+        transaction.on_commit(lambda: match_engine.sync_users([instance.pk]))
+
+
+@receiver(post_delete, sender=User)
+def count_user_delete(sender, instance, **kwargs):
+    adjust_counters(total_users=-1, active_users=-int(instance.is_active))
+
+
+@receiver(pre_save, sender=Skill)
+def remember_skill_state(sender, instance, update_fields=None, **kwargs):
+    # The facet cells and skills_count need more than the status, so one
+    # query fetches it all.
+    previous = None
+    if not (instance._state.adding or instance.pk is None):
+        previous = sender.objects.filter(pk=instance.pk).values_list(
+            'status', 'category', 'level', 'rating', 'author_id').first()
+    if previous and update_fields is not None and 'rating' not in update_fields:
+        # The stored rating stays; file the skill under it, not a stale copy.
+        instance.rating = previous[3]
+    instance._counted_previous = previous[0] if previous else None
+    instance._facet_previous = previous[:4] if previous else None
+    instance._author_previous = previous[4] if previous else None
+
+
+@receiver(post_save, sender=Skill)
+def count_skill_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_counters(total_skills=1, pending_skills=int(instance.status == 'pending'))
+        if not getattr(instance, '_skills_count_reserved', False):
+            adjust_skills_count(instance.author_id, 1)
+    elif instance._counted_previous is not None:
+        was_pending = instance._counted_previous == 'pending'
+        adjust_counters(pending_skills=int(instance.status == 'pending') - int(was_pending))
+        if instance._author_previous != instance.author_id:
+            adjust_skills_count(instance._author_previous, -1)
+            adjust_skills_count(instance.author_id, 1)
+
+    deltas = Counter()
+    previous = getattr(instance, '_facet_previous', None)
+    if previous is not None and previous[0] == 'active':
+        deltas[facet_key(*previous[1:])] -= 1
+    if instance.status == 'active':
+        deltas[facet_key(instance.category, instance.level, instance.rating)] += 1
+    adjust_facets(deltas)
+
+    was_active = previous is not None and previous[0] == 'active'
+    if was_active != (instance.status == 'active'):
+        _sync_matches(instance.pk)
+
+
+@receiver(pre_delete, sender=Skill)
+def remember_deleted_skill(sender, instance, **kwargs):
+    # Review aggregates are written with update(), so the instance being
+    # deleted may hold a stale rating; take the facet cell from the row.
+    instance._facet_previous = sender.objects.filter(pk=instance.pk).values_list(
+        'status', 'category', 'level', 'rating').first()
+
+
+@receiver(post_delete, sender=Skill)
+def count_skill_delete(sender, instance, **kwargs):
+    adjust_counters(total_skills=-1, pending_skills=-int(instance.status == 'pending'))
+    adjust_skills_count(instance.author_id, -1)
+    stored = getattr(instance, '_facet_previous', None) or (
+        instance.status, instance.category, instance.level, instance.rating)
+    if stored[0] == 'active':
+        adjust_facets({facet_key(*stored[1:]): -1})
+        _sync_matches(instance.pk)
+
+
+# The matching index only learns about committed changes; see matching.py.
+
+def _sync_matches(skill_id):
+    transaction.on_commit(lambda: match_engine.sync_skills([skill_id]))
+
+
+@receiver(post_save, sender=UserSkillLink)
+def sync_link_save(sender, instance, created, **kwargs):
+    if created:
+        _sync_matches(instance.skill_id)
+
+
+@receiver(post_delete, sender=UserSkillLink)
+def sync_link_delete(sender, instance, **kwargs):
+    _sync_matches(instance.skill_id)
+
+
+# Skill rating aggregates; see reviews.py.
+
+@receiver(pre_save, sender=Review)
+def remember_review_state(sender, instance, **kwargs):
+    previous = None
+    if not (instance._state.adding or instance.pk is None):
+        previous = sender.objects.filter(pk=instance.pk).values_list('skill_id', 'rating').first()
+    instance._rating_previous = previous
+
+
+@receiver(post_save, sender=Review)
+def aggregate_review_save(sender, instance, created, **kwargs):
+    previous = None if created else instance._rating_previous
+    if previous is None:
+        apply_review(instance.skill_id, instance.rating, 1)
+    elif previous[0] != instance.skill_id:
+        apply_review(previous[0], -previous[1], -1)
+        apply_review(instance.skill_id, instance.rating, 1)
+    elif previous[1] != instance.rating:
+        apply_review(instance.skill_id, instance.rating - previous[1], 0)
+
+
+@receiver(post_delete, sender=Review)
+def aggregate_review_delete(sender, instance, origin=None, **kwargs):
+    if not skill_is_being_deleted(instance.skill_id, origin):
+        apply_review(instance.skill_id, -instance.rating, -1)
+
+
+@receiver(pre_save, sender=Message)
+def remember_message_state(sender, instance, **kwargs):
+    _remember_previous(sender, instance, 'status')
+
+
+@receiver(post_save, sender=Message)
+def count_message_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_counters(new_messages=int(instance.status == 'new'))
+        record_message_events('created', {instance.pk: instance.status})
+    elif instance._counted_previous is not None:
+        was_new = instance._counted_previous == 'new'
+        adjust_counters(new_messages=int(instance.status == 'new') - int(was_new))
+        if instance._counted_previous != instance.status:
+            record_message_events('status', {instance.pk: instance.status})
+
+
+@receiver(post_delete, sender=Message)
+def count_message_delete(sender, instance, **kwargs):
+    adjust_counters(new_messages=-int(instance.status == 'new'))
+    record_message_events('deleted', {instance.pk: None})
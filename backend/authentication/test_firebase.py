@@ -1,16 +1,17 @@
 import os
+import unittest
 import django
-from django.test import TestCase
-from firebase_admin import auth
-from .firebase_config import initialize_firebase
 
 # Set up Django settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
 django.setup()
 
-# Initialize Firebase Admin SDK
-initialize_firebase()
+from django.conf import settings
+from django.test import TestCase
+# The Firebase Admin SDK is initialized on first use
+from .firebase_config import auth
 
+@unittest.skipUnless(os.path.exists(settings.FIREBASE_CREDENTIALS), 'Firebase credentials not available')
 class FirebaseAuthTest(TestCase):
     def setUp(self):
         self.test_email = f'test{os.urandom(4).hex()}@example.com'
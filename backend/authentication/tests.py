@@ -1,3 +1,1838 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import threading
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.utils.encoders import JSONEncoder
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from skillswap_backend.asgi import application as asgi_application
+
+from . import async_views, firebase_cache
+from .archive import archive_messages
+from .broker import get_broker
+from .chat import get_or_create_conversation
+from .message_events import MESSAGE_EVENTS_CHANNEL, prune_message_events
+from .websocket import CLOSE_TRY_AGAIN_LATER, ChatConnection
+from .firebase_cache import FirebaseIdentity
+from .counters import SkillLimitReached, count_from_scratch, create_skill, get_counters
+from .firebase_standin import FirebaseStandIn
+from .instrumentation import InstrumentationMiddleware, registry, render_prometheus, system_health
+from .facets import count_facets_from_scratch
+from .matching import OFFERED, WANTED, MatchIndex, match_engine, matching_available
+from .models import (
+    ArchivedMessage, Message, MessageEvent, MessageReply, Review, Skill, SkillFacetCount, StatsCounters, SystemSettings, UserProfile,
+    UserSkillLink,
+)
+from .reviews import update_trending
+from .settings_cache import get_system_settings, system_settings_cache
+from .user_resolution import get_or_create_firebase_user, resolution_cache, resolve_uid
+from .views import MessageViewSet, SkillModerationViewSet, UserManagementViewSet
+
+
+def run_concurrently(target, args_list):
+    barrier = threading.Barrier(len(args_list))
+    results = [None] * len(args_list)
+
+    def worker(index, args):
+        barrier.wait()
+        results[index] = target(*args)
+
+    threads = [threading.Thread(target=worker, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class FirebaseStandInTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.standin = FirebaseStandIn()
+        for i in range(3):
+            cls.standin.add_user(f'user{i}', f'user{i}@example.com')
+        cls.installed = cls.standin.installed()
+        cls.installed.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.installed.__exit__(None, None, None)
+        super().tearDownClass()
+
+    def setUp(self):
+        firebase_cache.token_cache.clear()
+        firebase_cache.user_cache.clear()
+        self.standin.calls.clear()
+
+    def test_repeat_token_skips_verification(self):
+        id_token = self.standin.mint_token('user0')
+
+        first = firebase_cache.verify_id_token(id_token)
+        second = firebase_cache.verify_id_token(id_token)
+
+        self.assertEqual(first['uid'], 'user0')
+        self.assertEqual(second, first)
+        self.assertEqual(self.standin.calls['verify_id_token'], 1)
+
+    def test_tampered_token_is_rejected(self):
+        header, payload, signature = self.standin.mint_token('user0').split('.')
+        tampered = '.'.join([header, payload, signature[::-1]])
+
+        with self.assertRaises(firebase_cache.auth.InvalidIdTokenError):
+            firebase_cache.verify_id_token(tampered)
+
+    def test_concurrent_user_lookups_share_get_users_calls(self):
+        uids = [f'user{i % 3}' for i in range(30)]
+        # Lookups arriving while the first call is in flight share the next one.
+        self.standin.latency = 0.1
+        self.addCleanup(setattr, self.standin, 'latency', 0)
+
+        records = run_concurrently(firebase_cache.get_user_record, [(uid,) for uid in uids])
+
+        self.assertEqual([record.uid for record in records], uids)
+        self.assertLessEqual(self.standin.calls['get_users'], 2)
+
+
+class VerifiedTokenCacheTest(SimpleTestCase):
+    def test_hit_until_the_token_expires(self):
+        cache = firebase_cache.VerifiedTokenCache(maxsize=10)
+        now = time.time()
+        cache.set('token', {'uid': 'ada', 'exp': now + 60})
+
+        claims = cache.get('token')
+        self.assertEqual(claims, {'uid': 'ada', 'exp': now + 60})
+        claims['uid'] = 'changed'
+        self.assertEqual(cache.get('token')['uid'], 'ada')
+
+        with mock.patch.object(firebase_cache.time, 'time', return_value=now + 61):
+            self.assertIsNone(cache.get('token'))
+        self.assertIsNone(cache.get('token'))
+        self.assertEqual(cache.stats(), {'size': 0, 'hits': 2, 'misses': 2})
+
+    def test_expired_or_undated_claims_are_not_stored(self):
+        cache = firebase_cache.VerifiedTokenCache(maxsize=10)
+        cache.set('old', {'uid': 'ada', 'exp': time.time() - 1})
+        cache.set('undated', {'uid': 'ada'})
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = firebase_cache.VerifiedTokenCache(maxsize=2)
+        exp = time.time() + 60
+        cache.set('a', {'uid': 'a', 'exp': exp})
+        cache.set('b', {'uid': 'b', 'exp': exp})
+        cache.get('a')
+        cache.set('c', {'uid': 'c', 'exp': exp})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([cache.get(token)['uid'] for token in 'ac'], ['a', 'c'])
+
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats(), {'size': 0, 'hits': 0, 'misses': 1})
+
+
+class SigningKeyCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = firebase_cache.SigningKeyCache()
+        self.cache._delegate = self.delegate = mock.Mock(side_effect=self.respond)
+        self.cache_control = 'public, max-age=60'
+        self.now = 1000.0
+        patcher = mock.patch.object(firebase_cache.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def respond(self, url, **kwargs):
+        return mock.Mock(status=200, headers={'cache-control': self.cache_control}, data=b'{}')
+
+    def test_keys_are_held_for_max_age(self):
+        first = self.cache('https://keys')
+        self.assertIs(self.cache('https://keys'), first)
+        self.now += 59
+        self.assertIs(self.cache('https://keys'), first)
+        self.now += 2
+        self.assertIsNot(self.cache('https://keys'), first)
+        self.assertEqual(self.delegate.call_count, 2)
+        self.assertEqual(self.cache.stats(), {'size': 1, 'hits': 2, 'misses': 2})
+
+    def test_uncacheable_responses_are_fetched_every_time(self):
+        for cache_control in ('no-cache', 'max-age=60, no-store', ''):
+            self.cache_control = cache_control
+            self.cache('https://keys')
+        self.cache('https://keys', method='POST')
+        self.assertEqual(self.delegate.call_count, 4)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+        self.cache_control = 'max-age=60'
+        self.cache('https://keys')
+        self.cache.clear()
+        self.cache('https://keys')
+        self.assertEqual(self.delegate.call_count, 6)
+
+
+class UserRecordCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = firebase_cache.UserRecordCache(maxsize=300, ttl=60)
+        self.known = {f'user{i}' for i in range(300)}
+        self.requested = []
+        patcher = mock.patch.object(firebase_cache.auth, 'get_users', side_effect=self.get_users)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_users(self, identifiers):
+        uids = [identifier.uid for identifier in identifiers]
+        self.requested.append(uids)
+        return SimpleNamespace(users=[SimpleNamespace(uid=uid) for uid in uids if uid in self.known])
+
+    def test_hit_until_ttl_then_refetch(self):
+        now = time.monotonic()
+        self.assertEqual(self.cache.get('user0').uid, 'user0')
+        self.assertEqual(self.cache.get('user0').uid, 'user0')
+        with mock.patch.object(firebase_cache.time, 'monotonic', return_value=now + 61):
+            self.cache.get('user0')
+        self.assertEqual(self.requested, [['user0'], ['user0']])
+        self.assertEqual(self.cache.stats(), {'size': 1, 'hits': 1, 'misses': 2, 'upstreamCalls': 2})
+
+    def test_invalidate_and_refresh_go_upstream(self):
+        self.cache.get('user0')
+        self.cache.invalidate('user0')
+        self.cache.get('user0')
+        self.cache.get('user0', refresh=True)
+        self.assertEqual(len(self.requested), 3)
+
+    def test_unknown_users(self):
+        with self.assertRaises(firebase_cache.auth.UserNotFoundError):
+            self.cache.get('nobody')
+        self.assertEqual(set(self.cache.get_many(['user1', 'nobody', 'user1'])), {'user1'})
+
+    def test_batches_respect_the_get_users_limit(self):
+        uids = [f'user{i}' for i in range(250)]
+        self.assertEqual(len(self.cache.get_many(uids)), 250)
+        self.assertEqual([len(batch) for batch in self.requested], [100, 100, 50])
+
+        self.cache.get_many(uids[:10] + ['user299'])
+        self.assertEqual(self.requested[-1], ['user299'])
+
+    def test_misses_queue_behind_a_call_in_flight(self):
+        entered, release = threading.Event(), threading.Event()
+        get_users = self.get_users
+
+        def slow_first_call(identifiers):
+            if not self.requested:
+                entered.set()
+                release.wait(5)
+            return get_users(identifiers)
+
+        firebase_cache.auth.get_users.side_effect = slow_first_call
+        first = threading.Thread(target=self.cache.get, args=('user0',))
+        first.start()
+        entered.wait(5)
+        others = [threading.Thread(target=self.cache.get, args=(uid,)) for uid in ('user1', 'user2', 'user1')]
+        for thread in others:
+            thread.start()
+        while len(self.cache._queue) < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in [first, *others]:
+            thread.join()
+
+        self.assertEqual(self.requested, [['user0'], ['user1', 'user2']])
+
+    def test_caller_returns_once_its_own_call_is_done(self):
+        entered = [threading.Event(), threading.Event()]
+        release = [threading.Event(), threading.Event()]
+        get_users = self.get_users
+
+        def blocking_call(identifiers):
+            call = len(self.requested)
+            entered[call].set()
+            release[call].wait(5)
+            return get_users(identifiers)
+
+        firebase_cache.auth.get_users.side_effect = blocking_call
+        first = threading.Thread(target=self.cache.get, args=('user0',))
+        first.start()
+        entered[0].wait(5)
+        second = threading.Thread(target=self.cache.get, args=('user1',))
+        second.start()
+        while not self.cache._queue:
+            time.sleep(0.001)
+
+        release[0].set()
+        self.assertTrue(entered[1].wait(5))
+        # user1 is in flight now, sent by its own caller rather than the first.
+        first.join(5)
+        self.assertFalse(first.is_alive())
+        self.assertTrue(second.is_alive())
+
+        release[1].set()
+        second.join(5)
+        self.assertEqual(self.requested, [['user0'], ['user1']])
+
+
+class SingleFlightVerificationTest(SimpleTestCase):
+    def setUp(self):
+        firebase_cache.token_cache.clear()
+        self.upstream_calls = Counter()
+        self.lock = threading.Lock()
+
+    def fake_verify(self, id_token):
+        with self.lock:
+            self.upstream_calls[id_token] += 1
+        time.sleep(0.05)
+        return {'uid': f'uid-{id_token}', 'exp': time.time() + 3600}
+
+    def test_one_upstream_call_per_unique_token(self):
+        tokens = [f'token-{i}' for i in range(5)]
+        args_list = [(tokens[i % len(tokens)],) for i in range(100)]
+
+        with mock.patch.object(firebase_cache.auth, 'verify_id_token', side_effect=self.fake_verify):
+            results = run_concurrently(firebase_cache.verify_id_token, args_list)
+
+        self.assertEqual(self.upstream_calls, Counter({token: 1 for token in tokens}))
+        for (token,), claims in zip(args_list, results):
+            self.assertEqual(claims['uid'], f'uid-{token}')
+
+    def test_errors_are_shared_and_not_cached(self):
+        error = firebase_cache.auth.InvalidIdTokenError('bad token')
+
+        def slow_failure(id_token):
+            # Long enough for every thread released by the barrier to join the call.
+            time.sleep(0.2)
+            raise error
+
+        with mock.patch.object(firebase_cache.auth, 'verify_id_token', side_effect=slow_failure) as verify:
+            results = run_concurrently(self.verify_or_error, [('bad',)] * 10)
+            self.assertTrue(all(result is error for result in results))
+            self.assertEqual(verify.call_count, 1)
+
+            calls = verify.call_count
+            self.verify_or_error('bad')
+            self.assertEqual(verify.call_count, calls + 1)
+
+    def verify_or_error(self, id_token):
+        try:
+            return firebase_cache.verify_id_token(id_token)
+        except Exception as e:
+            return e
+
+
+class SingleFlightUserCreationTest(TransactionTestCase):
+    def setUp(self):
+        resolution_cache.clear()
+
+    def test_concurrent_creation_creates_one_user(self):
+        identity = FirebaseIdentity('uid-1', 'one@example.com', True, None, None)
+
+        results = run_concurrently(get_or_create_firebase_user, [(identity,)] * 20)
+
+        self.assertEqual(User.objects.filter(email='one@example.com').count(), 1)
+        self.assertEqual(UserProfile.objects.filter(firebase_uid='uid-1').count(), 1)
+        self.assertEqual(len({resolved.user_id for resolved, _ in results}), 1)
+
+    def test_get_or_create_is_idempotent(self):
+        identity = FirebaseIdentity('uid-2', 'two@example.com', True, None, None)
+
+        first, created = get_or_create_firebase_user(identity)
+        self.assertTrue(created)
+
+        resolution_cache.clear()
+        second, created = get_or_create_firebase_user(identity)
+        self.assertFalse(created)
+        self.assertEqual(first.user_id, second.user_id)
+
+
+class StatsCountersTest(TestCase):
+    def assertCountersMatch(self):
+        counters = get_counters()
+        for field, expected in count_from_scratch().items():
+            self.assertEqual(getattr(counters, field), expected, field)
+
+    def test_counters_follow_writes(self):
+        user = User.objects.create_user(username='a@example.com', email='a@example.com')
+        skill = Skill.objects.create(title='Guitar', author=user, category='Music')
+        message = Message.objects.create(name='A', email='a@example.com', message='Hi')
+        self.assertCountersMatch()
+
+        user.is_active = False
+        user.save()
+        skill.status = 'active'
+        skill.save()
+        message.status = 'read'
+        message.save()
+        self.assertCountersMatch()
+
+        message.delete()
+        user.delete()
+        self.assertCountersMatch()
+        self.assertEqual(get_counters().total_skills, 0)
+
+    def test_recount_repairs_drift(self):
+        User.objects.create_user(username='b@example.com', email='b@example.com')
+        StatsCounters.objects.update(total_users=42)
+
+        call_command('recount_stats', stdout=io.StringIO())
+
+        self.assertCountersMatch()
+
+
+class AdminTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin@example.com', email='admin@example.com')
+        UserProfile.objects.create(user=cls.admin, firebase_uid='admin', is_admin=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+
+class KeysetPaginationTest(AdminTestCase):
+    def test_pages_cover_every_row_once_newest_first(self):
+        Skill.objects.bulk_create(
+            Skill(title=f'Skill {i}', author=self.admin, category='Music') for i in range(7))
+        # Identical timestamps force the id tie-breaker to do the work.
+        Skill.objects.filter(id__in=Skill.objects.values('id')[:4]).update(
+            created_at=Skill.objects.order_by('id').first().created_at)
+
+        seen = []
+        url = '/auth/admin/skills/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Skill.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/auth/admin/messages/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class AdminListTestCase(AdminTestCase):
+    def create_rows(self, count, start):
+        for i in range(start, start + count):
+            user = User.objects.create_user(
+                username=f'user{i}@example.com', email=f'user{i}@example.com', first_name=f'User{i}')
+            UserProfile.objects.create(user=user, firebase_uid=f'user{i}')
+            Skill.objects.create(title=f'Skill {i}', author=user, category='Music')
+            message = Message.objects.create(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hi')
+            if i % 2:
+                MessageReply.objects.create(message=message, admin=self.admin, content='Thanks')
+
+    def serializer_rows(self, viewset):
+        view = viewset()
+        queryset = view.get_queryset().order_by(f'-{view.keyset_field}', '-id')
+        return json.loads(json.dumps(view.get_serializer_class()(queryset, many=True).data, cls=JSONEncoder))
+
+
+class AdminListQueryCountTest(AdminListTestCase):
+    """List endpoints must cost the same number of queries for any page size."""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(response.data['results'])
+
+    def test_constant_queries_per_list_request(self):
+        for url in ('/auth/admin/users/', '/auth/admin/skills/', '/auth/admin/messages/'):
+            with self.subTest(url=url):
+                Message.objects.all().delete()
+                Skill.objects.all().delete()
+                User.objects.exclude(pk=self.admin.pk).delete()
+
+                self.create_rows(2, start=0)
+                small, small_rows = self.count_queries(url + '?page_size=500')
+                self.create_rows(40, start=2)
+                large, large_rows = self.count_queries(url + '?page_size=500')
+
+                self.assertGreater(large_rows, small_rows)
+                self.assertEqual(small, large)
+                self.assertLessEqual(large, 2)
+
+    def test_message_reply_shape(self):
+        self.create_rows(2, start=0)
+        response = self.client.get('/auth/admin/messages/')
+        replies = [row['reply'] for row in response.data['results']]
+        self.assertIn(None, replies)
+        reply = next(r for r in replies if r)
+        self.assertEqual(set(reply), {'id', 'messageId', 'adminName', 'content', 'createdAt'})
+
+
+class FastListTest(AdminListTestCase):
+    def test_matches_serializer_output(self):
+        self.create_rows(3, start=0)
+        for url, viewset in (('/auth/admin/users/', UserManagementViewSet),
+                             ('/auth/admin/skills/', SkillModerationViewSet),
+                             ('/auth/admin/messages/', MessageViewSet)):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(json.loads(response.content)['results'], self.serializer_rows(viewset))
+
+    def test_sparse_fieldsets(self):
+        self.create_rows(2, start=0)
+        response = self.client.get('/auth/admin/users/?fields=id,name')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(set(row) == {'id', 'name'} for row in response.data['results']))
+
+        response = self.client.get('/auth/admin/users/?fields=id,password')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTest(AdminListTestCase):
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_matches_list_rows(self):
+        self.create_rows(5, start=0)
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/auth/admin/messages/export/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        exported = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(sorted(exported, key=lambda row: row['id']),
+                         sorted(self.serializer_rows(MessageViewSet), key=lambda row: row['id']))
+
+    def test_gzipped_csv(self):
+        self.create_rows(3, start=0)
+        response = self.client.get('/auth/admin/users/export/?output=csv&gzip=1&fields=id,email')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+
+        lines = gzip.decompress(self.read(response)).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'id,email')
+        self.assertEqual(len(lines), 1 + User.objects.count())
+
+    def test_first_row_is_sent_before_the_first_chunk_fills(self):
+        self.create_rows(5, start=0)
+        with self.settings(EXPORT_CHUNK_SIZE=3):
+            response = self.client.get('/auth/admin/messages/export/')
+            chunks = [chunk.count(b'\n') for chunk in response.streaming_content]
+        self.assertEqual(chunks, [1, 3, 1])
+
+    def test_csv_cells_cannot_start_formulas(self):
+        Message.objects.create(name='=HYPERLINK("http://evil")', email='@evil.example', message='-1+1')
+        Message.objects.create(name='Ann', email='ann@example.com', message='Hi')
+
+        response = self.client.get('/auth/admin/messages/export/?output=csv&fields=name,email,message')
+        rows = list(csv.reader(io.StringIO(self.read(response).decode('utf-8'))))
+
+        self.assertEqual(rows[1], ['\'=HYPERLINK("http://evil")', "'@evil.example", "'-1+1"])
+        self.assertEqual(rows[2], ['Ann', 'ann@example.com', 'Hi'])
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/auth/admin/skills/export/?output=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkModerationTest(AdminListTestCase):
+    def assertCountersMatch(self):
+        counters = get_counters()
+        for field, expected in count_from_scratch().items():
+            self.assertEqual(getattr(counters, field), expected, field)
+
+    def test_bulk_by_ids_reports_each_id(self):
+        self.create_rows(4, start=0)
+        skills = list(Skill.objects.order_by('id').values_list('id', flat=True))
+        first = Skill.objects.get(pk=skills[0])
+        first.status = 'active'
+        first.save()
+
+        response = self.client.post('/auth/admin/skills/bulk/', {
+            'ids': skills + [999999], 'status': 'active'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = {row['id']: row['result'] for row in response.data['results']}
+        self.assertEqual(results[skills[0]], 'unchanged')
+        self.assertEqual(results[999999], 'not_found')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertFalse(Skill.objects.filter(status='pending').exists())
+        self.assertCountersMatch()
+
+    def test_bulk_by_filter(self):
+        self.create_rows(3, start=0)
+        response = self.client.post('/auth/admin/messages/bulk/', {
+            'filter': {'status': 'new'}, 'status': 'archived'}, format='json')
+
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(Message.objects.filter(status='archived').count(), 3)
+        self.assertCountersMatch()
+
+    def test_bulk_suspend_invalidates_resolved_users(self):
+        self.create_rows(2, start=0)
+        user = User.objects.get(username='user0@example.com')
+        self.assertTrue(resolve_uid('user0').is_active)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/auth/admin/users/bulk/', {
+                'ids': [user.pk], 'status': 'suspended'}, format='json')
+
+        self.assertEqual(response.data['updated'], 1)
+        self.assertFalse(resolve_uid('user0').is_active)
+        self.assertCountersMatch()
+
+    def test_invalid_requests(self):
+        for body in ({'ids': [1], 'status': 'pending'},
+                     {'status': 'active'},
+                     {'filter': {'title': 'x'}, 'status': 'active'},
+                     {'filter': {'author': 'abc'}, 'status': 'active'},
+                     {'filter': {'author': None}, 'status': 'active'}):
+            with self.subTest(body=body):
+                response = self.client.post('/auth/admin/skills/bulk/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_bulk_by_ids_reads_in_chunks(self):
+        self.create_rows(5, start=0)
+        skills = list(Skill.objects.order_by('id').values_list('id', flat=True))
+
+        with mock.patch('authentication.bulk.UPDATE_CHUNK_SIZE', 2), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/auth/admin/skills/bulk/', {
+                'ids': skills + [999999], 'status': 'active'}, format='json')
+
+        self.assertEqual(response.data['updated'], 5)
+        self.assertEqual(response.data['notFound'], 1)
+        reads = [q['sql'] for q in queries
+                 if q['sql'].startswith('SELECT "authentication_skill"."id" AS "pk", "authentication_skill"."status"')]
+        self.assertEqual(len(reads), 3)
+        self.assertCountersMatch()
+
+    def test_partial_update(self):
+        self.create_rows(1, start=0)
+        skill = Skill.objects.get()
+
+        response = self.client.patch(f'/auth/admin/skills/{skill.pk}/', {'status': 'rejected'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        skill.refresh_from_db()
+        self.assertEqual(skill.status, 'rejected')
+        self.assertEqual(self.client.patch('/auth/admin/skills/999999/', {'status': 'rejected'}).status_code, 404)
+        self.assertCountersMatch()
+
+
+class AdminListFilterTest(AdminListTestCase):
+    def plan(self, url):
+        """EXPLAIN QUERY PLAN for the page query a list request runs."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = next(query['sql'] for query in queries
+                   if 'LIMIT' in query['sql'] and 'authentication_systemsettings' not in query['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def test_filtered_pages_use_composite_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('query plans are checked on SQLite')
+        self.create_rows(3, start=0)
+        cases = [
+            ('/auth/admin/skills/?status=pending', 'skill_status_created_idx'),
+            ('/auth/admin/skills/?category=Music&status=pending&ordering=created_at', 'skill_category_status_idx'),
+            ('/auth/admin/messages/?status=new&since=2020-01-01', 'message_status_created_idx'),
+            ('/auth/admin/users/?status=suspended', 'user_suspended_joined_idx'),
+            ('/auth/admin/users/?status=active', 'user_joined_id_idx'),
+        ]
+        for url, index in cases:
+            with self.subTest(url=url):
+                plan = self.plan(url)
+                self.assertIn(f'INDEX {index}', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_filters_and_ordering(self):
+        self.create_rows(4, start=0)
+        message = Message.objects.order_by('id').first()
+        message.status = 'read'
+        message.save()
+
+        response = self.client.get('/auth/admin/messages/?status=new&ordering=created_at&page_size=2')
+        ids = [row['id'] for row in response.data['results']]
+        ids += [row['id'] for row in self.client.get(response.data['next']).data['results']]
+        self.assertEqual(ids, list(Message.objects.filter(status='new').order_by('created_at', 'id')
+                                   .values_list('id', flat=True)))
+
+        response = self.client.get('/auth/admin/users/?status=suspended')
+        self.assertEqual(response.data['results'], [])
+
+        for url in ('/auth/admin/skills/?status=archived', '/auth/admin/skills/?ordering=title',
+                    '/auth/admin/skills/?since=yesterday'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_filter_values_are_validated(self):
+        self.create_rows(2, start=0)
+        author = User.objects.get(username='user1@example.com')
+
+        response = self.client.get(f'/auth/admin/skills/?author={author.pk}')
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         list(Skill.objects.filter(author=author).values_list('id', flat=True)))
+
+        response = self.client.get('/auth/admin/skills/?author=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('author', response.data)
+
+
+class SystemSettingsTest(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        system_settings_cache.invalidate()
+        self.addCleanup(system_settings_cache.invalidate)
+
+    def put_settings(self, **changes):
+        data = {'maintenanceMode': False, 'allowNewRegistrations': True,
+                'skillApprovalRequired': True, 'maxSkillsPerUser': 10, **changes}
+        response = self.client.put('/auth/admin/settings/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_steady_state_reads_need_no_queries(self):
+        SystemSettings.objects.create()
+        get_system_settings()
+        with self.assertNumQueries(0):
+            get_system_settings()
+            self.client.get('/auth/status/')
+
+    def test_save_invalidates_and_version_recheck_sees_other_writers(self):
+        self.put_settings(maxSkillsPerUser=3)
+        self.assertEqual(get_system_settings().max_skills_per_user, 3)
+
+        # Another process: a version bump without this process's signal.
+        SystemSettings.objects.update(max_skills_per_user=7, version=F('version') + 1)
+        self.assertEqual(get_system_settings().max_skills_per_user, 3)
+        with self.settings(SYSTEM_SETTINGS_RECHECK_SECONDS=0):
+            self.assertEqual(get_system_settings().max_skills_per_user, 7)
+
+    def test_maintenance_mode(self):
+        self.put_settings(maintenanceMode=True)
+
+        response = self.client.post('/auth/register/', {'idToken': 'x'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['code'], 'server/maintenance')
+        self.assertEqual(self.client.get('/auth/admin/stats/').status_code, 200)
+
+    def test_registration_toggle(self):
+        self.put_settings(allowNewRegistrations=False)
+
+        for url in ('/auth/register/', '/auth/async/register/'):
+            with self.subTest(url=url):
+                response = self.client.post(url, {'idToken': 'x'}, format='json')
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(response.json()['code'], 'auth/registration-disabled')
+
+        claims = {'uid': 'new-uid', 'email': 'new@example.com', 'email_verified': True, 'exp': time.time() + 60}
+        with mock.patch.object(firebase_cache.auth, 'verify_id_token', return_value=claims):
+            response = self.client.post('/auth/google/', {'idToken': 'new'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(email='new@example.com').exists())
+
+
+class SkillSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='t@example.com', first_name='Tess', last_name='Teacher')
+        for title, description, category, level, status, rating in [
+            ('Python Programming', 'Data structures and web development', 'programming', 'beginner', 'active', 4.8),
+            ('Data Science', 'Analysis with Python and pandas', 'programming', 'intermediate', 'active', 4.2),
+            ('Pythonic Yoga', 'Stretching', 'fitness', 'beginner', 'pending', 0),
+            ('Piano', 'Reading music', 'music', 'beginner', 'active', 4.9),
+        ]:
+            Skill.objects.create(title=title, description=description, category=category, level=level,
+                                 status=status, rating=rating, author=author)
+
+    def search(self, query=''):
+        response = self.client.get(f'/auth/skills/search/{query}')
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.json()['results']]
+
+    def test_prefix_match_ranks_title_hits_first(self):
+        self.assertEqual(self.search('?q=pyth'), ['Python Programming', 'Data Science'])
+        self.assertEqual(self.search('?q=pyth%20pand'), ['Data Science'])
+
+    def test_filters(self):
+        self.assertEqual(self.search('?q=python&level=intermediate'), ['Data Science'])
+        self.assertEqual(self.search('?q=python&min_rating=4.5'), ['Python Programming'])
+        self.assertEqual(self.search('?category=music'), ['Piano'])
+
+    def test_index_follows_writes(self):
+        skill = Skill.objects.get(title='Piano')
+        Skill.objects.filter(pk=skill.pk).update(title='Jazz Piano')
+        self.assertEqual(self.search('?q=jazz'), ['Jazz Piano'])
+
+        skill.delete()
+        self.assertEqual(self.search('?q=jazz'), [])
+
+    def test_only_active_skills_are_indexed(self):
+        yoga = Skill.objects.get(title='Pythonic Yoga')
+        yoga.status = 'active'
+        yoga.save()
+        self.assertIn('Pythonic Yoga', self.search('?q=python'))
+
+        Skill.objects.filter(pk=yoga.pk).update(status='rejected')
+        self.assertNotIn('Pythonic Yoga', self.search('?q=python'))
+
+    def test_operators_in_input_are_plain_text(self):
+        self.assertEqual(self.search('?q=%22python%22%20OR%20NEAR(*'), [])
+
+    def test_pagination(self):
+        response = self.client.get('/auth/skills/search/?q=python&page_size=1')
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(self.client.get(response.json()['next']).json()['results'][0]['title'], 'Data Science')
+
+
+class SkillFacetTest(AdminTestCase):
+    def create_skill(self, category, level, rating, status='active'):
+        return Skill.objects.create(title='Skill', author=self.admin, category=category, level=level,
+                                    rating=rating, status=status)
+
+    def assertFacetsMatch(self):
+        stored = {(cell.category, cell.level, cell.rating_bucket): cell.count
+                  for cell in SkillFacetCount.objects.exclude(count=0)}
+        self.assertEqual(stored, dict(count_facets_from_scratch()))
+
+    def test_counts_follow_writes_and_bulk_moderation(self):
+        music = self.create_skill('music', 'beginner', 4.6)
+        self.create_skill('music', 'advanced', 3.2)
+        self.create_skill('programming', 'beginner', 4.9)
+        pending = self.create_skill('programming', 'advanced', 4.0, status='pending')
+        self.assertFacetsMatch()
+
+        music.level = 'intermediate'
+        music.save()
+        music.delete()
+        self.client.post('/auth/admin/skills/bulk/', {'ids': [pending.pk], 'status': 'active'}, format='json')
+        self.assertFacetsMatch()
+
+        facets = self.client.get('/auth/skills/facets/?category=programming&min_rating=4.5').json()
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual(facets['category'], {'programming': 1})
+        self.assertEqual(facets['level'], {'beginner': 1})
+        self.assertEqual(facets['rating']['4.0'], 2)
+        self.assertEqual(facets['rating']['4.5'], 1)
+
+    def test_constant_queries(self):
+        for i in range(20):
+            self.create_skill(f'category{i % 4}', 'beginner', i / 4)
+        with self.assertNumQueries(1):
+            self.client.get('/auth/skills/facets/?level=beginner')
+
+    def test_recount_repairs_drift(self):
+        self.create_skill('music', 'beginner', 4.6)
+        SkillFacetCount.objects.update(count=42)
+        call_command('recount_stats', stdout=io.StringIO())
+        self.assertFacetsMatch()
+
+
+@skipUnless(matching_available(), 'numpy/scipy not installed')
+class MatchIndexTest(SimpleTestCase):
+    def brute_force(self, offers, wants, user_id):
+        my_wants = {skill for user, skill in wants if user == user_id}
+        my_offers = {skill for user, skill in offers if user == user_id}
+        results = {}
+        for other in {user for user, _ in offers | wants} - {user_id}:
+            they_offer = my_wants & {skill for user, skill in offers if user == other}
+            they_want = my_offers & {skill for user, skill in wants if user == other}
+            if they_offer and they_want:
+                results[other] = (sorted(they_offer), sorted(they_want))
+        return results
+
+    def assertMatchesBruteForce(self, index, offers, wants):
+        for user_id in range(30):
+            expected = self.brute_force(offers, wants, user_id)
+            matches = index.matches(user_id, limit=1000)
+            self.assertEqual({m.user_id: (m.offers, m.wants) for m in matches}, expected)
+            scores = [m.score for m in matches]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_matches_follow_incremental_changes(self):
+        rng = random.Random(7)
+        offers = {(rng.randrange(25), rng.randrange(15)) for _ in range(120)}
+        wants = {(rng.randrange(25), rng.randrange(15)) for _ in range(120)}
+        index = MatchIndex(sorted(offers), sorted(wants), compact_after=40)
+        self.assertMatchesBruteForce(index, offers, wants)
+
+        # New users and skills arrive through the overlay too.
+        for _ in range(60):
+            kind, pairs = rng.choice([(OFFERED, offers), (WANTED, wants)])
+            skill = rng.randrange(18)
+            users = {rng.randrange(30) for _ in range(rng.randrange(6))}
+            affected = index.set_users(kind, skill, users)
+            previous = {user for user, s in pairs if s == skill}
+            self.assertTrue(previous ^ users <= affected)
+            pairs -= {(user, skill) for user in previous}
+            pairs |= {(user, skill) for user in users}
+            self.assertMatchesBruteForce(index, offers, wants)
+
+    def test_ranks_balanced_swaps_first(self):
+        index = MatchIndex(
+            offers=[(1, 10), (1, 11), (2, 20), (2, 21), (3, 20)],
+            wants=[(1, 20), (1, 21), (2, 10), (2, 11), (3, 10), (3, 11)],
+        )
+        self.assertEqual([(m.user_id, m.score) for m in index.matches(1, limit=5)], [(2, 2.0), (3, 4 / 3)])
+        self.assertEqual(index.matches(1, limit=1)[0].user_id, 2)
+
+
+@skipUnless(matching_available(), 'numpy/scipy not installed')
+class SkillMatchingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada, cls.bob, cls.cy = (
+            User.objects.create_user(username=f'{name}@example.com', first_name=name.title())
+            for name in ('ada', 'bob', 'cy')
+        )
+        cls.python = Skill.objects.create(title='Python', category='programming', status='active', author=cls.ada)
+        cls.guitar = Skill.objects.create(title='Guitar', category='music', status='active', author=cls.bob)
+
+    def setUp(self):
+        match_engine.clear()
+        self.addCleanup(match_engine.clear)
+        self.client = APIClient()
+
+    def as_user(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+    def link(self, user, skill, kind, method='post'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.as_user(user), method)(
+                '/auth/skills/links/', {'skillId': skill.pk, 'kind': kind}, format='json')
+
+    def matches(self, user):
+        response = self.as_user(user).get('/auth/skills/matches/')
+        self.assertEqual(response.status_code, 200)
+        return [(row['name'], [s['title'] for s in row['theyOffer']], [s['title'] for s in row['theyWant']])
+                for row in response.json()['results']]
+
+    def test_reciprocal_matches_follow_changes(self):
+        self.assertEqual(self.link(self.ada, self.guitar, WANTED).status_code, 201)
+        self.assertEqual(self.matches(self.ada), [])
+
+        self.link(self.bob, self.python, WANTED)
+        self.assertEqual(self.matches(self.ada), [('Bob', ['Guitar'], ['Python'])])
+        self.assertEqual(self.matches(self.bob), [('Ada', ['Python'], ['Guitar'])])
+
+        # Cy also teaches guitar; the cached results for Ada are refreshed.
+        self.link(self.cy, self.guitar, OFFERED)
+        self.link(self.cy, self.python, WANTED)
+        self.assertEqual([name for name, _, _ in self.matches(self.ada)], ['Bob', 'Cy'])
+
+        self.link(self.bob, self.python, WANTED, method='delete')
+        self.assertEqual(self.matches(self.ada), [('Cy', ['Guitar'], ['Python'])])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.guitar.status = 'rejected'
+            self.guitar.save()
+        self.assertEqual(self.matches(self.ada), [])
+
+    def test_results_are_cached_until_a_relevant_change(self):
+        self.link(self.ada, self.guitar, WANTED)
+        self.link(self.bob, self.python, WANTED)
+        self.matches(self.ada)
+        self.matches(self.ada)
+        self.assertEqual((match_engine.stats()['hits'], match_engine.stats()['misses']), (1, 1))
+
+        self.link(self.cy, self.guitar, WANTED)
+        self.matches(self.ada)
+        self.assertEqual(match_engine.stats()['hits'], 2)
+        self.link(self.cy, self.python, WANTED)
+        self.matches(self.ada)
+        self.assertEqual(match_engine.stats()['misses'], 2)
+
+    def test_link_validation(self):
+        self.assertEqual(self.link(self.ada, self.python, OFFERED).status_code, 400)
+        self.assertEqual(self.link(self.ada, self.guitar, 'maybe').status_code, 400)
+        self.link(self.ada, self.guitar, WANTED)
+        self.assertEqual(self.link(self.ada, self.guitar, WANTED).status_code, 200)
+        self.assertEqual(self.as_user(self.ada).get('/auth/skills/links/').json(),
+                         {OFFERED: [self.python.pk], WANTED: [self.guitar.pk]})
+        self.assertEqual(UserSkillLink.objects.count(), 1)
+
+    def test_match_payload_never_contains_an_email(self):
+        dee = User.objects.create_user(username='dee@example.com', email='dee@example.com')
+        self.link(self.ada, self.guitar, WANTED)
+        self.link(dee, self.guitar, OFFERED)
+        self.link(dee, self.python, WANTED)
+
+        response = self.as_user(self.ada).get('/auth/skills/matches/')
+        names = {row['userId']: row['name'] for row in response.json()['results']}
+        self.assertEqual(names[dee.pk], 'SkillSwap member')
+        self.assertNotIn('@', response.content.decode())
+
+    def test_links_list_only_active_authored_skills(self):
+        Skill.objects.create(title='Rust', category='programming', status='pending', author=self.ada)
+        self.assertEqual(self.as_user(self.ada).get('/auth/skills/links/').json()[OFFERED], [self.python.pk])
+
+    def test_cache_hits_do_not_wait_for_scoring(self):
+        self.link(self.ada, self.guitar, WANTED)
+        self.link(self.bob, self.python, WANTED)
+        expected = match_engine.matches(self.ada.pk)
+
+        results = []
+        with match_engine._index_lock:  # a lookup or sync in progress
+            reader = threading.Thread(target=lambda: results.append(match_engine.matches(self.ada.pk)))
+            reader.start()
+            reader.join(timeout=5)
+            self.assertFalse(reader.is_alive())
+        self.assertEqual(results, [expected])
+
+
+class SkillsCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='u@example.com', email='u@example.com')
+        UserProfile.objects.create(user=cls.user, firebase_uid='u')
+
+    def setUp(self):
+        system_settings_cache.invalidate()
+        self.addCleanup(system_settings_cache.invalidate)
+        SystemSettings.objects.create(max_skills_per_user=2, skill_approval_required=False)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def skills_count(self, user=None):
+        return UserProfile.objects.get(user=user or self.user).skills_count
+
+    def create(self, title='Guitar'):
+        return self.client.post('/auth/skills/', {'title': title, 'category': 'music'}, format='json')
+
+    def test_limit_is_enforced_from_the_counter(self):
+        first = self.create()
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.json()['status'], 'active')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.create('Piano').status_code, 201)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
+        response = self.create('Drums')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['code'], 'skills/limit-reached')
+        self.assertEqual(self.skills_count(), 2)
+
+        self.assertEqual(self.client.delete(f'/auth/skills/{first.json()["id"]}/').status_code, 204)
+        self.assertEqual(self.skills_count(), 1)
+        self.assertEqual(self.create('Drums').status_code, 201)
+
+    def test_count_follows_other_writes(self):
+        other = User.objects.create_user(username='o@example.com')
+        UserProfile.objects.create(user=other, firebase_uid='o')
+        skill = Skill.objects.create(title='Chess', category='games', author=self.user)
+        self.assertEqual(self.skills_count(), 1)
+
+        skill.author = other
+        skill.save()
+        self.assertEqual((self.skills_count(), self.skills_count(other)), (0, 1))
+        other.delete()
+        self.assertFalse(Skill.objects.exists())
+
+    def test_recount_repairs_drift(self):
+        Skill.objects.create(title='Chess', category='games', author=self.user)
+        UserProfile.objects.update(skills_count=7)
+        call_command('recount_stats', stdout=io.StringIO())
+        self.assertEqual(self.skills_count(), 1)
+
+
+class SkillLimitConcurrencyTest(TransactionTestCase):
+    def test_concurrent_creators_cannot_pass_the_limit(self):
+        user = User.objects.create_user(username='c@example.com')
+        UserProfile.objects.create(user=user, firebase_uid='c')
+
+        def attempt(i):
+            while True:
+                try:
+                    return create_skill(user.pk, 3, title=f'Skill {i}', category='music')
+                except SkillLimitReached:
+                    return None
+                except OperationalError:
+                    # SQLite's shared-cache test database fails fast on
+                    # lock contention instead of waiting.
+                    time.sleep(0.001)
+
+        results = run_concurrently(attempt, [(i,) for i in range(10)])
+        self.assertEqual(sum(result is not None for result in results), 3)
+        self.assertEqual(Skill.objects.filter(author=user).count(), 3)
+        self.assertEqual(UserProfile.objects.get(user=user).skills_count, 3)
+
+
+class ReviewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author@example.com')
+        cls.reviewers = [User.objects.create_user(username=f'r{i}@example.com', first_name=f'R{i}')
+                         for i in range(3)]
+        cls.skill = Skill.objects.create(title='Guitar', category='music', status='active', author=cls.author)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def review(self, reviewer, rating, skill=None):
+        self.client.force_authenticate(reviewer)
+        return self.client.put(f'/auth/skills/{(skill or self.skill).pk}/reviews/',
+                               {'rating': rating, 'comment': 'Great'}, format='json')
+
+    def assertAggregates(self, rating, count):
+        skill = Skill.objects.get(pk=self.skill.pk)
+        self.assertEqual((skill.rating, skill.review_count, skill.rating_sum), (rating, count, round(rating * count)))
+        facets = {(cell.category, cell.level, cell.rating_bucket): cell.count
+                  for cell in SkillFacetCount.objects.exclude(count=0)}
+        self.assertEqual(facets, dict(count_facets_from_scratch()))
+
+    def test_writes_keep_running_aggregates(self):
+        self.assertEqual(self.review(self.reviewers[0], 5).status_code, 201)
+        self.assertEqual(self.review(self.reviewers[1], 4).status_code, 201)
+        self.assertAggregates(4.5, 2)
+
+        self.assertEqual(self.review(self.reviewers[1], 2).status_code, 200)
+        self.assertAggregates(3.5, 2)
+
+        self.client.force_authenticate(self.reviewers[0])
+        self.assertEqual(self.client.delete(f'/auth/skills/{self.skill.pk}/reviews/').status_code, 204)
+        self.assertAggregates(2.0, 1)
+        self.reviewers[1].delete()
+        self.assertAggregates(0.0, 0)
+
+    def test_saving_a_stale_skill_keeps_aggregates(self):
+        self.review(self.reviewers[0], 4)
+        self.skill.level = 'advanced'
+        self.skill.save()
+        self.assertAggregates(4.0, 1)
+
+    def test_validation(self):
+        self.assertEqual(self.review(self.reviewers[0], 6).status_code, 400)
+        self.assertEqual(self.review(self.author, 5).status_code, 400)
+        pending = Skill.objects.create(title='Piano', category='music', author=self.author)
+        self.assertEqual(self.review(self.reviewers[0], 5, skill=pending).status_code, 404)
+
+    def test_deleting_a_reviewed_skill_keeps_facets_in_step(self):
+        self.review(self.reviewers[0], 5)
+        self.review(self.reviewers[1], 1)
+        self.skill.delete()
+        self.assertFalse(SkillFacetCount.objects.exclude(count=0).exists())
+
+    def test_recount_repairs_drift(self):
+        self.review(self.reviewers[0], 4)
+        Skill.objects.update(rating_sum=9, review_count=3, rating=3)
+        call_command('recount_stats', stdout=io.StringIO())
+        self.assertAggregates(4.0, 1)
+
+    def test_listing_reviews(self):
+        for reviewer, rating in zip(self.reviewers, (3, 4, 5)):
+            self.review(reviewer, rating)
+        self.client.force_authenticate(None)
+        page = self.client.get(f'/auth/skills/{self.skill.pk}/reviews/?page_size=2').json()
+        self.assertEqual([row['rating'] for row in page['results']], [5, 4])
+        self.assertEqual(self.client.get(page['next']).json()['results'][0]['reviewer'], 'R0')
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author@example.com')
+        reviewer = User.objects.create_user(username='reviewer@example.com')
+        cls.now = timezone.now()
+        cls.skills = {}
+        for title, rating, hours_ago in [('Fresh', 4, 1), ('Stale', 5, 24 * 40), ('Older', 5, 72)]:
+            skill = Skill.objects.create(title=title, category='music', status='active', author=author)
+            review = Review.objects.create(skill=skill, reviewer=reviewer, rating=rating)
+            Review.objects.filter(pk=review.pk).update(created_at=cls.now - timedelta(hours=hours_ago))
+            cls.skills[title] = skill
+
+    def top(self, by):
+        response = self.client.get(f'/auth/skills/top/?by={by}')
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.json()['results']]
+
+    def test_scores_decay_and_rank(self):
+        Skill.objects.filter(pk=self.skills['Stale'].pk).update(trending_score=1)
+        self.assertEqual(update_trending(self.now), 2)
+        scores = dict(Skill.objects.values_list('title', 'trending_score'))
+        self.assertAlmostEqual(scores['Older'], 0.5, places=4)
+        self.assertEqual(scores['Stale'], 0)
+        self.assertEqual(self.top('trending'), ['Fresh', 'Older', 'Stale'])
+        self.assertEqual(self.top('rating'), ['Older', 'Stale', 'Fresh'])
+        self.assertEqual(self.client.get('/auth/skills/search/?sort=rating&q=fresh').json()['results'][0]['title'],
+                         'Fresh')
+        self.assertEqual(self.client.get('/auth/skills/top/?by=newest').status_code, 400)
+
+    def test_top_queries_scan_an_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('query plans are checked on SQLite')
+        for by, index in (('trending', 'skill_status_trending_idx'), ('rating', 'skill_status_rating_idx')):
+            with self.subTest(by=by), CaptureQueriesContext(connection) as queries:
+                self.top(by)
+            sql = next(query['sql'] for query in queries
+                       if 'LIMIT' in query['sql'] and 'authentication_systemsettings' not in query['sql'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = ' | '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class StandInTestCase(TestCase):
+    """TestCase whose Firebase calls, setUpTestData included, hit a stand-in."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.standin = FirebaseStandIn()
+        cls.installed = cls.standin.installed()
+        cls.installed.__enter__()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.installed.__exit__(None, None, None)
+
+
+class UserResolutionTest(StandInTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner@example.com', email='owner@example.com')
+        UserProfile.objects.create(user=cls.owner, firebase_uid='owner', is_admin=True)
+        cls.legacy = User.objects.create_user(username='legacy@example.com', email='legacy@example.com')
+        cls.standin.add_user('owner', 'owner@example.com')
+
+    def setUp(self):
+        resolution_cache.clear()
+
+    def get_users(self, uid):
+        token = self.standin.mint_token(uid)
+        return self.client.get('/auth/admin/users/', headers={'Authorization': f'Bearer {token}'})
+
+    def test_legacy_users_link_by_verified_email_only(self):
+        self.assertIsNone(resolve_uid('new-uid', 'legacy@example.com', email_verified=False))
+        self.assertFalse(UserProfile.objects.filter(user=self.legacy).exclude(firebase_uid=None).exists())
+
+        resolved = resolve_uid('new-uid', 'legacy@example.com', email_verified=True)
+        self.assertEqual(resolved.user_id, self.legacy.pk)
+        self.assertEqual(UserProfile.objects.get(user=self.legacy).firebase_uid, 'new-uid')
+
+    def test_linked_profiles_are_never_relinked(self):
+        self.assertIsNone(resolve_uid('intruder', 'owner@example.com', email_verified=True))
+        self.assertEqual(UserProfile.objects.get(user=self.owner).firebase_uid, 'owner')
+
+        self.standin.add_user('intruder', 'owner@example.com')
+        self.assertEqual(self.get_users('intruder').status_code, 401)
+        self.assertEqual(self.get_users('owner').status_code, 200)
+
+    def test_is_admin_reads_the_cache_until_the_profile_changes(self):
+        self.assertEqual(self.get_users('owner').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertTrue(resolve_uid('owner').is_admin)
+        hits = resolution_cache.stats()['hits']
+        self.assertEqual(self.get_users('owner').status_code, 200)
+        self.assertEqual(resolution_cache.stats()['hits'], hits + 1)
+
+        profile = UserProfile.objects.get(user=self.owner)
+        profile.is_admin = False
+        profile.save()
+        self.assertEqual(self.get_users('owner').status_code, 403)
+
+    def test_suspended_users_are_refused_on_their_next_request(self):
+        self.assertEqual(self.get_users('owner').status_code, 200)
+
+        self.owner.is_active = False
+        self.owner.save()
+        response = self.get_users('owner')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'], 'User account is suspended')
+
+
+class InstrumentationTest(StandInTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for uid, is_admin in (('root', True), ('guest', False)):
+            cls.standin.add_user(uid, f'{uid}@example.com')
+            user = User.objects.create_user(username=f'{uid}@example.com', email=f'{uid}@example.com')
+            UserProfile.objects.create(user=user, firebase_uid=uid, is_admin=is_admin)
+
+    def setUp(self):
+        registry.clear()
+        resolution_cache.clear()
+
+    def get(self, url, uid=None, token=None):
+        if uid:
+            token = self.standin.mint_token(uid)
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return self.client.get(url, headers=headers)
+
+    def test_middleware_records_latency_and_queries_per_endpoint(self):
+        self.assertEqual(self.get('/auth/admin/users/', 'root').status_code, 200)
+        queries = registry.summaries('db')['default']['count']
+        self.get('/auth/no-such-page/')
+
+        endpoint = registry.summaries('endpoint')
+        self.assertEqual(endpoint['admin-users-list']['count'], 1)
+        self.assertEqual(endpoint['admin-users-list']['errors'], 0)
+        self.assertEqual(endpoint['unmatched']['count'], 1)
+        # The request_queries series records a count per request where others record seconds.
+        self.assertGreater(queries, 0)
+        self.assertEqual(registry.summaries('request_queries')['admin-users-list']['totalSeconds'], queries)
+        self.assertGreater(registry.summaries('request_query_time')['admin-users-list']['totalSeconds'], 0)
+
+    def test_middleware_counts_server_errors(self):
+        def fail(request):
+            raise RuntimeError('boom')
+
+        request = RequestFactory().get('/')
+        InstrumentationMiddleware(lambda request: HttpResponse(status=503))(request)
+        InstrumentationMiddleware(lambda request: HttpResponse(status=404))(request)
+        with self.assertRaises(RuntimeError):
+            InstrumentationMiddleware(fail)(request)
+
+        summary = registry.summaries('endpoint')['unmatched']
+        self.assertEqual((summary['count'], summary['errors']), (3, 2))
+
+    def test_prometheus_rendering(self):
+        registry.record('endpoint', 'skill "detail"', 0.25)
+        registry.record('endpoint', 'skill "detail"', 0.5, error=True)
+        registry.record('request_query_time', 'skill "detail"', 0.125)
+
+        body = render_prometheus()
+
+        self.assertIn('# TYPE skillswap_request_duration_seconds summary', body)
+        self.assertIn('skillswap_request_duration_seconds{endpoint="skill \\"detail\\"",quantile="0.99"} 0.500000', body)
+        self.assertIn('skillswap_request_duration_seconds_sum{endpoint="skill \\"detail\\""} 0.750000', body)
+        self.assertIn('skillswap_request_duration_seconds_count{endpoint="skill \\"detail\\""} 2', body)
+        self.assertIn('skillswap_request_errors_total{endpoint="skill \\"detail\\""} 1', body)
+        self.assertIn('skillswap_request_db_seconds_sum{endpoint="skill \\"detail\\""} 0.125000', body)
+        self.assertIn('skillswap_cache_hits_total{cache="tokens"}', body)
+        self.assertTrue(body.endswith('\n'))
+
+    @override_settings(HEALTH_ERROR_RATE_THRESHOLD=0.2, HEALTH_P95_THRESHOLD_SECONDS=1.0)
+    def test_system_health(self):
+        self.assertEqual(system_health()['status'], 'healthy')
+
+        for _ in range(9):
+            registry.record('endpoint', 'skills', 0.01)
+        registry.record('firebase', 'get_users', 2.0)
+        health = system_health()
+        self.assertEqual(health['status'], 'warning')
+        self.assertEqual(health['details'], ['firebase get_users: p95 above 1000 ms'])
+        self.assertEqual(health['firebase']['get_users']['count'], 1)
+
+        for _ in range(3):
+            registry.record('endpoint', 'skills', 0.01, error=True)
+        health = system_health()
+        self.assertEqual(health['status'], 'critical')
+        self.assertEqual(health['errors'], 3)
+        self.assertEqual(health['latency']['p50'], 0.01)
+
+    def test_metrics_are_admin_only_without_a_token(self):
+        self.assertEqual(self.get('/auth/metrics/').status_code, 401)
+        self.assertEqual(self.get('/auth/metrics/', token='not-a-token').status_code, 401)
+        self.assertEqual(self.get('/auth/metrics/', 'guest').status_code, 403)
+        response = self.get('/auth/metrics/', 'root')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'skillswap_request_duration_seconds', response.content)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.get('/auth/metrics/').status_code, 401)
+        self.assertEqual(self.get('/auth/metrics/', 'root').status_code, 401)
+        self.assertEqual(self.get('/auth/metrics/', token='scrape-secret').status_code, 200)
+
+
+class AsyncAuthViewsTest(StandInTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.standin.add_user('ada', 'ada@example.com', display_name='Ada')
+        cls.standin.add_user('new', 'new@example.com', email_verified=False)
+        user = User.objects.create_user(username='ada@example.com', email='ada@example.com')
+        UserProfile.objects.create(user=user, firebase_uid='ada')
+        cls.ada = user
+        # Registered before firebase_uid existed; unverified identities can't claim it.
+        cls.standin.add_user('claimer', 'legacy@example.com', email_verified=False)
+        User.objects.create_user(username='legacy@example.com', email='legacy@example.com')
+
+    def setUp(self):
+        resolution_cache.clear()
+        firebase_cache.user_cache.clear()
+        system_settings_cache.invalidate()
+        self.addCleanup(system_settings_cache.invalidate)
+
+    async def post(self, url, uid=None, token=None):
+        if uid:
+            token = self.standin.mint_token(uid)
+        response = await self.async_client.post(url, {'idToken': token} if token else {},
+                                                content_type='application/json')
+        return response.status_code, json.loads(response.content)
+
+    async def test_register(self):
+        self.assertEqual((await self.post('/auth/async/register/'))[0], 400)
+        self.assertEqual((await self.post('/auth/async/register/', token='garbage'))[0], 401)
+
+        status, body = await self.post('/auth/async/register/', 'new')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['data'], {'uid': 'new', 'email': 'new@example.com', 'emailVerified': False})
+        self.assertTrue(await UserProfile.objects.filter(firebase_uid='new', user__email='new@example.com').aexists())
+
+        self.assertEqual((await self.post('/auth/async/register/', 'new'))[0], 409)
+
+    async def test_unverified_email_of_an_existing_account_is_a_conflict(self):
+        for url in ('/auth/register/', '/auth/async/register/', '/auth/google/', '/auth/async/google/'):
+            with self.subTest(url=url):
+                status, body = await self.post(url, 'claimer')
+                self.assertEqual(status, 409)
+                self.assertEqual(body['message'], 'An account already exists with this email address')
+        self.assertFalse(await UserProfile.objects.filter(firebase_uid='claimer').aexists())
+
+    async def test_login(self):
+        status, body = await self.post('/auth/async/login/', 'ada')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['data']['uid'], 'ada')
+
+        status, body = await self.post('/auth/async/login/', 'new')
+        self.assertEqual((status, body['code']), (403, 'auth/email-not-verified'))
+        self.assertEqual((await self.post('/auth/async/login/', token='garbage'))[0], 401)
+        self.assertEqual((await self.async_client.get('/auth/async/login/')).status_code, 405)
+
+    async def test_status(self):
+        async def get(uid=None):
+            headers = {'Authorization': f'Bearer {self.standin.mint_token(uid)}'} if uid else {}
+            response = await self.async_client.get('/auth/async/status/', headers=headers)
+            return response.status_code, json.loads(response.content)
+
+        status, body = await get('ada')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['data']['django_id'], self.ada.pk)
+        self.assertEqual((await get('new'))[1]['code'], 'auth/user-not-found')
+        self.assertEqual((await get())[0], 401)
+        response = await self.async_client.get('/auth/async/status/', headers={'Authorization': 'Bearer garbage'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_google_auth(self):
+        status, body = await self.post('/auth/async/google/', 'ada')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['data']['displayName'], 'Ada')
+        self.assertEqual(await User.objects.filter(email='ada@example.com').acount(), 1)
+        self.assertEqual((await self.post('/auth/async/google/', token='garbage'))[0], 401)
+
+        await SystemSettings.objects.aupdate(allow_new_registrations=False, version=F('version') + 1)
+        await sync_to_async(system_settings_cache.invalidate)()
+        status, body = await self.post('/auth/async/google/', 'new')
+        self.assertEqual((status, body['code']), (403, 'auth/registration-disabled'))
+        self.assertEqual((await self.post('/auth/async/google/', 'ada'))[0], 200)
+        self.assertFalse(await UserProfile.objects.filter(firebase_uid='new').aexists())
+
+    def test_executor_is_created_once(self):
+        self.addCleanup(setattr, async_views, '_firebase_executor', async_views._firebase_executor)
+        async_views._firebase_executor = None
+
+        executors = run_concurrently(async_views._get_executor, [()] * 20)
+
+        self.assertEqual(len({id(executor) for executor in executors}), 1)
+        executors[0].shutdown()
+
+
+class AsgiExportTest(TransactionTestCase):
+    # The ASGI handler serves each request on a thread of its own, so the
+    # rows have to be committed for its database connection to see them.
+    @classmethod
+    def setUpClass(cls):
+        cls.standin = FirebaseStandIn()
+        cls.standin.add_user('root', 'root@example.com')
+        cls.installed = cls.standin.installed()
+        cls.installed.__enter__()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.installed.__exit__(None, None, None)
+
+    def setUp(self):
+        resolution_cache.clear()
+        system_settings_cache.invalidate()
+        user = User.objects.create_user(username='root@example.com', email='root@example.com')
+        UserProfile.objects.create(user=user, firebase_uid='root', is_admin=True)
+        Message.objects.bulk_create(
+            Message(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hi') for i in range(6))
+
+    async def test_first_row_is_sent_before_the_rows_are_read(self):
+        built = []
+        release = threading.Event()
+        get_row_builder = MessageViewSet.get_row_builder
+
+        def held_row_builder(view, fields):
+            build = get_row_builder(view, fields)
+
+            def build_row(row):
+                built.append(row)
+                if len(built) == 2:
+                    release.wait(5)  # nothing past the first row until the test has it
+                return build(row)
+            return build_row
+
+        headers = [(b'host', b'testserver'),
+                   (b'authorization', f'Bearer {self.standin.mint_token("root")}'.encode())]
+        app = ApplicationCommunicator(asgi_application, {
+            'type': 'http', 'method': 'GET', 'path': '/auth/admin/messages/export/',
+            'query_string': b'', 'headers': headers})
+        with self.settings(EXPORT_CHUNK_SIZE=2), \
+                mock.patch.object(MessageViewSet, 'get_row_builder', held_row_builder):
+            await app.send_input({'type': 'http.request'})
+            self.assertEqual((await app.receive_output(5))['status'], 200)
+            first = await app.receive_output(5)
+            self.assertEqual(first['body'].count(b'\n'), 1)
+            self.assertLess(len(built), 6)
+
+            release.set()
+            body = first['body']
+            while first.get('more_body'):
+                first = await app.receive_output(5)
+                body += first.get('body', b'')
+        self.assertEqual(len(body.splitlines()), 6)
+
+
+class ChatSocketTest(StandInTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {}
+        for name in ('ada', 'bob', 'cy'):
+            cls.standin.add_user(name, f'{name}@example.com')
+            user = User.objects.create_user(username=f'{name}@example.com', email=f'{name}@example.com',
+                                            first_name=name.title())
+            UserProfile.objects.create(user=user, firebase_uid=name)
+            cls.users[name] = user
+        cls.conversation, _ = get_or_create_conversation(cls.users['ada'].pk, cls.users['bob'].pk)
+
+    def setUp(self):
+        resolution_cache.clear()
+
+    async def connect(self, name, token=None):
+        socket = ApplicationCommunicator(asgi_application, {'type': 'websocket', 'path': '/ws/chat/'})
+        await socket.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await socket.receive_output(2))['type'], 'websocket.accept')
+        await self.send(socket, {'type': 'auth', 'token': token or self.standin.mint_token(name)})
+        return socket
+
+    async def send(self, socket, frame):
+        await socket.send_input({'type': 'websocket.receive', 'text': json.dumps(frame)})
+
+    async def receive(self, socket):
+        event = await socket.receive_output(2)
+        self.assertEqual(event['type'], 'websocket.send', event)
+        return json.loads(event['text'])
+
+    async def disconnect(self, *sockets):
+        for socket in sockets:
+            await socket.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await socket.wait(2)
+
+    async def test_messages_reach_both_participants(self):
+        ada, bob = await self.connect('ada'), await self.connect('bob')
+        self.assertEqual((await self.receive(ada))['userId'], self.users['ada'].pk)
+        await self.receive(bob)
+
+        await self.send(ada, {'type': 'send', 'conversation': self.conversation.pk, 'body': 'Hi Bob',
+                              'clientId': 'c1'})
+        sent = await self.receive(ada)
+        self.assertEqual((sent['type'], sent['clientId'], sent['message']['body']), ('sent', 'c1', 'Hi Bob'))
+        self.assertEqual(await self.receive(ada), {'type': 'message', 'message': sent['message']})
+        self.assertEqual(await self.receive(bob), {'type': 'message', 'message': sent['message']})
+        self.assertEqual(get_broker().stats()['channels'], 2)
+
+        await self.disconnect(ada, bob)
+        self.assertEqual(get_broker().stats()['channels'], 0)
+
+    async def test_history_pages_by_message_id(self):
+        ada = await self.connect('ada')
+        await self.receive(ada)
+        for i in range(5):
+            await self.send(ada, {'type': 'send', 'conversation': self.conversation.pk, 'body': f'm{i}'})
+            await self.receive(ada)
+            await self.receive(ada)
+
+        await self.send(ada, {'type': 'history', 'conversation': self.conversation.pk, 'limit': 3})
+        page = await self.receive(ada)
+        self.assertEqual([m['body'] for m in page['messages']], ['m4', 'm3', 'm2'])
+        await self.send(ada, {'type': 'history', 'conversation': self.conversation.pk,
+                              'before': page['nextCursor'], 'limit': 3})
+        page = await self.receive(ada)
+        self.assertEqual(([m['body'] for m in page['messages']], page['nextCursor']), (['m1', 'm0'], None))
+        await self.disconnect(ada)
+
+    async def test_outsiders_and_bad_tokens_are_refused(self):
+        cy = await self.connect('cy')
+        await self.receive(cy)
+        await self.send(cy, {'type': 'send', 'conversation': self.conversation.pk, 'body': 'Let me in'})
+        self.assertEqual((await self.receive(cy))['code'], 'chat/not-found')
+        await self.send(cy, {'type': 'send', 'conversation': 'nope', 'body': 'x'})
+        self.assertEqual((await self.receive(cy))['code'], 'chat/not-found')
+        await self.disconnect(cy)
+
+        intruder = await self.connect('ada', token='not-a-token')
+        self.assertEqual(await intruder.receive_output(2), {'type': 'websocket.close', 'code': 1008})
+
+    async def test_malformed_bodies_are_rejected_and_the_socket_survives(self):
+        ada = await self.connect('ada')
+        await self.receive(ada)
+        for body in (123, ['hi'], None):
+            await self.send(ada, {'type': 'send', 'conversation': self.conversation.pk, 'body': body})
+            self.assertEqual((await self.receive(ada))['code'], 'chat/empty-message')
+        await self.send(ada, {'type': 'ping'})
+        self.assertEqual(await self.receive(ada), {'type': 'pong'})
+        await self.disconnect(ada)
+
+    async def test_slow_consumer_is_closed_instead_of_buffered(self):
+        sent = []
+        stalled = asyncio.Event()
+
+        async def send(event):
+            sent.append(event)
+            if event['type'] == 'websocket.send':
+                await stalled.wait()
+
+        connection = ChatConnection(send, queue_size=2)
+        for i in range(5):
+            connection.offer(f'frame {i}')
+        self.assertTrue(connection.closed)
+        stalled.set()
+        await connection.finish()
+        self.assertEqual(sent[-1], {'type': 'websocket.close', 'code': CLOSE_TRY_AGAIN_LATER})
+        self.assertLessEqual(len(sent), 3)
+
+    def test_rest_inbox_and_history(self):
+        client = APIClient()
+        client.force_authenticate(self.users['cy'])
+        response = client.post('/auth/chat/conversations/', {'userId': self.users['ada'].pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(client.post('/auth/chat/conversations/', {'userId': self.users['ada'].pk},
+                                     format='json').status_code, 200)
+        inbox = client.get('/auth/chat/conversations/').json()
+        self.assertEqual([row['peer']['name'] for row in inbox['results']], ['Ada'])
+        self.assertEqual(client.get(f'/auth/chat/conversations/{self.conversation.pk}/messages/').status_code, 404)
+
+
+@override_settings(MESSAGE_STREAM_HEARTBEAT_SECONDS=5)
+class MessageFeedTest(StandInTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for uid, is_admin in (('root', True), ('guest', False)):
+            cls.standin.add_user(uid, f'{uid}@example.com')
+            user = User.objects.create_user(username=f'{uid}@example.com', email=f'{uid}@example.com')
+            UserProfile.objects.create(user=user, firebase_uid=uid, is_admin=is_admin)
+        cls.first = Message.objects.create(name='Ann', email='ann@example.com', message='Hello')
+
+    def setUp(self):
+        resolution_cache.clear()
+
+    async def open_stream(self, uid='root', **headers):
+        token = self.standin.mint_token(uid)
+        response = await self.async_client.get('/auth/admin/messages/stream/',
+                                               headers={'Authorization': f'Bearer {token}', **headers})
+        if response.status_code == 200:
+            response.events = response.streaming_content
+        return response
+
+    async def close(self, response):
+        # A client disconnect cancels the task that is streaming the response.
+        pending = asyncio.ensure_future(anext(response.events))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(get_broker().stats()['channels'], 0)
+
+    async def read(self, response):
+        chunk = await asyncio.wait_for(anext(response.events), 2)
+        fields = dict(line.split(': ', 1) for line in chunk.decode().splitlines() if line and not line.startswith(':'))
+        if 'data' in fields:
+            fields['data'] = json.loads(fields['data'])
+        return fields
+
+    async def test_stream_starts_at_the_present_and_is_woken_by_the_broker(self):
+        response = await self.open_stream()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(await self.read(response), {'retry': '5000'})
+        self.assertEqual(await self.read(response), {'event': 'badge', 'data': {'newMessages': 1}})
+
+        message = await Message.objects.acreate(name='Bo', email='bo@example.com', message='Hi there')
+        await get_broker().publish(MESSAGE_EVENTS_CHANNEL, '')
+        created = await self.read(response)
+        self.assertEqual(created['event'], 'created')
+        self.assertEqual((created['data']['id'], created['data']['name'], created['data']['reply']),
+                         (message.pk, 'Bo', None))
+        self.assertEqual((await self.read(response))['data'], {'newMessages': 2})
+        await self.close(response)
+
+    async def test_resumes_after_last_event_id(self):
+        message_id = self.first.pk
+        first_event = await MessageEvent.objects.aget(message_id=message_id)
+        self.first.status = 'read'
+        await self.first.asave()
+        await self.first.adelete()
+
+        response = await self.open_stream(**{'Last-Event-ID': str(first_event.pk)})
+        await self.read(response)
+        await self.read(response)
+        status, deleted = await self.read(response), await self.read(response)
+        self.assertEqual((status['event'], status['data']), ('status', {'id': message_id, 'status': 'read'}))
+        self.assertEqual((deleted['event'], deleted['data']), ('deleted', {'id': message_id}))
+        self.assertEqual(int(deleted['id']), int(status['id']) + 1)
+        self.assertEqual((await self.read(response))['data'], {'newMessages': 0})
+        await self.close(response)
+
+    async def test_pruned_position_asks_for_a_reload(self):
+        for i in range(3):
+            await Message.objects.acreate(name=f'N{i}', email='n@example.com', message='x')
+        await sync_to_async(prune_message_events)(1)
+        latest = await MessageEvent.objects.order_by('-pk').afirst()
+        response = await self.open_stream(**{'Last-Event-ID': '0'})
+        await self.read(response)
+        self.assertEqual(await self.read(response), {'id': str(latest.pk), 'event': 'reset', 'data': {}})
+        await self.close(response)
+
+    async def test_admins_only(self):
+        self.assertEqual((await self.open_stream('guest')).status_code, 403)
+        response = await self.async_client.get('/auth/admin/messages/stream/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_refused_outside_asgi(self):
+        token = self.standin.mint_token('root')
+        response = self.client.get('/auth/admin/messages/stream/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
+
+    def test_bulk_status_changes_are_logged(self):
+        second = Message.objects.create(name='Cy', email='cy@example.com', message='Yo')
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='root@example.com'))
+        response = client.post('/auth/admin/messages/bulk/', {'ids': [self.first.pk, second.pk], 'status': 'archived'},
+                               format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(MessageEvent.objects.filter(kind='status').values_list('message_id', 'status')),
+            [(self.first.pk, 'archived'), (second.pk, 'archived')])
+
+
+class MessageSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='root@example.com', first_name='Root')
+        UserProfile.objects.create(user=cls.admin, firebase_uid='root', is_admin=True)
+        cls.refund = Message.objects.create(name='Dana Lee', email='dana@example.com',
+                                            message='I would like a refund for my <b>lesson</b> please')
+        cls.bug = Message.objects.create(name='Eli Refundo', email='eli@example.com', message='Login is broken')
+        cls.other = Message.objects.create(name='Fay', email='fay@example.com', message='Thanks!', status='read')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, query):
+        response = self.client.get(f'/auth/admin/messages/search/{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def test_ranked_and_highlighted(self):
+        results = self.search('?q=refund')
+        # A sender-name hit outweighs one in the body.
+        self.assertEqual([row['id'] for row in results], [self.bug.pk, self.refund.pk])
+        self.assertEqual(results[0]['highlight']['name'], 'Eli <mark>Refundo</mark>')
+        # Message text is escaped before it is marked up.
+        self.assertIn('<mark>refund</mark> for my &lt;b&gt;lesson&lt;/b&gt;', results[1]['highlight']['snippet'])
+        self.assertEqual([row['id'] for row in self.search('?q=refund&sort=newest')], [self.bug.pk, self.refund.pk])
+        with self.settings(MESSAGE_SEARCH_RANK_WINDOW=1):
+            self.assertEqual([row['id'] for row in self.search('?q=refund')], [self.bug.pk])
+        results = self.search('?q=dana%40example')
+        self.assertEqual([row['id'] for row in results], [self.refund.pk])
+        self.assertEqual(results[0]['highlight']['email'], '<mark>dana</mark>@<mark>example</mark>.com')
+
+    def test_index_follows_message_and_reply_writes(self):
+        MessageReply.objects.create(message=self.other, admin=self.admin, content='Glad the swap worked out')
+        self.assertEqual([row['id'] for row in self.search('?q=swap')], [self.other.pk])
+        self.assertEqual(self.search('?q=swap&status=new'), [])
+        MessageReply.objects.filter(message=self.other).update(content='Anytime')
+        self.assertEqual(self.search('?q=swap'), [])
+
+        Message.objects.filter(pk=self.bug.pk).update(message='Password reset fails')
+        self.assertEqual([row['id'] for row in self.search('?q=passw')], [self.bug.pk])
+        self.other.delete()
+        self.assertEqual(self.search('?q=anytime'), [])
+
+    def test_pages_and_validation(self):
+        for i in range(3):
+            Message.objects.create(name=f'Gus {i}', email='gus@example.com', message='Question')
+        first = self.client.get('/auth/admin/messages/search/?q=question&page_size=2&sort=newest').json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.client.get('/auth/admin/messages/search/?q=x&sort=oldest').status_code, 400)
+        self.assertEqual(self.client.get('/auth/admin/messages/search/?q=x&status=spam').status_code, 400)
+
+
+class MessageArchiveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='root@example.com', first_name='Root', last_name='Admin')
+        UserProfile.objects.create(user=cls.admin, firebase_uid='root', is_admin=True)
+        now = timezone.now()
+        cls.old = cls.message('Old', 'new', now - timedelta(days=400))
+        cls.done = cls.message('Done', 'archived', now - timedelta(days=3))
+        cls.fresh = cls.message('Fresh', 'new', now - timedelta(days=1))
+        MessageReply.objects.create(message=cls.done, admin=cls.admin, content='Sorted')
+        for i in range(5):
+            cls.message(f'Batch {i}', 'archived', now - timedelta(days=2))
+
+    @classmethod
+    def message(cls, name, status, created_at):
+        message = Message.objects.create(name=name, email='a@example.com', message=f'{name} text', status=status)
+        Message.objects.filter(pk=message.pk).update(created_at=created_at)
+        return message
+
+    def test_moves_old_and_archived_messages_in_batches(self):
+        before = MessageEvent.objects.count()
+        with CaptureQueriesContext(connection) as queries:
+            moved = archive_messages(older_than_days=365, batch_size=2)
+        self.assertEqual(moved, 7)
+        self.assertEqual(list(Message.objects.values_list('pk', flat=True)), [self.fresh.pk])
+        self.assertFalse(MessageReply.objects.exists())
+        # Each batch commits on its own: 6 archived rows, then the old one.
+        self.assertEqual(sum(1 for query in queries if query['sql'].startswith('SAVEPOINT')), 5)
+
+        archived = ArchivedMessage.objects.get(pk=self.done.pk)
+        self.assertEqual((archived.name, archived.status, archived.reply_content, archived.reply_admin_id),
+                         ('Done', 'archived', 'Sorted', self.admin.pk))
+        self.assertEqual(get_counters().new_messages, 1)
+        self.assertEqual(count_from_scratch()['new_messages'], 1)
+        self.assertEqual(MessageEvent.objects.filter(kind='deleted').count(), MessageEvent.objects.count() - before)
+        self.assertEqual(archive_messages(older_than_days=365, batch_size=2), 0)
+
+    def test_archive_read_path(self):
+        with self.settings(MESSAGE_ARCHIVE_AFTER_DAYS=None):
+            archive_messages(batch_size=100)
+        self.assertTrue(Message.objects.filter(pk=self.old.pk).exists())
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        page = client.get('/auth/admin/archived-messages/?page_size=4').json()
+        self.assertEqual(len(page['results']), 4)
+        rest = client.get(page['next']).json()
+        self.assertEqual(len(page['results']) + len(rest['results']), 6)
+
+        detail = client.get(f'/auth/admin/archived-messages/{self.done.pk}/').json()
+        listed = next(row for row in page['results'] + rest['results'] if row['id'] == self.done.pk)
+        self.assertEqual(detail, listed)
+        self.assertEqual(detail['reply']['adminName'], 'Root Admin')
+        self.assertEqual(client.get('/auth/admin/archived-messages/?status=new').json()['results'], [])
@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'admin/users', views.UserManagementViewSet, basename='admin-users')
 router.register(r'admin/skills', views.SkillModerationViewSet, basename='admin-skills')
 router.register(r'admin/messages', views.MessageViewSet, basename='admin-messages')
+router.register(r'admin/archived-messages', views.ArchivedMessageViewSet, basename='admin-archived-messages')
 
 urlpatterns = [
     # Auth endpoints
@@ -14,8 +15,31 @@ urlpatterns = [
     path('verify-email/', views.verify_email, name='verify-email'),
     path('google/', views.google_auth, name='google-auth'),
 
+    # Async auth endpoints (served natively when running under ASGI)
+    path('async/register/', async_views.register, name='async-register'),
+    path('async/status/', async_views.status, name='async-status'),
+    path('async/login/', async_views.login, name='async-login'),
+    path('async/verify-email/', async_views.verify_email, name='async-verify-email'),
+    path('async/google/', async_views.google_auth, name='async-google-auth'),
+
+    # Skill catalog
+    path('skills/', views.skills, name='skills'),
+    path('skills/<int:pk>/', views.skill_detail, name='skill-detail'),
+    path('skills/<int:pk>/reviews/', views.skill_reviews, name='skill-reviews'),
+    path('skills/top/', views.top_skills, name='skill-top'),
+    path('skills/search/', views.skill_search, name='skill-search'),
+    path('skills/facets/', views.skill_facets, name='skill-facets'),
+    path('skills/links/', views.skill_links, name='skill-links'),
+    path('skills/matches/', views.skill_matches, name='skill-matches'),
+
+    # Chat (live delivery is the /ws/chat/ WebSocket; see asgi.py)
+    path('chat/conversations/', views.conversations, name='chat-conversations'),
+    path('chat/conversations/<int:pk>/messages/', views.conversation_messages, name='chat-messages'),
+
     # Admin endpoints
     path('admin/stats/', views.admin_stats, name='admin-stats'),
+    path('admin/messages/stream/', async_views.message_stream, name='admin-message-stream'),
     path('admin/settings/', views.system_settings, name='admin-settings'),
+    path('metrics/', views.metrics, name='metrics'),
     path('', include(router.urls)),
 ]
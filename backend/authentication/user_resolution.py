@@ -0,0 +1,194 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+from .counters import adjust_counters
+from .models import UserProfile
+from .singleflight import SingleFlight
+
+# What the auth layer needs to know about a Firebase user without touching
+# the users table again.
+ResolvedUser = namedtuple('ResolvedUser', ['user_id', 'is_active', 'is_admin'])
+
+
+class UserResolutionCache:
+    """Per-process LRU of Firebase uid -> ResolvedUser."""
+
+    def __init__(self, maxsize=None):
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._uids_by_user_id = {}
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        if self._maxsize is None:
+            self._maxsize = getattr(settings, 'USER_RESOLUTION_CACHE_SIZE', 50000)
+        return self._maxsize
+
+    def get(self, uid):
+        with self._lock:
+            resolved = self._entries.get(uid)
+            if resolved is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(uid)
+            self.hits += 1
+            return resolved
+
+    def set(self, uid, resolved):
+        with self._lock:
+            self._entries[uid] = resolved
+            self._entries.move_to_end(uid)
+            self._uids_by_user_id[resolved.user_id] = uid
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._uids_by_user_id.pop(evicted.user_id, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            uid = self._uids_by_user_id.pop(user_id, None)
+            if uid is not None:
+                self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._uids_by_user_id.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+resolution_cache = UserResolutionCache()
+creation_flight = SingleFlight()
+
+
+def resolve_uid(uid, email=None, email_verified=False):
+    """Map a Firebase uid to a ResolvedUser, or None if there is no Django user.
+
+    Users created before ``UserProfile.firebase_uid`` existed are found by
+    username (older code used either the uid or the email as username) and
+    linked on the way through, so later lookups hit the uid index. The email
+    is only trusted for that once Firebase has verified it, and a profile
+    already linked to another uid is never relinked.
+    """
+    resolved = resolution_cache.get(uid)
+    if resolved is not None:
+        return resolved
+
+    row = (
+        UserProfile.objects
+        .filter(firebase_uid=uid)
+        .values_list('user_id', 'user__is_active', 'is_admin')
+        .first()
+    )
+    if row is None:
+        row = _link_legacy_user(uid, email, email_verified)
+        if row is None:
+            return None
+
+    resolved = ResolvedUser(*row)
+    resolution_cache.set(uid, resolved)
+    return resolved
+
+
+async def aresolve_uid(uid, email=None, email_verified=False):
+    """Async counterpart of resolve_uid using the async ORM."""
+    resolved = resolution_cache.get(uid)
+    if resolved is not None:
+        return resolved
+
+    row = await (
+        UserProfile.objects
+        .filter(firebase_uid=uid)
+        .values_list('user_id', 'user__is_active', 'is_admin')
+        .afirst()
+    )
+    if row is None:
+        # Linking writes inside a transaction, which the async ORM can't do.
+        row = await sync_to_async(_link_legacy_user)(uid, email, email_verified)
+        if row is None:
+            return None
+
+    resolved = ResolvedUser(*row)
+    resolution_cache.set(uid, resolved)
+    return resolved
+
+
+def _link_legacy_user(uid, email, email_verified):
+    # Anyone can put an address on a Firebase account; only a verified one
+    # says the caller owns the Django user registered under it.
+    usernames = [uid, email] if email and email_verified else [uid]
+    user = User.objects.filter(username__in=usernames).order_by('id').first()
+    if user is None:
+        return None
+
+    with transaction.atomic():
+        profile, _ = UserProfile.objects.select_for_update().get_or_create(user=user)
+        if profile.firebase_uid and profile.firebase_uid != uid:
+            # Linked to another Firebase account, which keeps it.
+            return None
+        if profile.firebase_uid != uid:
+            profile.firebase_uid = uid
+            profile.save(update_fields=['firebase_uid'])
+    return (user.id, user.is_active, profile.is_admin)
+
+
+def get_or_create_firebase_user(identity):
+    """Return ``(ResolvedUser, created)`` for a Firebase identity.
+
+    Concurrent calls for the same uid in this process share one attempt;
+    across processes the unique username and firebase_uid columns make the
+    loser of a race fall back to the row the winner created. The
+    ResolvedUser is None when the email already belongs to an account this
+    identity may not claim (unverified, or linked to another uid).
+    """
+    return creation_flight.do(identity.uid, _get_or_create_firebase_user, identity)
+
+
+async def aget_or_create_firebase_user(identity):
+    resolved = await aresolve_uid(identity.uid, identity.email, identity.email_verified)
+    if resolved is not None:
+        return resolved, False
+    return await sync_to_async(get_or_create_firebase_user)(identity)
+
+
+def _get_or_create_firebase_user(identity):
+    resolved = resolve_uid(identity.uid, identity.email, identity.email_verified)
+    if resolved is not None:
+        return resolved, False
+
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=identity.email,  # Use email as username
+                email=identity.email,
+                password=None  # Password is managed by Firebase
+            )
+            profile = UserProfile.objects.create(user=user, firebase_uid=identity.uid)
+    except IntegrityError:
+        # Either another request created this identity's user first, or the
+        # email is taken by an account it can't be linked to.
+        return resolve_uid(identity.uid, identity.email, identity.email_verified), False
+
+    resolved = ResolvedUser(user.id, user.is_active, profile.is_admin)
+    resolution_cache.set(identity.uid, resolved)
+    return resolved, True
+
+
+def activate_user(user_id):
+    """Mark a user active without a full-row save, keeping caches and counters in step."""
+    with transaction.atomic():
+        if User.objects.filter(pk=user_id, is_active=False).update(is_active=True):
+            adjust_counters(active_users=1)
+    resolution_cache.invalidate_user(user_id)
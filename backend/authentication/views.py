@@ -1,24 +1,52 @@
+from collections import Counter
+from types import SimpleNamespace
+
 from django.shortcuts import render
-from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework import status as http_status, viewsets
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes, action
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from rest_framework.permissions import AllowAny, BasePermission, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
-from firebase_admin import auth
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings as django_settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import JsonResponse
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
-from .firebase_config import initialize_firebase
-from .models import UserProfile, Skill, Message, MessageReply, SystemSettings
+from django.utils.crypto import constant_time_compare
+from .firebase_config import auth
+from .firebase_cache import get_user_record, identity_from_claims, identity_from_record, verify_id_token
+from .authentication import FirebaseAuthentication
+from .models import UserProfile, Skill, Review, Message, MessageReply, SystemSettings, UserSkillLink, ArchivedMessage
+from .bulk import BulkStatusMixin
+from .chat import ChatError, conversation_peer, conversations_for, get_or_create_conversation, history
+from .counters import SkillLimitReached, create_skill, get_counters
+from .exports import ExportMixin
+from .facets import adjust_facets, facet_counts, facet_deltas_for
+from .filters import AdminListFilter
+from .fast_lists import FastListMixin, ARCHIVED_MESSAGE_LIST_FIELDS, MESSAGE_LIST_FIELDS, SKILL_LIST_FIELDS, USER_LIST_FIELDS
+from .instrumentation import render_prometheus, system_health
+from .matching import OFFERED, WANTED, match_engine, match_results, matching_available, user_skill_links
+from .message_events import record_message_events
+from .message_search import message_results, search_messages
+from .middleware import registration_closed
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .search import SORT_COLUMNS, find_skill_ids, skill_results
+from .settings_cache import get_system_settings
+from .user_resolution import activate_user, get_or_create_firebase_user, resolution_cache, resolve_uid
 from .serializers import (
     UserManagementSerializer,
     SkillModerationSerializer,
+    SkillSerializer,
+    ReviewSerializer,
     MessageSerializer,
+    ArchivedMessageSerializer,
     SystemSettingsSerializer
 )
 
-initialize_firebase()
-
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
@@ -32,26 +60,16 @@ def register(request):
 
         try:
             # Verify the ID token first
-            decoded_token = auth.verify_id_token(id_token)
-            firebase_user = auth.get_user(decoded_token['uid'])
+            decoded_token = verify_id_token(id_token)
+            firebase_user = identity_from_claims(decoded_token)
             
-            # Check if this is a new registration
-            try:
-                # Check if a user with this email already exists
-                existing_user = User.objects.get(email=firebase_user.email)
-                if existing_user:
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': 'An account already exists with this email address'
-                    }, status=409)
-            except User.DoesNotExist:
-                # Create new Django user
-                user = User.objects.create_user(
-                    username=firebase_user.email,  # Use email as username
-                    email=firebase_user.email,
-                    password=None  # Password is managed by Firebase
-                )
-                user.save()
+            # Create the Django user unless one already exists for this account
+            _, created = get_or_create_firebase_user(firebase_user)
+            if not created:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'An account already exists with this email address'
+                }, status=409)
 
             return JsonResponse({
                 'status': 'success',
@@ -101,27 +119,27 @@ def status(request):
             }, status=401)
 
         id_token = auth_header.split(' ')[1]
-        decoded_token = auth.verify_id_token(id_token)
-        firebase_user = auth.get_user(decoded_token['uid'])
+        decoded_token = verify_id_token(id_token)
+        firebase_user = identity_from_claims(decoded_token)
 
-        try:
-            django_user = User.objects.get(email=firebase_user.email)
-            return JsonResponse({
-                'status': 'success',
-                'data': {
-                    'uid': firebase_user.uid,
-                    'email': firebase_user.email,
-                    'emailVerified': firebase_user.email_verified,
-                    'django_id': django_user.id
-                }
-            })
-        except User.DoesNotExist:
+        django_user = resolve_uid(firebase_user.uid, firebase_user.email, firebase_user.email_verified)
+        if django_user is None:
             return JsonResponse({
                 'status': 'error',
                 'message': 'User not found in Django database',
                 'code': 'auth/user-not-found'
             }, status=404)
 
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'uid': firebase_user.uid,
+                'email': firebase_user.email,
+                'emailVerified': firebase_user.email_verified,
+                'django_id': django_user.user_id
+            }
+        })
+
     except auth.InvalidIdTokenError:
         return JsonResponse({
             'status': 'error',
@@ -146,8 +164,8 @@ def login(request):
                 'message': 'No ID token provided'
             }, status=400)
 
-        decoded_token = auth.verify_id_token(id_token)
-        user = auth.get_user(decoded_token['uid'])
+        decoded_token = verify_id_token(id_token)
+        user = identity_from_claims(decoded_token)
 
         if not user.email_verified:
             return JsonResponse({
@@ -189,13 +207,16 @@ def verify_email(request):
                 'message': 'No ID token provided'
             }, status=400)
 
-        decoded_token = auth.verify_id_token(id_token)
-        firebase_user = auth.get_user(decoded_token['uid'])
+        decoded_token = verify_id_token(id_token)
+        firebase_user = identity_from_claims(decoded_token)
+        if not firebase_user.email_verified:
+            # The token may predate the click on the verification link, so ask
+            # Firebase for the current record instead of trusting the claim.
+            firebase_user = identity_from_record(get_user_record(firebase_user.uid, refresh=True))
 
         # First check if the user exists in our database
-        try:
-            django_user = User.objects.get(email=firebase_user.email)
-        except User.DoesNotExist:
+        django_user = resolve_uid(firebase_user.uid, firebase_user.email, firebase_user.email_verified)
+        if django_user is None:
             return JsonResponse({
                 'status': 'error',
                 'message': 'User not found in our database. Please register first.',
@@ -205,8 +226,8 @@ def verify_email(request):
         # Then check if the email is verified in Firebase
         if firebase_user.email_verified:
             # Update Django user status
-            django_user.is_active = True
-            django_user.save()
+            if not django_user.is_active:
+                activate_user(django_user.user_id)
 
             return JsonResponse({
                 'status': 'success',
@@ -215,7 +236,7 @@ def verify_email(request):
                     'uid': firebase_user.uid,
                     'email': firebase_user.email,
                     'emailVerified': True,
-                    'django_id': django_user.id
+                    'django_id': django_user.user_id
                 }
             })
         else:
@@ -262,20 +283,19 @@ def google_auth(request):
 
         try:
             # Verify the ID token
-            decoded_token = auth.verify_id_token(id_token)
-            firebase_user = auth.get_user(decoded_token['uid'])
+            decoded_token = verify_id_token(id_token)
+            firebase_user = identity_from_claims(decoded_token)
             
             # Try to get existing user or create new one
-            try:
-                user = User.objects.get(email=firebase_user.email)
-            except User.DoesNotExist:
-                # Create new Django user for Google authentication
-                user = User.objects.create_user(
-                    username=firebase_user.email,
-                    email=firebase_user.email,
-                    password=None  # Password not needed for Google auth
-                )
-                user.save()
+            if (not get_system_settings().allow_new_registrations
+                    and resolve_uid(firebase_user.uid, firebase_user.email, firebase_user.email_verified) is None):
+                return registration_closed()
+            resolved, _ = get_or_create_firebase_user(firebase_user)
+            if resolved is None:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'An account already exists with this email address'
+                }, status=409)
 
             return JsonResponse({
                 'status': 'success',
@@ -302,89 +322,126 @@ def google_auth(request):
         }, status=500)
 
 # Admin views
-class IsAdmin:
+class IsAdmin(BasePermission):
     def has_permission(self, request, view):
+        resolved = getattr(request, 'resolved_user', None)
+        if resolved is not None:
+            return resolved.is_admin
         try:
             return bool(request.user and request.user.userprofile.is_admin)
         except UserProfile.DoesNotExist:
             return False
 
 @api_view(['GET'])
+@authentication_classes([FirebaseAuthentication])
 @permission_classes([IsAuthenticated, IsAdmin])
 def admin_stats(request):
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    total_skills = Skill.objects.count()
-    pending_skills = Skill.objects.filter(status='pending').count()
-    new_messages = Message.objects.filter(status='new').count()
+    # Running totals maintained on write; see signals.py and recount_stats.
+    counters = get_counters()
     
     stats = {
-        'totalUsers': total_users,
-        'activeUsers': active_users,
-        'totalSkills': total_skills,
-        'pendingSkills': pending_skills,
-        'newMessages': new_messages,
-        'systemHealth': {
-            'status': 'healthy',
-            'lastChecked': '2025-05-15T00:00:00Z',
-            'issues': 0
-        }
+        'totalUsers': counters.total_users,
+        'activeUsers': counters.active_users,
+        'totalSkills': counters.total_skills,
+        'pendingSkills': counters.pending_skills,
+        'newMessages': counters.new_messages,
+        'systemHealth': system_health()
     }
     return Response(stats)
 
-class UserManagementViewSet(viewsets.ModelViewSet):
+class UserManagementViewSet(BulkStatusMixin, ExportMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = UserManagementSerializer
+    authentication_classes = [FirebaseAuthentication]
     permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    filter_backends = [AdminListFilter]
+    keyset_field = 'date_joined'
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_fields = USER_LIST_FIELDS
+    export_name = 'users'
+    status_field = 'is_active'
+    status_values = {'active': True, 'suspended': False}
+    bulk_statuses = ('active', 'suspended')
+    status_counter = ('active_users', True)
     
     def get_queryset(self):
-        return User.objects.all()
-    
-    def partial_update(self, request, pk=None):
-        user = get_object_or_404(User, pk=pk)
-        status = request.data.get('status')
-        
-        if status == 'active':
-            user.is_active = True
-        elif status == 'suspended':
-            user.is_active = False
-        
-        user.save()
-        return Response(status=status.HTTP_200_OK)
+        return User.objects.select_related('userprofile')
 
-class SkillModerationViewSet(viewsets.ModelViewSet):
+    def bulk_updated(self, ids):
+        # Suspension must take effect on the user's next request.
+        for user_id in ids:
+            resolution_cache.invalidate_user(user_id)
+        match_engine.sync_users(ids)
+
+class SkillModerationViewSet(BulkStatusMixin, ExportMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = SkillModerationSerializer
+    authentication_classes = [FirebaseAuthentication]
     permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    filter_backends = [AdminListFilter]
+    keyset_field = 'created_at'
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_fields = SKILL_LIST_FIELDS
+    export_name = 'skills'
+    status_values = {value: value for value, _ in Skill.STATUS_CHOICES}
+    bulk_statuses = ('active', 'rejected')
+    status_counter = ('pending_skills', 'pending')
+    filter_fields = ('category', 'author')
     
     def get_queryset(self):
-        return Skill.objects.all()
-    
-    def partial_update(self, request, pk=None):
-        skill = get_object_or_404(Skill, pk=pk)
-        status = request.data.get('status')
-        
-        if status in ['active', 'rejected']:
-            skill.status = status
-            skill.save()
-        
-        return Response(status=status.HTTP_200_OK)
+        return Skill.objects.select_related('author')
+
+    def status_changed(self, ids, previous, new_value):
+        deltas = Counter()
+        leaving = [pk for pk in ids if previous[pk] == 'active']
+        if leaving:
+            deltas.update(facet_deltas_for(leaving, -1))
+        if new_value == 'active':
+            deltas.update(facet_deltas_for(ids, 1))
+        adjust_facets(deltas)
+
+    def bulk_updated(self, ids):
+        match_engine.sync_skills(ids)
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(BulkStatusMixin, ExportMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = MessageSerializer
+    authentication_classes = [FirebaseAuthentication]
     permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    filter_backends = [AdminListFilter]
+    keyset_field = 'created_at'
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_fields = MESSAGE_LIST_FIELDS
+    export_name = 'messages'
+    status_values = {value: value for value, _ in Message.STATUS_CHOICES}
+    bulk_statuses = ('read', 'archived')
+    status_counter = ('new_messages', 'new')
     
     def get_queryset(self):
-        return Message.objects.all()
-    
-    def partial_update(self, request, pk=None):
-        message = get_object_or_404(Message, pk=pk)
-        status = request.data.get('status')
-        
-        if status in ['read', 'archived']:
-            message.status = status
-            message.save()
-        
-        return Response(status=status.HTTP_200_OK)
+        return Message.objects.select_related('reply__admin')
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        # Ranked, highlighted matches from the FTS5 index; see message_search.py.
+        params = request.query_params
+        status = params.get('status') or None
+        if status is not None and status not in self.status_values:
+            raise ValidationError({'status': f'Expected one of: {", ".join(self.status_values)}'})
+        sort = params.get('sort') or None
+        if sort not in (None, 'relevance', 'newest'):
+            raise ValidationError({'sort': 'Expected one of: relevance, newest'})
+        page, page_size, offset = _search_page(request)
+        matches = search_messages(params.get('q', ''), status=status, offset=offset, limit=page_size + 1,
+                                  sort=sort)
+        return Response({
+            'next': _next_search_page(request, page, len(matches) > page_size),
+            'results': message_results(matches[:page_size]),
+        })
+
+    def status_changed(self, ids, previous, new_value):
+        # update() sends no signals; the admin feed still has to hear of it.
+        record_message_events('status', dict.fromkeys(ids, new_value))
+    
     @action(detail=True, methods=['post'])
     def reply(self, request, pk=None):
         message = get_object_or_404(Message, pk=pk)
@@ -398,22 +455,278 @@ class MessageViewSet(viewsets.ModelViewSet):
         message.status = 'read'
         message.save()
         
-        return Response(status=status.HTTP_201_CREATED)
+        return Response(status=http_status.HTTP_201_CREATED)
+
+class ArchivedMessageViewSet(ExportMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
+    # Messages moved out of the inbox by `manage.py archive_messages`.
+    serializer_class = ArchivedMessageSerializer
+    authentication_classes = [FirebaseAuthentication]
+    permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
+    filter_backends = [AdminListFilter]
+    keyset_field = 'created_at'
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_fields = ARCHIVED_MESSAGE_LIST_FIELDS
+    export_name = 'archived-messages'
+    status_field = 'status'
+    status_values = {value: value for value, _ in Message.STATUS_CHOICES}
+    filter_fields = ()
+
+    def get_queryset(self):
+        return ArchivedMessage.objects.select_related('reply_admin')
 
 @api_view(['GET', 'PUT'])
+@authentication_classes([FirebaseAuthentication])
 @permission_classes([IsAuthenticated, IsAdmin])
 def system_settings(request):
-    settings = SystemSettings.objects.first()
-    if not settings:
-        settings = SystemSettings.objects.create()
+    settings = get_system_settings()
     
     if request.method == 'GET':
         serializer = SystemSettingsSerializer(settings)
         return Response(serializer.data)
     
     elif request.method == 'PUT':
+        # Edit a fresh copy; the cached instance is shared by every request.
+        settings = SystemSettings.objects.get(pk=settings.pk)
         serializer = SystemSettingsSerializer(settings, data=request.data)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.errors, status=http_status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def metrics(request):
+    # Scrapers can't present Firebase tokens, so METRICS_TOKEN is a shared
+    # secret for them; without one the endpoint is for admins only.
+    token = getattr(django_settings, 'METRICS_TOKEN', None)
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+    else:
+        try:
+            authenticated = FirebaseAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            authenticated = None
+        if authenticated is None:
+            return HttpResponse(status=401)
+        if not IsAdmin().has_permission(request, None):
+            return HttpResponse(status=403)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4')
+
+def _search_page(request):
+    """``(page, page_size, offset)`` for the ranked search endpoints, which
+    page by offset because relevance order has no stable keyset."""
+    page_size = KeysetPagination().get_page_size(request)
+    try:
+        page = max(1, int(request.query_params.get('page', 1)))
+    except ValueError:
+        raise ValidationError({'page': 'Expected an integer.'})
+    offset = (page - 1) * page_size
+    if offset >= getattr(django_settings, 'SEARCH_MAX_RESULTS', 10000):
+        raise ValidationError({'page': 'Refine the search to see more results.'})
+    return page, page_size, offset
+
+def _next_search_page(request, page, has_more):
+    return replace_query_param(request.build_absolute_uri(), 'page', page + 1) if has_more else None
+
+def _min_rating(params):
+    try:
+        return float(params['min_rating']) if params.get('min_rating') else None
+    except ValueError:
+        raise ValidationError({'min_rating': 'Expected a number.'})
+
+def _current_user_id(request):
+    resolved = getattr(request, 'resolved_user', None)
+    return resolved.user_id if resolved is not None else request.user.pk
+
+@api_view(['POST'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+def skills(request):
+    serializer = SkillSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    settings = get_system_settings()
+    initial_status = 'pending' if settings.skill_approval_required else 'active'
+    try:
+        skill = create_skill(_current_user_id(request), settings.max_skills_per_user,
+                             status=initial_status, **serializer.validated_data)
+    except SkillLimitReached:
+        return Response({
+            'detail': f'You can list at most {settings.max_skills_per_user} skills.',
+            'code': 'skills/limit-reached',
+        }, status=http_status.HTTP_403_FORBIDDEN)
+    return Response(SkillSerializer(skill).data, status=http_status.HTTP_201_CREATED)
+
+@api_view(['DELETE'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+def skill_detail(request, pk):
+    skill = get_object_or_404(Skill, pk=pk, author_id=_current_user_id(request))
+    skill.delete()
+    return Response(status=http_status.HTTP_204_NO_CONTENT)
+
+# What KeysetPagination needs from a view to page a skill's reviews.
+REVIEW_LIST_VIEW = SimpleNamespace(keyset_field='created_at')
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def skill_reviews(request, pk):
+    if request.method == 'GET':
+        reviews = Review.objects.filter(skill_id=pk).select_related('reviewer')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(reviews, request, view=REVIEW_LIST_VIEW)
+        return paginator.get_paginated_response(ReviewSerializer(page, many=True).data)
+
+    user_id = _current_user_id(request)
+    if request.method == 'DELETE':
+        # Deleting through the instance lets the signal fold it out of the totals.
+        with transaction.atomic():
+            for review in Review.objects.filter(skill_id=pk, reviewer_id=user_id):
+                review.delete()
+        return Response(status=http_status.HTTP_204_NO_CONTENT)
+
+    skill = Skill.objects.filter(pk=pk, status='active').values('author_id').first()
+    if skill is None:
+        raise NotFound('No such active skill.')
+    if skill['author_id'] == user_id:
+        raise ValidationError({'skill': 'You cannot review your own skill.'})
+    serializer = ReviewSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        review, created = Review.objects.update_or_create(
+            skill_id=pk, reviewer_id=user_id, defaults=serializer.validated_data)
+    return Response(ReviewSerializer(review).data,
+                    status=http_status.HTTP_201_CREATED if created else http_status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([FastJSONRenderer])
+def top_skills(request):
+    # Backward scans of the (status, trending_score|rating, id) indexes.
+    by = request.query_params.get('by', 'trending')
+    if by not in ('trending', 'rating'):
+        raise ValidationError({'by': 'Expected trending or rating.'})
+    limit = KeysetPagination().get_page_size(request)
+    return Response({'results': skill_results(find_skill_ids(sort=by, limit=limit))})
+
+def _sort(value):
+    if value and value not in SORT_COLUMNS:
+        raise ValidationError({'sort': f'Expected one of {", ".join(SORT_COLUMNS)}.'})
+    return value or None
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([FastJSONRenderer])
+def skill_search(request):
+    params = request.query_params
+    page, page_size, offset = _search_page(request)
+    min_rating = _min_rating(params)
+
+    ids = find_skill_ids(
+        params.get('q', ''),
+        category=params.get('category'),
+        level=params.get('level'),
+        min_rating=min_rating,
+        offset=offset,
+        limit=page_size + 1,
+        sort=_sort(params.get('sort')),
+    )
+    return Response({
+        'next': _next_search_page(request, page, len(ids) > page_size),
+        'results': skill_results(ids[:page_size]),
+    })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([FastJSONRenderer])
+def skill_facets(request):
+    # Served from the SkillFacetCount table; see facets.py.
+    params = request.query_params
+    return Response(facet_counts(
+        category=params.get('category') or None,
+        level=params.get('level') or None,
+        min_rating=_min_rating(params),
+    ))
+
+
+@api_view(['GET', 'POST', 'DELETE'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+def skill_links(request):
+    user_id = _current_user_id(request)
+    if request.method == 'GET':
+        return Response(user_skill_links(user_id))
+
+    kind = request.data.get('kind')
+    if kind not in (OFFERED, WANTED):
+        raise ValidationError({'kind': f'Expected "{OFFERED}" or "{WANTED}".'})
+    try:
+        skill_id = int(request.data.get('skillId'))
+    except (TypeError, ValueError):
+        raise ValidationError({'skillId': 'Expected a skill id.'})
+    if request.method == 'DELETE':
+        UserSkillLink.objects.filter(user_id=user_id, skill_id=skill_id, kind=kind).delete()
+        return Response(status=http_status.HTTP_204_NO_CONTENT)
+
+    skill = Skill.objects.filter(pk=skill_id, status='active').values('author_id').first()
+    if skill is None:
+        raise ValidationError({'skillId': 'No such active skill.'})
+    if skill['author_id'] == user_id:
+        raise ValidationError({'skillId': 'Your own skills are already offered.'})
+    _, created = UserSkillLink.objects.get_or_create(user_id=user_id, skill_id=skill_id, kind=kind)
+    return Response(status=http_status.HTTP_201_CREATED if created else http_status.HTTP_200_OK)
+
+@api_view(['GET'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer])
+def skill_matches(request):
+    if not matching_available():
+        return Response({'detail': 'Matching is not available on this server.'},
+                        status=http_status.HTTP_503_SERVICE_UNAVAILABLE)
+    max_results = match_engine.result_limit
+    try:
+        limit = min(max_results, max(1, int(request.query_params.get('limit', 20))))
+    except ValueError:
+        raise ValidationError({'limit': 'Expected an integer.'})
+    return Response({'results': match_results(_current_user_id(request), limit)})
+
+def _chat_error(error):
+    status = http_status.HTTP_404_NOT_FOUND if error.code == 'chat/not-found' else http_status.HTTP_400_BAD_REQUEST
+    return Response({'detail': error.message, 'code': error.code}, status=status)
+
+@api_view(['GET', 'POST'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+def conversations(request):
+    # Live messages go over the /ws/chat/ socket; these serve the inbox and
+    # opening a conversation.
+    user_id = _current_user_id(request)
+    try:
+        if request.method == 'GET':
+            params = request.query_params
+            return Response(conversations_for(user_id, params.get('before'), params.get('limit')))
+        try:
+            other_id = int(request.data.get('userId'))
+        except (TypeError, ValueError):
+            raise ValidationError({'userId': 'Expected a user id.'})
+        conversation, created = get_or_create_conversation(user_id, other_id)
+    except ChatError as e:
+        return _chat_error(e)
+    return Response({'id': conversation.pk},
+                    status=http_status.HTTP_201_CREATED if created else http_status.HTTP_200_OK)
+
+@api_view(['GET'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer])
+def conversation_messages(request, pk):
+    params = request.query_params
+    try:
+        conversation_peer(pk, _current_user_id(request))
+        return Response(history(pk, params.get('before'), params.get('limit')))
+    except ChatError as e:
+        return _chat_error(e)
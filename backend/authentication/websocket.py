@@ -0,0 +1,200 @@
+"""Raw ASGI WebSocket endpoint for chat (``/ws/chat/``).
+
+Frames are JSON text. The first frame must authenticate, with the same
+Firebase ID token the REST API takes:
+
+    -> {"type": "auth", "token": "<id token>"}
+    <- {"type": "ready", "userId": 7}
+    -> {"type": "send", "conversation": 3, "body": "hi", "clientId": "a1"}
+    <- {"type": "sent", "clientId": "a1", "message": {...}}
+    <- {"type": "message", "message": {...}}     (to every socket of both users)
+    -> {"type": "history", "conversation": 3, "before": 120, "limit": 50}
+    <- {"type": "history", "conversation": 3, "messages": [...], "nextCursor": 71}
+    -> {"type": "ping"}
+    <- {"type": "pong"}
+
+Failures answer {"type": "error", "code": ..., "message": ...} and leave
+the socket open. Because the token travels in a frame and not a cookie,
+another site can't ride a visitor's session by opening the socket.
+
+Each socket is one reader (this coroutine) plus one writer task draining
+a bounded send queue. Broker fan-out never waits on a slow client: when
+its queue is full the socket is closed with 1013 (try again later), and
+the client reconnects and backfills from history. An idle socket is just
+those two suspended coroutines, so a worker holds thousands.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import chat
+from .async_views import averify_id_token
+from .broker import get_broker
+from .user_resolution import aresolve_uid
+
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013
+_CLOSE = object()
+
+
+def _dumps(payload):
+    return json.dumps(payload, separators=(',', ':'))
+
+
+class ChatConnection:
+    def __init__(self, send, queue_size=None):
+        self._send = send
+        self.queue = asyncio.Queue(queue_size or getattr(settings, 'CHAT_SEND_QUEUE_SIZE', 256))
+        self.user_id = None
+        self.closed = False
+        self.close_code = None
+        self._peers = {}
+        self._writer = asyncio.create_task(self._write())
+
+    def offer(self, text):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.close(CLOSE_TRY_AGAIN_LATER)
+
+    def reply(self, payload):
+        self.offer(_dumps(payload))
+
+    def error(self, code, message):
+        self.reply({'type': 'error', 'code': code, 'message': message})
+
+    def close(self, code):
+        if self.closed:
+            return
+        self.closed = True
+        self.close_code = code
+        # Whatever is still queued is dropped; the client backfills from history.
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSE)
+
+    async def _write(self):
+        while True:
+            text = await self.queue.get()
+            if text is _CLOSE:
+                await self._send({'type': 'websocket.close', 'code': self.close_code})
+                return
+            await self._send({'type': 'websocket.send', 'text': text})
+
+    async def finish(self):
+        """Flush a pending close frame, or stop the writer if the client left."""
+        if self.close_code is None:
+            self._writer.cancel()
+        try:
+            await self._writer
+        except (asyncio.CancelledError, OSError):
+            pass
+
+    async def peer(self, conversation_id):
+        """The other participant, remembered per socket after the first check."""
+        peer = self._peers.get(conversation_id)
+        if peer is None:
+            peer = await sync_to_async(chat.conversation_peer)(conversation_id, self.user_id)
+            self._peers[conversation_id] = peer
+        return peer
+
+
+async def _authenticate(receive):
+    timeout = getattr(settings, 'CHAT_AUTH_TIMEOUT_SECONDS', 10)
+    try:
+        event = await asyncio.wait_for(receive(), timeout)
+    except asyncio.TimeoutError:
+        return None
+    if event['type'] != 'websocket.receive':
+        return None
+    frame = _parse(event)
+    if not frame or frame.get('type') != 'auth' or not frame.get('token'):
+        return None
+    try:
+        claims = await averify_id_token(frame['token'])
+    except Exception:
+        return None
+    resolved = await aresolve_uid(claims['uid'], claims.get('email'), claims.get('email_verified', False))
+    if resolved is None or not resolved.is_active:
+        return None
+    return resolved.user_id
+
+
+def _parse(event):
+    text = event.get('text')
+    if text is None and event.get('bytes') is not None:
+        text = event['bytes'].decode('utf-8', 'replace')
+    try:
+        frame = json.loads(text or '')
+    except ValueError:
+        return None
+    return frame if isinstance(frame, dict) else None
+
+
+def _conversation_id(frame):
+    conversation_id = frame.get('conversation')
+    if not isinstance(conversation_id, int) or isinstance(conversation_id, bool):
+        raise chat.ChatError('chat/not-found', 'No such conversation.')
+    return conversation_id
+
+
+async def _handle(frame, connection, broker):
+    kind = frame.get('type')
+    if kind == 'ping':
+        connection.reply({'type': 'pong'})
+    elif kind == 'send':
+        conversation_id = _conversation_id(frame)
+        peer = await connection.peer(conversation_id)
+        message = await sync_to_async(chat.post_message)(conversation_id, connection.user_id, frame.get('body'))
+        connection.reply({'type': 'sent', 'clientId': frame.get('clientId'), 'message': message})
+        text = _dumps({'type': 'message', 'message': message})
+        for user_id in {connection.user_id, peer}:
+            await broker.publish(chat.user_channel(user_id), text)
+    elif kind == 'history':
+        conversation_id = _conversation_id(frame)
+        await connection.peer(conversation_id)
+        page = await sync_to_async(chat.history)(conversation_id, frame.get('before'), frame.get('limit'))
+        connection.reply({'type': 'history', 'conversation': conversation_id, **page})
+    else:
+        connection.error('chat/unknown-frame', 'Unknown frame type.')
+
+
+async def chat_application(scope, receive, send):
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+    await send({'type': 'websocket.accept'})
+
+    connection = ChatConnection(send)
+    broker = get_broker()
+    channel = None
+    try:
+        connection.user_id = await _authenticate(receive)
+        if connection.user_id is None:
+            connection.close(CLOSE_POLICY_VIOLATION)
+            return
+        channel = chat.user_channel(connection.user_id)
+        await broker.subscribe(channel, connection)
+        connection.reply({'type': 'ready', 'userId': connection.user_id})
+
+        while not connection.closed:
+            event = await receive()
+            if event['type'] == 'websocket.disconnect':
+                connection.closed = True
+                break
+            frame = _parse(event)
+            if frame is None:
+                connection.error('chat/invalid-frame', 'Frames must be JSON objects.')
+                continue
+            try:
+                await _handle(frame, connection, broker)
+            except chat.ChatError as e:
+                connection.error(e.code, e.message)
+    finally:
+        if channel is not None:
+            await broker.unsubscribe(channel, connection)
+        await connection.finish()
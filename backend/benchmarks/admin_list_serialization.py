@@ -0,0 +1,100 @@
+"""Micro-benchmark: admin list rows via ModelSerializer vs the values() path.
+
+Seeds a throwaway SQLite database, then times both ways of turning one page
+of each admin list into JSON bytes and checks they produce the same rows.
+
+    python benchmarks/admin_list_serialization.py --rows 5000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from authentication.models import Message, MessageReply, Skill, UserProfile  # noqa: E402
+from authentication.renderers import FastJSONRenderer  # noqa: E402
+from authentication.views import MessageViewSet, SkillModerationViewSet, UserManagementViewSet  # noqa: E402
+
+
+def create_database():
+    path = os.path.join(tempfile.mkdtemp(), 'serialization.sqlite3')
+    connection.settings_dict['TEST']['NAME'] = path
+    connection.creation.create_test_db(verbosity=0)
+
+
+def seed(rows):
+    admin = User.objects.create_user(username='admin@example.com', email='admin@example.com', first_name='Admin')
+    User.objects.bulk_create(
+        User(username=f'user{i}@example.com', email=f'user{i}@example.com', first_name=f'User{i}', last_name='Test')
+        for i in range(rows))
+    users = list(User.objects.exclude(pk=admin.pk))
+    UserProfile.objects.bulk_create(UserProfile(user=user, firebase_uid=f'uid{user.pk}') for user in users)
+    Skill.objects.bulk_create(
+        Skill(title=f'Skill {i}', author=users[i % len(users)], category='Programming') for i in range(rows))
+    Message.objects.bulk_create(
+        Message(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hello') for i in range(rows))
+    MessageReply.objects.bulk_create(
+        MessageReply(message=message, admin=admin, content='Thanks')
+        for message in Message.objects.all()[:rows // 2])
+
+
+def serializer_path(viewset, rows):
+    view = viewset()
+    queryset = view.get_queryset().order_by(f'-{view.keyset_field}', '-id')[:rows]
+    return JSONRenderer().render(view.get_serializer_class()(queryset, many=True).data)
+
+
+def fast_path(viewset, rows):
+    view = viewset()
+    fields = list(view.list_fields)
+    columns = {'id', view.keyset_field}
+    for field in fields:
+        columns.update(view.list_fields[field][0])
+    queryset = view.get_queryset().order_by(f'-{view.keyset_field}', '-id').values(*columns)[:rows]
+    getters = [(field, view.list_fields[field][1]) for field in fields]
+    return FastJSONRenderer().render([{field: getter(row) for field, getter in getters} for row in queryset])
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    create_database()
+    seed(args.rows)
+
+    print(f'{args.rows} rows per list, best of {args.repeat}')
+    print(f'{"list":<10}{"serializer ms":>15}{"fast ms":>10}{"speed-up":>10}')
+    for name, viewset in (('users', UserManagementViewSet), ('skills', SkillModerationViewSet),
+                          ('messages', MessageViewSet)):
+        if json.loads(serializer_path(viewset, args.rows)) != json.loads(fast_path(viewset, args.rows)):
+            sys.exit(f'{name}: fast path output differs from the serializer')
+        slow = best_of(args.repeat, serializer_path, viewset, args.rows)
+        fast = best_of(args.repeat, fast_path, viewset, args.rows)
+        print(f'{name:<10}{slow * 1000:>15.1f}{fast * 1000:>10.1f}{slow / fast:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Compare WSGI and ASGI throughput of the auth status endpoint.
+
+Firebase is replaced by the offline stand-in, which verifies real RS256
+tokens and adds ``--latency`` milliseconds per call to model the network
+round-trip. Every request carries a fresh token, so the verified-token cache
+never helps.
+
+The WSGI run drives the sync view from ``--wsgi-threads`` threads, which is
+the most a threaded WSGI worker can have in flight. The ASGI run drives the
+async view from a single event loop with ``--asgi-concurrency`` requests in
+flight at once.
+
+    python benchmarks/auth_throughput.py --requests 1000 --latency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import AsyncClient, Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from authentication.firebase_standin import FirebaseStandIn  # noqa: E402
+from authentication.models import UserProfile  # noqa: E402
+
+USERS = 100
+
+
+def create_users(standin):
+    for i in range(USERS):
+        standin.add_user(f'user{i}', f'user{i}@example.com')
+        user = User.objects.create_user(username=f'user{i}@example.com', email=f'user{i}@example.com')
+        UserProfile.objects.create(user=user, firebase_uid=f'user{i}')
+
+
+def tokens(standin, run, count):
+    # The nonce claim keeps every token distinct.
+    return [standin.mint_token(f'user{i % USERS}', nonce=f'{run}-{i}') for i in range(count)]
+
+
+def run_wsgi(tokens, threads):
+    local = threading.local()
+
+    def request(token):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        client = local.client
+        start = time.perf_counter()
+        response = client.get('/auth/status/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(request, tokens))
+    return time.perf_counter() - start, latencies
+
+
+async def run_asgi(tokens, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(token):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get('/auth/async/status/', headers={'Authorization': f'Bearer {token}'})
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(request(token) for token in tokens))
+    return time.perf_counter() - start, latencies
+
+
+def report(name, elapsed, latencies):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f'{name:<5} {len(latencies) / elapsed:>9.1f} req/s   '
+        f'p50 {quantiles[49] * 1000:>7.1f} ms   p99 {quantiles[98] * 1000:>7.1f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=50, help='stand-in latency in milliseconds')
+    parser.add_argument('--wsgi-threads', type=int, default=8)
+    parser.add_argument('--asgi-concurrency', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    standin = FirebaseStandIn(latency=args.latency / 1000)
+    create_users(standin)
+    wsgi_tokens = tokens(standin, 'wsgi', args.requests)
+    asgi_tokens = tokens(standin, 'asgi', args.requests)
+
+    with standin.installed():
+        print(f'{args.requests} requests, {args.latency:.0f} ms Firebase latency')
+        report('wsgi', *run_wsgi(wsgi_tokens, args.wsgi_threads))
+        report('asgi', *asyncio.run(run_asgi(asgi_tokens, args.asgi_concurrency)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Measure backend cold-start cost.
+
+Reports, for a fresh interpreter:
+
+* the slowest imports while loading settings, apps and the URLconf, taken
+  from ``python -X importtime``;
+* wall-clock time from process spawn to the first response served by the
+  WSGI handler;
+* wall-clock time of ``manage.py check`` (the floor for every management
+  command: migrate, shell, test, ...).
+
+    python benchmarks/cold_start.py --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOAD_PROJECT = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+import django
+django.setup()
+import skillswap_backend.urls
+"""
+
+FIRST_RESPONSE = """
+import os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.test.utils import setup_test_environment
+get_wsgi_application()
+setup_test_environment()
+response = Client().get('/auth/status/')
+sys.stdout.write(f'{time.time()} {response.status_code}')
+"""
+
+
+def run(args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+
+def import_times(top):
+    result = run(['-X', 'importtime', '-c', LOAD_PROJECT])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    # Top-level imports (no leading indentation in the report) add up to the total.
+    total = sum(cumulative for cumulative, _, name in rows if not name[1:].startswith(' '))
+    print(f'import time: {total / 1000:.1f} ms total')
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f'  {cumulative / 1000:>8.1f} ms cumulative  {self_us / 1000:>7.1f} ms self  {name.strip()}')
+
+
+def time_to_first_response():
+    start = time.time()
+    result = run(['-c', FIRST_RESPONSE])
+    responded_at, status_code = result.stdout.split()
+    return float(responded_at) - start, status_code
+
+
+def time_check():
+    start = time.perf_counter()
+    run(['manage.py', 'check'])
+    return time.perf_counter() - start
+
+
+def summarize(name, samples):
+    samples = [sample * 1000 for sample in samples]
+    print(f'{name:<20} median {statistics.median(samples):>7.1f} ms   min {min(samples):>7.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    import_times(args.top)
+    print()
+    summarize('first response', [time_to_first_response()[0] for _ in range(args.runs)])
+    summarize('manage.py check', [time_check() for _ in range(args.runs)])
+
+
+if __name__ == '__main__':
+    main()
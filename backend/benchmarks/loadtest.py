@@ -0,0 +1,199 @@
+"""Concurrent load test for the auth and admin endpoints.
+
+Runs the project's WSGI application on a local threaded HTTP server, backed
+by a throwaway SQLite database and the offline Firebase stand-in, then drives
+it from ``--concurrency`` client threads for ``--duration`` seconds with a
+weighted mix of requests. Reports requests per second and p50/p95/p99
+latency per endpoint.
+
+    python benchmarks/loadtest.py --duration 10 --concurrency 32 --latency 20
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from authentication.firebase_standin import FirebaseStandIn  # noqa: E402
+from authentication.models import Message, Skill, UserProfile  # noqa: E402
+
+# (name, weight, method, path, body kind)
+SCENARIO = [
+    ('status', 40, 'GET', '/auth/status/', None),
+    ('register', 10, 'POST', '/auth/register/', 'new-user'),
+    ('google', 10, 'POST', '/auth/google/', 'user'),
+    ('admin stats', 10, 'GET', '/auth/admin/stats/', None),
+    ('admin users', 10, 'GET', '/auth/admin/users/', None),
+    ('admin skills', 10, 'GET', '/auth/admin/skills/', None),
+    ('admin messages', 10, 'GET', '/auth/admin/messages/', None),
+]
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def create_database():
+    path = os.path.join(tempfile.mkdtemp(), 'loadtest.sqlite3')
+    connection.settings_dict['TEST']['NAME'] = path
+    connection.creation.create_test_db(verbosity=0)
+    connection.close()
+
+
+def seed(standin, users, skills, messages):
+    standin.add_user('admin', 'admin@example.com')
+    admin = User.objects.create_user(username='admin@example.com', email='admin@example.com')
+    UserProfile.objects.create(user=admin, firebase_uid='admin', is_admin=True)
+
+    for i in range(users):
+        standin.add_user(f'user{i}', f'user{i}@example.com')
+    User.objects.bulk_create(
+        User(username=f'user{i}@example.com', email=f'user{i}@example.com') for i in range(users))
+    UserProfile.objects.bulk_create(
+        UserProfile(user=user, firebase_uid=user.username.split('@')[0])
+        for user in User.objects.exclude(pk=admin.pk))
+
+    authors = list(User.objects.values_list('id', flat=True)[:max(users, 1)])
+    Skill.objects.bulk_create(
+        Skill(title=f'Skill {i}', author_id=authors[i % len(authors)], category='Programming',
+              status=random.choice(['active', 'pending', 'rejected']))
+        for i in range(skills))
+    Message.objects.bulk_create(
+        Message(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hello',
+                status=random.choice(['new', 'read', 'archived']))
+        for i in range(messages))
+
+
+class Worker(threading.Thread):
+    def __init__(self, host, port, standin, tokens, deadline, results, new_uids):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.standin = standin
+        self.tokens = tokens
+        self.deadline = deadline
+        self.results = results
+        self.new_uids = new_uids
+        self.weights = [weight for _, weight, *_ in SCENARIO]
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            name, _, method, path, body_kind = random.choices(SCENARIO, weights=self.weights)[0]
+            token = self.tokens['admin'] if name.startswith('admin') else random.choice(self.tokens['users'])
+            body = None
+            if body_kind == 'new-user':
+                uid = f'new{next(self.new_uids)}'
+                self.standin.add_user(uid, f'{uid}@example.com')
+                body = json.dumps({'idToken': self.standin.mint_token(uid)})
+            elif body_kind == 'user':
+                body = json.dumps({'idToken': token})
+
+            start = time.perf_counter()
+            ok = self.request(method, path, token, body)
+            self.results[name].append((time.perf_counter() - start, ok))
+
+    def request(self, method, path, token, body):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers={
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/json',
+            })
+            response = conn.getresponse()
+            response.read()
+            return response.status < 400
+        except OSError:
+            return False
+        finally:
+            conn.close()
+
+
+def percentile(quantiles, p):
+    return quantiles[p - 1] * 1000 if quantiles else 0
+
+
+def report(results, elapsed):
+    print(f'{"endpoint":<16}{"requests":>9}{"errors":>8}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+    total = 0
+    for name, *_ in SCENARIO:
+        samples = results.get(name, [])
+        total += len(samples)
+        latencies = [latency for latency, _ in samples]
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        errors = sum(1 for _, ok in samples if not ok)
+        print(
+            f'{name:<16}{len(samples):>9}{errors:>8}{len(samples) / elapsed:>9.1f}'
+            f'{percentile(quantiles, 50):>9.1f}{percentile(quantiles, 95):>9.1f}{percentile(quantiles, 99):>9.1f}'
+        )
+    print(f'{"total":<16}{total:>9}{"":>8}{total / elapsed:>9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=20, help='stand-in Firebase latency in milliseconds')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--skills', type=int, default=1000)
+    parser.add_argument('--messages', type=int, default=1000)
+    args = parser.parse_args()
+
+    create_database()
+    standin = FirebaseStandIn(latency=args.latency / 1000)
+    seed(standin, args.users, args.skills, args.messages)
+
+    server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    with standin.installed():
+        tokens = {
+            'admin': standin.mint_token('admin'),
+            'users': [standin.mint_token(f'user{i}') for i in range(min(args.users, 200))],
+        }
+        results = defaultdict(list)
+        new_uids = itertools.count()
+        deadline = time.monotonic() + args.duration
+        start = time.perf_counter()
+        workers = [Worker(host, port, standin, tokens, deadline, results, new_uids)
+                   for _ in range(args.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    print(f'{args.concurrency} clients, {args.duration:.0f} s, {args.latency:.0f} ms Firebase latency')
+    report(results, elapsed)
+    print(f'stand-in calls: {dict(standin.calls)}')
+
+
+if __name__ == '__main__':
+    main()
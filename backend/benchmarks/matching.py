@@ -0,0 +1,100 @@
+"""Skill-swap match latency over a large synthetic user base.
+
+Builds the matching index in memory for ``--users`` users, each offering a
+few skills and wanting a few more (popularity is skewed, as real catalogs
+are), then times per-user match lookups, incremental link changes and the
+compaction that folds them into the matrices.
+
+    python benchmarks/matching.py --users 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from authentication.matching import OFFERED, WANTED, MatchIndex, matching_available  # noqa: E402
+
+if not matching_available():
+    sys.exit('numpy and scipy are required')
+
+import numpy as np  # noqa: E402
+
+
+def links(rng, users, skills, per_user):
+    # Zipf-ish popularity: a few skills are offered and wanted by many users.
+    weights = 1 / np.arange(1, skills + 1) ** 0.8
+    weights /= weights.sum()
+    counts = rng.integers(1, 2 * per_user, size=users)
+    user_ids = np.repeat(np.arange(1, users + 1), counts)
+    skill_ids = rng.choice(skills, size=len(user_ids), p=weights) + 1
+    return np.column_stack([user_ids, skill_ids])
+
+
+def quantiles(timings):
+    timings = sorted(timings)
+    return (statistics.median(timings) * 1000, timings[int(0.95 * len(timings))] * 1000)
+
+
+def time_lookups(index, user_ids, limit):
+    timings = []
+    found = 0
+    for user_id in user_ids:
+        start = time.perf_counter()
+        found += bool(index.matches(int(user_id), limit))
+        timings.append(time.perf_counter() - start)
+    return quantiles(timings), found / len(user_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--skills', type=int, default=20000)
+    parser.add_argument('--offered', type=int, default=3, help='mean offered skills per user')
+    parser.add_argument('--wanted', type=int, default=5, help='mean wanted skills per user')
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--changes', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    offers = links(rng, args.users, args.skills, args.offered)
+    wants = links(rng, args.users, args.skills, args.wanted)
+
+    start = time.perf_counter()
+    index = MatchIndex(offers, wants, compact_after=args.changes * 10)
+    print(f'indexed {args.users} users, {len(offers)} offered and {len(wants)} wanted links '
+          f'in {time.perf_counter() - start:.2f} s')
+
+    sample = rng.choice(np.arange(1, args.users + 1), size=args.lookups, replace=False)
+    (median, p95), hit_rate = time_lookups(index, sample, 50)
+    print(f'{"lookup":<32}median {median:6.2f} ms   p95 {p95:6.2f} ms   ({hit_rate:.0%} with matches)')
+
+    timings = []
+    for _ in range(args.changes):
+        kind = OFFERED if rng.random() < 0.5 else WANTED
+        skill_id = int(rng.choice(args.skills)) + 1
+        users = index.users_with(kind, skill_id) | {int(rng.integers(1, args.users + 1))}
+        start = time.perf_counter()
+        index.set_users(kind, skill_id, users)
+        timings.append(time.perf_counter() - start)
+    median, p95 = quantiles(timings)
+    print(f'{"incremental change":<32}median {median:6.2f} ms   p95 {p95:6.2f} ms   '
+          f'({index.pending_count} pending)')
+
+    (median, p95), _ = time_lookups(index, sample, 50)
+    print(f'{"lookup with pending changes":<32}median {median:6.2f} ms   p95 {p95:6.2f} ms')
+
+    start = time.perf_counter()
+    index.compact()
+    print(f'{"compaction":<32}{(time.perf_counter() - start) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Admin inbox search latency over a large synthetic inbox.
+
+Seeds a throwaway SQLite database with ``--messages`` contact messages
+(every tenth with a reply; both indexed by the FTS5 triggers as they're
+inserted), then times ranked and newest-first searches, highlights
+included, through the search endpoint's query functions.
+
+    python benchmarks/message_search.py --messages 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from authentication.message_search import message_results, search_messages  # noqa: E402
+from authentication.models import Message, MessageReply  # noqa: E402
+
+NAMES = 'ada bob cy dana eli fay gus hana ivan jo kim lee mo nia omar pia quinn rui sam tess'.split()
+WORDS = (
+    'refund payment login password swap lesson teacher schedule cancel account email verify '
+    'guitar python spanish cooking review rating profile photo bug error slow broken thanks'
+).split()
+FILLER = 'hello please could you help me with my the a an is not working since yesterday'.split()
+QUERIES = ['refund', 'pass', 'login broken', 'dana', 'thanks', 'guitar lesson cancel']
+
+
+def create_database():
+    path = os.path.join(tempfile.mkdtemp(), 'messages.sqlite3')
+    connection.settings_dict['TEST']['NAME'] = path
+    connection.creation.create_test_db(verbosity=0)
+
+
+def seed(count):
+    rng = random.Random(0)
+    batch = []
+    with transaction.atomic():
+        for i in range(count):
+            name = rng.choice(NAMES)
+            words = rng.sample(WORDS, 3) + rng.sample(FILLER, 8)
+            rng.shuffle(words)
+            batch.append(Message(name=f'{name.title()} {i}', email=f'{name}{i}@example.com',
+                                 message=' '.join(words), status=rng.choice(['new', 'read', 'archived'])))
+            if len(batch) == 5000:
+                Message.objects.bulk_create(batch)
+                batch = []
+        Message.objects.bulk_create(batch)
+        MessageReply.objects.bulk_create(
+            MessageReply(message_id=pk, content=f'Thanks, {rng.choice(WORDS)} is sorted now')
+            for pk in Message.objects.values_list('pk', flat=True)[::10])
+
+
+def timed(repeat, **kwargs):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        message_results(search_messages(limit=21, **kwargs))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=300000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    create_database()
+    start = time.perf_counter()
+    seed(args.messages)
+    print(f'seeded and indexed {args.messages} messages in {time.perf_counter() - start:.1f} s')
+
+    print(f'{"query":<36}{"ranked ms":>10}{"newest ms":>10}')
+    for query in QUERIES:
+        print(f'{query!r:<36}{timed(args.repeat, query=query):>10.2f}'
+              f'{timed(args.repeat, query=query, sort="newest"):>10.2f}')
+    print(f'{"refund, status=new":<36}{timed(args.repeat, query="refund", status="new"):>10.2f}'
+          f'{timed(args.repeat, query="refund", status="new", sort="newest"):>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Skill search latency over a large synthetic catalog.
+
+Seeds a throwaway SQLite database with ``--skills`` active skills (indexed
+by the FTS5 triggers as they're inserted), then times ranked searches
+through the search API's query functions.
+
+    python benchmarks/skill_search.py --skills 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+from authentication.models import Skill  # noqa: E402
+from authentication.search import find_skill_ids, skill_results  # noqa: E402
+
+WORDS = (
+    'python javascript react django guitar piano violin spanish french italian japanese cooking baking '
+    'yoga pilates running photography lightroom watercolor sketching pottery marketing finance excel '
+    'statistics calculus chess dance salsa knitting gardening carpentry welding singing drums'
+).split()
+FILLER = 'learn practice basics advanced techniques with hands on projects and weekly sessions'.split()
+CATEGORIES = ['programming', 'music', 'language', 'cooking', 'fitness', 'photography', 'art', 'finance']
+LEVELS = ['beginner', 'intermediate', 'advanced']
+QUERIES = ['python', 'pyth', 'guitar basics', 'spanish conversation', 'wat', 'react projects', 'chess']
+
+
+def create_database():
+    path = os.path.join(tempfile.mkdtemp(), 'search.sqlite3')
+    connection.settings_dict['TEST']['NAME'] = path
+    connection.creation.create_test_db(verbosity=0)
+
+
+def seed(count):
+    rng = random.Random(0)
+    author = User.objects.create_user(username='author@example.com', first_name='Ada', last_name='Author')
+    batch = []
+    with transaction.atomic():
+        for i in range(count):
+            topic = rng.sample(WORDS, 2)
+            batch.append(Skill(
+                title=f'{topic[0].title()} {rng.choice(FILLER)} {i}',
+                description=' '.join(topic + rng.sample(FILLER, 6)),
+                category=rng.choice(CATEGORIES), level=rng.choice(LEVELS), status='active',
+                rating=round(rng.uniform(3, 5), 1), author=author))
+            if len(batch) == 5000:
+                Skill.objects.bulk_create(batch)
+                batch = []
+        Skill.objects.bulk_create(batch)
+
+
+def timed(repeat, **kwargs):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        skill_results(find_skill_ids(limit=21, **kwargs))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skills', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    create_database()
+    start = time.perf_counter()
+    seed(args.skills)
+    print(f'seeded and indexed {args.skills} skills in {time.perf_counter() - start:.1f} s')
+
+    print(f'{"query":<36}{"median ms":>10}')
+    for query in QUERIES:
+        print(f'{query!r:<36}{timed(args.repeat, query=query):>10.2f}')
+    print(f'{"python, programming, >= 4.5":<36}'
+          f'{timed(args.repeat, query="python", category="programming", min_rating=4.5):>10.2f}')
+    print(f'{"(browse) music, advanced":<36}{timed(args.repeat, category="music", level="advanced"):>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,6 @@
 import os
 from pathlib import Path
 
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-# Initialize Firebase
-from authentication.firebase_config import initialize_firebase
-try:
-    initialize_firebase()
-except Exception as e:
-    print(f"Firebase initialization error: {e}")
-
 """
 Django settings for skillswap_backend project.
 
@@ -54,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'authentication.instrumentation.InstrumentationMiddleware',  # Times the whole request
     'corsheaders.middleware.CorsMiddleware',  # Add CORS middleware at the top
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -62,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'authentication.middleware.SystemSettingsMiddleware',  # Maintenance mode and registration toggle
 ]
 
 ROOT_URLCONF = 'skillswap_backend.urls'
@@ -185,3 +177,93 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [],
     'UNAUTHENTICATED_USER': None,
 }
+
+# Keyset pagination for the admin list endpoints; clients may ask for up to
+# MAX_PAGE_SIZE rows with ?page_size=.
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Rows fetched per database round-trip (and per streamed chunk) by the
+# admin export endpoints.
+EXPORT_CHUNK_SIZE = 2000
+
+# Most rows one bulk moderation request may touch.
+BULK_MAX_ROWS = 10000
+
+# How long a process serves its cached SystemSettings before checking the
+# row's version again; saves made by the same process apply immediately.
+SYSTEM_SETTINGS_RECHECK_SECONDS = 5
+
+# Deepest result the skill and inbox searches page through.
+SEARCH_MAX_RESULTS = 10000
+
+# Inbox search ranks the newest this many matches by relevance; older ones
+# are reached with sort=newest (authentication/message_search.py).
+MESSAGE_SEARCH_RANK_WINDOW = 10000
+
+# Skill-swap matching (authentication/matching.py): how many matches are kept
+# per user, how many users' results are cached, how many incremental changes
+# build up before the sparse matrices are rewritten, and how often the index
+# is rebuilt to pick up writes made by other processes.
+MATCHING_MAX_RESULTS = 50
+MATCHING_CACHE_SIZE = 10000
+MATCHING_COMPACT_AFTER = 1000
+MATCHING_REBUILD_SECONDS = 300
+
+# Half-life of a review's weight in Skill.trending_score; the score is
+# rewritten by `manage.py update_trending`, run from cron.
+TRENDING_HALF_LIFE_HOURS = 72
+
+# Chat over WebSockets (authentication/websocket.py). The broker backend
+# moves messages between workers; LocalBackend only reaches sockets in this
+# process. A socket whose send queue fills up is closed, not waited on.
+CHAT_BROKER_BACKEND = 'authentication.broker.LocalBackend'
+CHAT_SEND_QUEUE_SIZE = 256
+CHAT_AUTH_TIMEOUT_SECONDS = 10
+CHAT_MAX_MESSAGE_LENGTH = 4000
+CHAT_HISTORY_PAGE_SIZE = 50
+
+# Admin inbox feed (message_events.py): events read per batch, seconds
+# between keepalives, and how many events stay resumable.
+MESSAGE_EVENTS_BATCH_SIZE = 500
+MESSAGE_STREAM_HEARTBEAT_SECONDS = 15
+MESSAGE_EVENTS_RETAIN = 10000
+
+# `manage.py archive_messages` (authentication/archive.py), run from cron,
+# moves archived messages and those older than this many days (None: only
+# archived ones) to the archive table, this many per transaction.
+MESSAGE_ARCHIVE_AFTER_DAYS = 365
+MESSAGE_ARCHIVE_BATCH_SIZE = 500
+
+# Firebase Admin SDK
+# The app is initialized lazily, on the first call that needs it
+# (see authentication.firebase_config), not at import time.
+FIREBASE_CREDENTIALS = BASE_DIR / 'credentials' / 'skillswap-d3d5a-firebase-adminsdk-fbsvc-2812b52959.json'
+
+# Firebase token verification
+# Verified ID tokens are cached (keyed by a hash of the token) until their
+# own `exp`, so repeat requests skip the RSA signature check.
+FIREBASE_TOKEN_CACHE_SIZE = 10000
+
+# Firebase user records fetched by the auth views are cached for
+# FIREBASE_USER_CACHE_TTL seconds. Misses arriving while an auth.get_users()
+# call is in flight share the next one.
+FIREBASE_USER_CACHE_SIZE = 10000
+FIREBASE_USER_CACHE_TTL = 300
+
+# Per-process cache of Firebase uid -> (user id, is_active, is_admin) used by
+# FirebaseAuthentication and the IsAdmin permission.
+USER_RESOLUTION_CACHE_SIZE = 50000
+
+# Worker threads the async auth views use for blocking Firebase SDK calls.
+FIREBASE_THREAD_POOL_SIZE = 64
+
+# Instrumentation (authentication.instrumentation)
+# Each endpoint / Firebase call keeps its last METRICS_WINDOW_SIZE samples in
+# a fixed-size ring buffer. systemHealth flags anything above these limits.
+# /auth/metrics/ is admin-only; set METRICS_TOKEN to let a scraper in with
+# `Authorization: Bearer <token>` instead.
+METRICS_WINDOW_SIZE = 1024
+METRICS_TOKEN = None
+HEALTH_ERROR_RATE_THRESHOLD = 0.05
+HEALTH_P95_THRESHOLD_SECONDS = 1.0
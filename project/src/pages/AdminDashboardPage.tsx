@@ -2,7 +2,7 @@ import { useEffect, useState
 } from 'react';
 import { useNavigate, Link
 } from 'react-router-dom';
-import { useQuery, useMutation
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient, InfiniteData
 } from '@tanstack/react-query';
 import {
   Users, BookOpen, Settings, Activity,
@@ -10,7 +10,7 @@ import {
 } from 'lucide-react';
 import { realAdminService as adminService
 } from '../services/realAdminService';
-import { AdminStats, UserManagement, SkillModeration, UserMessage
+import { AdminStats, UserManagement, SkillModeration, UserMessage, CursorPage
 } from '../types/admin';
 import { useAdminAuth
 } from '../contexts/AdminAuthContext';
@@ -19,6 +19,21 @@ import { LoadingSpinner, ErrorMessage
 import { useToast
 } from '../hooks/useToast';
 
+const PAGE_SIZE = 50;
+
+const LoadMore = ({ query }: { query: { hasNextPage: boolean; isFetchingNextPage: boolean; fetchNextPage: () => unknown } }) =>
+  query.hasNextPage ? (
+    <div className="mt-4 text-center">
+      <button
+        onClick={() => query.fetchNextPage()}
+        disabled={query.isFetchingNextPage}
+        className="inline-flex items-center px-4 py-2 border border-gray-300 dark:border-gray-600 text-sm font-medium rounded-md text-gray-700 dark:text-gray-200 bg-white dark:bg-gray-800 hover:bg-gray-50 dark:hover:bg-gray-700 disabled:opacity-50"
+      >
+        {query.isFetchingNextPage ? 'Loading…' : 'Load more'}
+      </button>
+    </div>
+  ) : null;
+
 const AdminDashboardPage = () => {
   const { showToast
   } = useToast();
@@ -34,22 +49,29 @@ const AdminDashboardPage = () => {
     queryFn: () => adminService.getAdminStats(),
   });
 
-  const usersQuery = useQuery({
+  // The lists load a page at a time; "Load more" follows the next cursor.
+  const usersQuery = useInfiniteQuery({
     queryKey: ['admin', 'users'
     ],
-    queryFn: () => adminService.getUsers(),
+    queryFn: ({ pageParam }) => adminService.getUsersPage({ cursor: pageParam, pageSize: PAGE_SIZE }),
+    initialPageParam: null as string | null,
+    getNextPageParam: (page) => page.nextCursor,
   });
 
-  const skillsQuery = useQuery({
+  const skillsQuery = useInfiniteQuery({
     queryKey: ['admin', 'skills'
     ],
-    queryFn: () => adminService.getSkills(),
+    queryFn: ({ pageParam }) => adminService.getSkillsPage({ cursor: pageParam, pageSize: PAGE_SIZE }),
+    initialPageParam: null as string | null,
+    getNextPageParam: (page) => page.nextCursor,
   });
 
-  const messagesQuery = useQuery({
+  const messagesQuery = useInfiniteQuery({
     queryKey: ['admin', 'messages'
     ],
-    queryFn: () => adminService.getMessages(),
+    queryFn: ({ pageParam }) => adminService.getMessagesPage({ cursor: pageParam, pageSize: PAGE_SIZE }),
+    initialPageParam: null as string | null,
+    getNextPageParam: (page) => page.nextCursor,
   });
 
   const settingsQuery = useQuery({
@@ -58,10 +80,43 @@ const AdminDashboardPage = () => {
     queryFn: () => adminService.getSystemSettings(),
   });
 
+  // Keep the inbox and its badge current from the server's message feed.
+  const queryClient = useQueryClient();
+  useEffect(() => {
+    const controller = new AbortController();
+    adminService.watchMessages((event) => {
+      if (event.type === 'badge') {
+        queryClient.setQueryData<AdminStats>(['admin', 'stats'], (current) =>
+          current && { ...current, newMessages: event.newMessages });
+      } else if (event.type === 'reset') {
+        // Drop the pages loaded so far so the refetch reloads only the first one.
+        queryClient.setQueryData<InfiniteData<CursorPage<UserMessage>>>(['admin', 'messages'], (current) =>
+          current && { pages: current.pages.slice(0, 1), pageParams: current.pageParams.slice(0, 1) });
+        queryClient.invalidateQueries({ queryKey: ['admin', 'messages'] });
+      } else {
+        queryClient.setQueryData<InfiniteData<CursorPage<UserMessage>>>(['admin', 'messages'], (current) => {
+          if (!current) return current;
+          const pages = current.pages.map((page, index) => {
+            let results = page.results.filter((message) => message.id !== event.message.id);
+            if (event.type === 'created' && index === 0) {
+              results = [event.message, ...results];
+            } else if (event.type === 'status') {
+              results = page.results.map((message) =>
+                message.id === event.message.id ? { ...message, status: event.message.status } : message);
+            }
+            return { ...page, results };
+          });
+          return { ...current, pages };
+        });
+      }
+    }, controller.signal);
+    return () => controller.abort();
+  }, [queryClient]);
+
   const stats = statsQuery.data;
-  const users = usersQuery.data;
-  const skills = skillsQuery.data;
-  const messages = messagesQuery.data;
+  const users = usersQuery.data?.pages.flatMap((page) => page.results) ?? [];
+  const skills = skillsQuery.data?.pages.flatMap((page) => page.results) ?? [];
+  const messages = messagesQuery.data?.pages.flatMap((page) => page.results) ?? [];
   const systemSettings = settingsQuery.data;
 
   const [replyingTo, setReplyingTo
@@ -75,36 +130,11 @@ const AdminDashboardPage = () => {
   useEffect(() => {
     if (!adminProfile) {
       navigate('/admin/login');
-      return;
     }
-    loadData();
   },
   [navigate, adminProfile
   ]);
 
-  const loadData = async () => {
-    setIsLoading(true);
-    try {
-      const [statsData, userData, skillsData, settingsData, messagesData
-      ] = await Promise.all([
-        adminService.getAdminStats(),
-        adminService.getUsers(),
-        adminService.getSkills(),
-        adminService.getSystemSettings(),
-        adminService.getMessages()
-      ]);
-
-      setStats(statsData);
-      setUsers(userData);
-      setSkills(skillsData);
-      setSystemSettings(settingsData);
-      setMessages(messagesData);
-    } catch (error) {
-      console.error('Error loading admin data:', error);
-    }
-    setIsLoading(false);
-  };
-
   const showActionResult = (action: string, success: boolean, itemType: string) => {
     if (success) {
       showToast(`Successfully ${action
@@ -513,6 +543,7 @@ const AdminDashboardPage = () => {
                     </tbody>
                   </table>
                 </div>
+                <LoadMore query={usersQuery} />
               </div>
             </div>
           )
@@ -600,6 +631,7 @@ const AdminDashboardPage = () => {
                     </tbody>
                   </table>
                 </div>
+                <LoadMore query={skillsQuery} />
               </div>
             </div>
           )
@@ -766,6 +798,7 @@ const AdminDashboardPage = () => {
                   )
     }
                 </div>
+                <LoadMore query={messagesQuery} />
               </div>
             </div>
           )
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Search, SlidersHorizontal, X } from 'lucide-react';
 import SkillCard from '../components/skills/SkillCard';
+import { skillApi, SkillSearchResult } from '../services/api';
 
 interface Skill {
   id: number;
@@ -16,160 +17,6 @@ interface Skill {
   price?: number;
 }
 
-// Mock data - In a real app, this would come from an API
-const ALL_SKILLS_DATA: Skill[] = [
-  {
-    id: 1,
-    title: 'JavaScript Fundamentals',
-    description: 'Learn the core concepts of JavaScript programming language.',
-    category: 'programming',
-    level: 'beginner',
-    author: 'Alex Johnson',
-    authorImage: 'https://images.pexels.com/photos/220453/pexels-photo-220453.jpeg',
-    rating: 4.8,
-    reviews: 124,
-    teachingMode: 'swap'
-  },
-  {
-    id: 2,
-    title: 'Digital Illustration',
-    description: 'Master digital illustration techniques.',
-    category: 'design',
-    level: 'intermediate',
-    author: 'Sophia Lee',
-    authorImage: 'https://images.pexels.com/photos/774909/pexels-photo-774909.jpeg',
-    rating: 4.9,
-    reviews: 89,
-    teachingMode: 'paid',
-    price: 45
-  },
-  {
-    id: 3,
-    title: 'Spanish Conversation',
-    description: 'Practice conversational Spanish with a focus on everyday situations and common phrases.',
-    category: 'language',
-    level: 'beginner',
-    author: 'Miguel Rodriguez',
-    authorImage: 'https://images.pexels.com/photos/614810/pexels-photo-614810.jpeg',
-    rating: 4.7,
-    reviews: 56,
-    teachingMode: 'swap'
-  },
-  {
-    id: 4,
-    title: 'Piano for Beginners',
-    description: 'Learn to play piano starting with basic techniques, reading music, and simple songs.',
-    category: 'music',
-    level: 'beginner',
-    author: 'Emma Wilson',
-    authorImage: 'https://images.pexels.com/photos/1239291/pexels-photo-1239291.jpeg',
-    rating: 4.6,
-    reviews: 42,
-    teachingMode: 'paid',
-    price: 35
-  },
-  {
-    id: 5,
-    title: 'Italian Cuisine',
-    description: 'Discover authentic Italian cooking techniques and recipes from different regions of Italy.',
-    category: 'cooking',
-    level: 'intermediate',
-    author: 'Marco Bianchi',
-    authorImage: 'https://images.pexels.com/photos/2379004/pexels-photo-2379004.jpeg',
-    rating: 4.9,
-    reviews: 78,
-    teachingMode: 'swap'
-  },
-  {
-    id: 6,
-    title: 'React Development',
-    description: 'Build modern web applications using React, Redux, and related technologies.',
-    category: 'programming',
-    level: 'advanced',
-    author: 'David Chen',
-    authorImage: 'https://images.pexels.com/photos/1681010/pexels-photo-1681010.jpeg',
-    rating: 4.8,
-    reviews: 112,
-    teachingMode: 'paid',
-    price: 60
-  },
-  {
-    id: 7,
-    title: 'Yoga Basics',
-    description: 'Learn fundamental yoga poses, breathing techniques, and mindfulness practices for beginners.',
-    category: 'fitness',
-    level: 'beginner',
-    author: 'Priya Sharma',
-    authorImage: 'https://images.pexels.com/photos/1065084/pexels-photo-1065084.jpeg',
-    rating: 4.7,
-    reviews: 95,
-    teachingMode: 'swap'
-  },
-  {
-    id: 8,
-    title: 'Photography Composition',
-    description: 'Master the art of composition in photography to create more compelling and balanced images.',
-    category: 'photography',
-    level: 'intermediate',
-    author: 'James Wilson',
-    authorImage: 'https://images.pexels.com/photos/1222271/pexels-photo-1222271.jpeg',
-    rating: 4.8,
-    reviews: 67,
-    teachingMode: 'paid',
-    price: 40
-  },
-  {
-    id: 9,
-    title: 'French for Travelers',
-    description: 'Learn essential French phrases and vocabulary for travel, dining, and basic conversations.',
-    category: 'language',
-    level: 'beginner',
-    author: 'Claire Dubois',
-    authorImage: 'https://images.pexels.com/photos/1239291/pexels-photo-1239291.jpeg',
-    rating: 4.6,
-    reviews: 84,
-    teachingMode: 'swap'
-  },
-  {
-    id: 10,
-    title: 'Data Science with Python',
-    description: 'Introduction to data analysis, visualization, and machine learning using Python libraries.',
-    category: 'programming',
-    level: 'intermediate',
-    author: 'Robert Kim',
-    authorImage: 'https://images.pexels.com/photos/1222271/pexels-photo-1222271.jpeg',
-    rating: 4.9,
-    reviews: 156,
-    teachingMode: 'paid',
-    price: 55
-  },
-  {
-    id: 11,
-    title: 'Acoustic Guitar',
-    description: 'Learn to play acoustic guitar with focus on chords, strumming patterns, and popular songs.',
-    category: 'music',
-    level: 'beginner',
-    author: 'Jason Mraz',
-    authorImage: 'https://images.pexels.com/photos/1681010/pexels-photo-1681010.jpeg',
-    rating: 4.8,
-    reviews: 112,
-    teachingMode: 'swap'
-  },
-  {
-    id: 12,
-    title: 'Watercolor Painting',
-    description: 'Master watercolor techniques including washes, glazing, and creating textures and effects.',
-    category: 'art',
-    level: 'intermediate',
-    author: 'Emily Chen',
-    authorImage: 'https://images.pexels.com/photos/774909/pexels-photo-774909.jpeg',
-    rating: 4.7,
-    reviews: 93,
-    teachingMode: 'paid',
-    price: 35
-  },
-];
-
 const categories = [
   'All Categories',
   'Programming',
@@ -184,6 +31,12 @@ const categories = [
 
 const levels = ['All Levels', 'Beginner', 'Intermediate', 'Advanced'];
 
+const toSkill = (result: SkillSearchResult): Skill => ({
+  ...result,
+  authorImage: '',
+  teachingMode: 'swap',
+});
+
 const SearchPage = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [filters, setFilters] = useState({
@@ -191,41 +44,39 @@ const SearchPage = () => {
     level: 'All Levels',
     minRating: 0,
   });
-  const [filteredSkills, setFilteredSkills] = useState<Skill[]>(ALL_SKILLS_DATA);
+  const [filteredSkills, setFilteredSkills] = useState<Skill[]>([]);
   const [isFilterDrawerOpen, setIsFilterDrawerOpen] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
 
-  useEffect(() => {
-    // Simulate API loading delay
-    const timer = setTimeout(() => {
-      setIsLoading(false);
-    }, 1000);
-    return () => clearTimeout(timer);
-  }, []);
-
   useEffect(() => {
     // Scroll to top when component mounts
     window.scrollTo({ top: 0, behavior: 'smooth' });
   }, []);
 
   useEffect(() => {
-    // Filter skills based on search term and filters
-    const filtered = ALL_SKILLS_DATA.filter((skill) => {
-      const matchesSearch = skill.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        skill.description.toLowerCase().includes(searchTerm.toLowerCase());
-
-      const matchesCategory = filters.category === 'All Categories' ||
-        skill.category.toLowerCase() === filters.category.toLowerCase();
-
-      const matchesLevel = filters.level === 'All Levels' ||
-        skill.level.toLowerCase() === filters.level.toLowerCase();
-
-      const matchesRating = skill.rating >= filters.minRating;
-
-      return matchesSearch && matchesCategory && matchesLevel && matchesRating;
-    });
-
-    setFilteredSkills(filtered);
+    // Search on the server, debounced so typing doesn't send a request per key
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      setIsLoading(true);
+      try {
+        const page = await skillApi.search({
+          q: searchTerm.trim(),
+          category: filters.category === 'All Categories' ? undefined : filters.category.toLowerCase(),
+          level: filters.level === 'All Levels' ? undefined : filters.level.toLowerCase(),
+          minRating: filters.minRating,
+        });
+        if (!cancelled) setFilteredSkills(page.results.map(toSkill));
+      } catch (error) {
+        console.error('Skill search failed:', error);
+        if (!cancelled) setFilteredSkills([]);
+      } finally {
+        if (!cancelled) setIsLoading(false);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [searchTerm, filters]);
 
   const handleFilterChange = (name: string, value: string | number) => {
@@ -107,4 +107,188 @@ export const authApi = {
     },
 };
 
+export interface SkillSearchParams {
+    q?: string;
+    category?: string;
+    level?: string;
+    minRating?: number;
+    // Relevance (with q) or newest first unless set.
+    sort?: 'newest' | 'rating' | 'trending';
+    page?: number;
+    pageSize?: number;
+}
+
+export interface SkillReview {
+    id: number;
+    rating: number;
+    comment: string;
+    reviewer: string;
+    createdAt: string;
+}
+
+export interface SkillSearchResult {
+    id: number;
+    title: string;
+    description: string;
+    category: string;
+    level: string;
+    author: string;
+    rating: number;
+    reviews: number;
+    createdAt: string;
+}
+
+export interface SkillFacets {
+    total: number;
+    category: Record<string, number>;
+    level: Record<string, number>;
+    rating: Record<string, number>;
+}
+
+export type SkillLinkKind = 'offered' | 'wanted';
+
+export interface SkillMatch {
+    userId: number;
+    name: string;
+    score: number;
+    theyOffer: { id: number; title: string }[];
+    theyWant: { id: number; title: string }[];
+}
+
+export const skillApi = {
+    // Ranked full-text search; the catalog stays on the server.
+    search: async ({ q, category, level, minRating, sort, page, pageSize }: SkillSearchParams = {}) => {
+        const params: Record<string, string | number> = {};
+        if (q) params.q = q;
+        if (sort) params.sort = sort;
+        if (category) params.category = category;
+        if (level) params.level = level;
+        if (minRating) params.min_rating = minRating;
+        if (page) params.page = page;
+        if (pageSize) params.page_size = pageSize;
+        const response = await api.get('/auth/skills/search/', { params });
+        return response.data as { next: string | null; results: SkillSearchResult[] };
+    },
+
+    // Counts per category, level and minimum rating (half-star keys, "at
+    // least" counts); each facet ignores its own filter.
+    facets: async ({ category, level, minRating }: SkillSearchParams = {}) => {
+        const params: Record<string, string | number> = {};
+        if (category) params.category = category;
+        if (level) params.level = level;
+        if (minRating) params.min_rating = minRating;
+        const response = await api.get('/auth/skills/facets/', { params });
+        return response.data as SkillFacets;
+    },
+
+    top: async (by: 'trending' | 'rating' = 'trending', pageSize?: number) => {
+        const params: Record<string, string | number> = { by };
+        if (pageSize) params.page_size = pageSize;
+        const response = await api.get('/auth/skills/top/', { params });
+        return response.data as { results: SkillSearchResult[] };
+    },
+
+    // Newest first; pass the previous page's nextCursor to continue.
+    reviews: async (skillId: number, cursor?: string) => {
+        const response = await api.get(`/auth/skills/${skillId}/reviews/`, { params: cursor ? { cursor } : {} });
+        return response.data as { next: string | null; nextCursor: string | null; results: SkillReview[] };
+    },
+
+    // Creates or replaces the signed-in user's review of the skill.
+    review: async (skillId: number, rating: number, comment = '') => {
+        const response = await api.put(`/auth/skills/${skillId}/reviews/`, { rating, comment });
+        return response.data as SkillReview;
+    },
+
+    removeReview: async (skillId: number) => {
+        await api.delete(`/auth/skills/${skillId}/reviews/`);
+    },
+
+    // Lists a skill for the signed-in user; fails with 403 and code
+    // "skills/limit-reached" once they have maxSkillsPerUser skills.
+    create: async (skill: { title: string; description?: string; category: string; level?: string }) => {
+        const response = await api.post('/auth/skills/', skill);
+        return response.data as { id: number; title: string; status: string; createdAt: string };
+    },
+
+    remove: async (skillId: number) => {
+        await api.delete(`/auth/skills/${skillId}/`);
+    },
+
+    // The signed-in user's offered (including authored) and wanted skill ids.
+    links: async () => {
+        const response = await api.get('/auth/skills/links/');
+        return response.data as Record<SkillLinkKind, number[]>;
+    },
+
+    addLink: async (skillId: number, kind: SkillLinkKind) => {
+        await api.post('/auth/skills/links/', { skillId, kind });
+    },
+
+    removeLink: async (skillId: number, kind: SkillLinkKind) => {
+        await api.delete('/auth/skills/links/', { data: { skillId, kind } });
+    },
+
+    // Users who teach what the signed-in user wants and want what they teach.
+    matches: async (limit?: number) => {
+        const response = await api.get('/auth/skills/matches/', { params: limit ? { limit } : {} });
+        return response.data as { results: SkillMatch[] };
+    },
+};
+
+export interface ChatMessage {
+    id: number;
+    conversation: number;
+    sender: number;
+    body: string;
+    createdAt: string;
+}
+
+export interface ChatConversation {
+    id: number;
+    peer: { id: number; name: string };
+    lastMessageAt: string;
+}
+
+export const chatApi = {
+    // Most recently active first; pass the previous page's nextCursor to continue.
+    conversations: async (before?: string) => {
+        const response = await api.get('/auth/chat/conversations/', { params: before ? { before } : {} });
+        return response.data as { results: ChatConversation[]; nextCursor: string | null };
+    },
+
+    open: async (userId: number) => {
+        const response = await api.post('/auth/chat/conversations/', { userId });
+        return response.data as { id: number };
+    },
+
+    // Newest first, keyed on message id.
+    messages: async (conversationId: number, before?: number) => {
+        const response = await api.get(`/auth/chat/conversations/${conversationId}/messages/`, {
+            params: before ? { before } : {},
+        });
+        return response.data as { messages: ChatMessage[]; nextCursor: number | null };
+    },
+
+    // Opens /ws/chat/ and authenticates with the current ID token. The
+    // server closes with 1013 when the client falls behind; reconnect and
+    // backfill through messages().
+    connect: async (onMessage: (message: ChatMessage) => void) => {
+        const user = auth.currentUser;
+        if (!user) throw new Error('Not signed in');
+        const token = await user.getIdToken();
+        const socket = new WebSocket(`${String(api.defaults.baseURL).replace(/^http/, 'ws')}/ws/chat/`);
+        socket.addEventListener('open', () => socket.send(JSON.stringify({ type: 'auth', token })));
+        socket.addEventListener('message', (event) => {
+            const frame = JSON.parse(event.data);
+            if (frame.type === 'message') onMessage(frame.message as ChatMessage);
+        });
+        return {
+            socket,
+            send: (conversation: number, body: string, clientId?: string) =>
+                socket.send(JSON.stringify({ type: 'send', conversation, body, clientId })),
+        };
+    },
+};
+
 export default api;
@@ -1,5 +1,69 @@
 import api from './api';
-import { AdminStats, UserManagement, SkillModeration, UserMessage } from '../types/admin';
+import { auth } from '../config/firebase';
+import { AdminStats, UserManagement, SkillModeration, UserMessage, ArchivedMessage, MessageSearchResult, CursorPage, PageParams, BulkResult } from '../types/admin';
+
+// The admin list endpoints are keyset-paginated: each page carries the cursor
+// for the next one, newest rows first.
+const getPage = async <T>(url: string, { cursor, pageSize, ...filters }: PageParams = {}): Promise<CursorPage<T>> => {
+    const params: Record<string, string | number> = {};
+    if (cursor) params.cursor = cursor;
+    if (pageSize) params.page_size = pageSize;
+    for (const [key, value] of Object.entries(filters)) {
+        if (value) params[key] = value;
+    }
+    const response = await api.get(url, { params });
+    return response.data;
+};
+
+export type MessageFeedEvent =
+    | { type: 'created'; message: UserMessage }
+    | { type: 'status'; message: { id: number; status: UserMessage['status'] } }
+    | { type: 'deleted'; message: { id: number } }
+    | { type: 'badge'; newMessages: number }
+    | { type: 'reset' };
+
+// Reads the /auth/admin/messages/stream/ Server-Sent Events feed. EventSource
+// can't send the Authorization header, so this parses the stream from
+// fetch(). It reconnects from the last event id until the signal aborts,
+// and gives up when the backend isn't running under ASGI (501).
+const watchMessages = async (onEvent: (event: MessageFeedEvent) => void, signal: AbortSignal) => {
+    let lastEventId = '';
+    while (!signal.aborted) {
+        try {
+            const token = await auth.currentUser?.getIdToken();
+            const headers: Record<string, string> = { Authorization: `Bearer ${token}` };
+            if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+            const response = await fetch(`${api.defaults.baseURL}/auth/admin/messages/stream/`, { headers, signal });
+            if (response.status === 501) return;
+            if (!response.ok || !response.body) throw new Error(`Message feed failed: ${response.status}`);
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value;
+                let end;
+                while ((end = buffer.indexOf('\n\n')) >= 0) {
+                    const fields: Record<string, string> = {};
+                    for (const line of buffer.slice(0, end).split('\n')) {
+                        const colon = line.indexOf(': ');
+                        if (colon > 0) fields[line.slice(0, colon)] = line.slice(colon + 2);
+                    }
+                    buffer = buffer.slice(end + 2);
+                    if (fields.id) lastEventId = fields.id;
+                    if (!fields.event) continue;
+                    const data = JSON.parse(fields.data || '{}');
+                    onEvent((fields.event === 'badge' || fields.event === 'reset'
+                        ? { type: fields.event, ...data }
+                        : { type: fields.event, message: data }) as MessageFeedEvent);
+                }
+            }
+        } catch {
+            if (signal.aborted) return;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 3000));
+    }
+};
 
 export const realAdminService = {
     // Stats
@@ -9,43 +73,75 @@ export const realAdminService = {
     },
 
     // User Management
-    getUsers: async (): Promise<UserManagement[]> => {
-        const response = await api.get('/admin/users/');
-        return response.data;
-    },
+    getUsersPage: (params?: PageParams): Promise<CursorPage<UserManagement>> =>
+        getPage<UserManagement>('/admin/users/', params),
 
     updateUserStatus: async (userId: string, status: 'active' | 'suspended'): Promise<void> => {
         await api.patch(`/admin/users/${userId}/`, { status });
     },
 
+    bulkUpdateUserStatus: async (userIds: (string | number)[], status: 'active' | 'suspended'): Promise<BulkResult> => {
+        const response = await api.post('/admin/users/bulk/', { ids: userIds, status });
+        return response.data;
+    },
+
     deleteUser: async (userId: string): Promise<void> => {
         await api.delete(`/admin/users/${userId}/`);
     },
 
     // Skill Management
-    getSkills: async (): Promise<SkillModeration[]> => {
-        const response = await api.get('/admin/skills/');
-        return response.data;
-    },
+    getSkillsPage: (params?: PageParams): Promise<CursorPage<SkillModeration>> =>
+        getPage<SkillModeration>('/admin/skills/', params),
 
     updateSkillStatus: async (skillId: number, status: 'active' | 'rejected'): Promise<void> => {
         await api.patch(`/admin/skills/${skillId}/`, { status });
     },
 
+    bulkUpdateSkillStatus: async (skillIds: number[], status: 'active' | 'rejected'): Promise<BulkResult> => {
+        const response = await api.post('/admin/skills/bulk/', { ids: skillIds, status });
+        return response.data;
+    },
+
     deleteSkill: async (skillId: number): Promise<void> => {
         await api.delete(`/admin/skills/${skillId}/`);
     },
 
     // Message Management 
-    getMessages: async (): Promise<UserMessage[]> => {
-        const response = await api.get('/admin/messages/');
+    getMessagesPage: (params?: PageParams): Promise<CursorPage<UserMessage>> =>
+        getPage<UserMessage>('/admin/messages/', params),
+
+    // Messages moved to the archive table; same filters and cursors as the inbox.
+    getArchivedMessagesPage: (params?: PageParams): Promise<CursorPage<ArchivedMessage>> =>
+        getPage<ArchivedMessage>('/admin/archived-messages/', params),
+
+    getArchivedMessage: async (messageId: number): Promise<ArchivedMessage> => {
+        const response = await api.get(`/admin/archived-messages/${messageId}/`);
         return response.data;
     },
 
+    // Ranked full-text search over sender, message and reply.
+    searchMessages: async (q: string, { status, sort, page }: { status?: UserMessage['status']; sort?: 'relevance' | 'newest'; page?: number } = {}) => {
+        const params: Record<string, string | number> = { q };
+        if (status) params.status = status;
+        if (sort) params.sort = sort;
+        if (page) params.page = page;
+        const response = await api.get('/admin/messages/search/', { params });
+        return response.data as { next: string | null; results: MessageSearchResult[] };
+    },
+
+    // New messages, status changes and the "new messages" count as they
+    // happen, instead of re-fetching the list.
+    watchMessages,
+
     updateMessageStatus: async (messageId: number, status: 'read' | 'archived'): Promise<void> => {
         await api.patch(`/admin/messages/${messageId}/`, { status });
     },
 
+    bulkUpdateMessageStatus: async (messageIds: number[], status: 'read' | 'archived'): Promise<BulkResult> => {
+        const response = await api.post('/admin/messages/bulk/', { ids: messageIds, status });
+        return response.data;
+    },
+
     replyToMessage: async (messageId: number, adminName: string, content: string): Promise<void> => {
         await api.post(`/admin/messages/${messageId}/reply/`, { adminName, content });
     },
@@ -25,6 +25,16 @@ export interface UserMessage {
     reply?: MessageReply;
 }
 
+// A message moved out of the inbox by the archival job.
+export interface ArchivedMessage extends UserMessage {
+    archivedAt: string;
+}
+
+// highlight fields are HTML: escaped text with matches wrapped in <mark>.
+export interface MessageSearchResult extends UserMessage {
+    highlight: { name: string; email: string; snippet: string } | null;
+}
+
 export interface UserManagement {
     id: string;
     name: string;
@@ -45,10 +55,20 @@ export interface SkillModeration {
     lastModified: string;
 }
 
+export interface LatencySummary {
+    p50: number;
+    p95: number;
+    p99: number;
+}
+
 export interface SystemHealth {
     status: 'healthy' | 'warning' | 'critical';
     lastChecked: string;
     issues: number;
+    details?: string[];
+    latency?: LatencySummary;
+    errors?: number;
+    firebase?: Record<string, { p95: number; count: number; errors: number }>;
 }
 
 export interface AdminStats {
@@ -58,4 +78,27 @@ export interface AdminStats {
     pendingSkills: number;
     newMessages: number;
     systemHealth: SystemHealth;
-}
\ No newline at end of file
+}
+export interface CursorPage<T> {
+    next: string | null;
+    nextCursor: string | null;
+    results: T[];
+}
+
+export interface PageParams {
+    cursor?: string | null;
+    pageSize?: number;
+    // Server-side filters; status uses the same values the rows carry.
+    status?: string;
+    category?: string;
+    since?: string;
+    until?: string;
+    ordering?: string;
+}
+
+export interface BulkResult {
+    updated: number;
+    unchanged: number;
+    notFound: number;
+    results: { id: number; result: 'updated' | 'unchanged' | 'not_found' }[];
+}